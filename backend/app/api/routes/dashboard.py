@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
+from datetime import date
+from app.core.cache import response_cache
 from app.core.database import get_db
+from app.core.types import *
+from app.schemas.generic import GranularityEnum
 from app.services.dashboard_service import DashboardService
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,15 +14,111 @@ router = APIRouter(
 )
 
 
+# Dashboard responses are served through the shared response cache: they are
+# recomputed only after a committed write to their tables or when the TTL ends,
+# and a matching If-None-Match is answered with 304.
+_REQUEST_SCOPES = ["requests"]
+_REQUEST_AND_REFERENCE_SCOPES = ["requests", "reference"]
+
+
 @router.get("/request-data", status_code=status.HTTP_200_OK)
-async def request_data(db: AsyncSession = Depends(get_db)) -> JSONResponse:
+async def request_data(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> JSONResponse:
     service = DashboardService(db)
-    data = await service.get_requests_data()
-    return JSONResponse(content=data)
+    return await response_cache.respond(
+        request, _REQUEST_SCOPES, service.get_requests_data
+    )
 
 
 @router.get("/request-count-by-area")
-async def request_count_by_area(db: AsyncSession = Depends(get_db)) -> JSONResponse:
+async def request_count_by_area(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> JSONResponse:
+    service = DashboardService(db)
+    return await response_cache.respond(
+        request, _REQUEST_AND_REFERENCE_SCOPES, service.get_request_count_per_area
+    )
+
+
+@router.get("/requests-over-time")
+async def requests_over_time(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: GranularityEnum = GranularityEnum.DAY,
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    """
+    Requests created per day, week or month between start_date and end_date
+    (inclusive, default: the last 30 days).
+    """
+    service = DashboardService(db)
+    try:
+        return await response_cache.respond(
+            request,
+            _REQUEST_SCOPES,
+            lambda: service.get_requests_over_time(start_date, end_date, granularity),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/turnaround")
+async def turnaround(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: GranularityEnum = GranularityEnum.MONTH,
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    """Average days from date received to completion, per completion period."""
+    service = DashboardService(db)
+    try:
+        return await response_cache.respond(
+            request,
+            _REQUEST_SCOPES,
+            lambda: service.get_turnaround(start_date, end_date, granularity),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/top-customers")
+async def top_customers(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    """Customers with the most requests created in the range."""
+    service = DashboardService(db)
+    try:
+        return await response_cache.respond(
+            request,
+            _REQUEST_AND_REFERENCE_SCOPES,
+            lambda: service.get_top_customers(start_date, end_date, limit),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/top-sales-persons")
+async def top_sales_persons(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    """Sales persons with the most requests created in the range."""
     service = DashboardService(db)
-    data = await service.get_request_count_per_area()
-    return JSONResponse(content=data)
+    try:
+        return await response_cache.respond(
+            request,
+            _REQUEST_AND_REFERENCE_SCOPES,
+            lambda: service.get_top_sales_persons(start_date, end_date, limit),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
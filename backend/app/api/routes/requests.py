@@ -1,12 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 import app.schemas.request as record_schemas
-from app.models.stickers import Sticker, StickerCanvas
-from app.schemas.generic import APIResponse
+from app.schemas.generic import APIResponse, PaginationModeEnum, CountModeEnum
 from app.core.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import select
-from typing import Union, Optional
+from typing import Union, Optional, List
 from app.services.request_service import (
     RequestService,
     CustomerService,
@@ -129,86 +127,167 @@ async def delete_request(
     request_id: int, db: AsyncSession = Depends(get_db)
 ) -> APIResponse:
     service = RequestService(db)
+    op = False
     try:
-        op = await service.delete_by_id(request_id)
-        if not op:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Record with {request_id} cannot be found.",
-            )
-        return APIResponse(response={}, message="Delete OK.")
-    except IntegrityError as e:
-        await db.rollback()
-
-        # Find sticker canvases still referencing this request
-        stmt = (
-            select(StickerCanvas.id)
-            .join(Sticker)
-            .where(Sticker.request_id == request_id)
-            .distinct()
+        # Probe references up front instead of failing the DELETE and rolling back
+        sticker_canvas_ids = await service.get_blocking_sticker_canvas_ids(request_id)
+        if not sticker_canvas_ids:
+            op = await service.delete_by_id(request_id)
+    except IntegrityError:
+        # A sticker was added between the probe and the delete
+        sticker_canvas_ids = await service.get_blocking_sticker_canvas_ids(request_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
         )
 
-        result = await db.execute(stmt)
-        sticker_canvas_ids = result.scalars().all()
-
+    if sticker_canvas_ids:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Request is used by the ff. sticker canvas: {sticker_canvas_ids}",
         )
-
-    except Exception as e:
+    if not op:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Record with {request_id} cannot be found.",
         )
+    return APIResponse(response={}, message="Delete OK.")
 
 
 @router.get("/requests/list", status_code=status.HTTP_200_OK)
 async def list_requests(
-    db: AsyncSession = Depends(get_db), start_index: int = 0, batch_size: int = 30
+    db: AsyncSession = Depends(get_db),
+    start_index: int = 0,
+    batch_size: int = 30,
+    pagination: PaginationModeEnum = PaginationModeEnum.OFFSET,
+    cursor: Optional[str] = None,
+    sort_key: str = "id",
+    descending: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT,
+    search: Optional[str] = None,
 ) -> record_schemas.RequestResponseWithCount:
     """
     List all requests.
 
     Args:
         db (AsyncSession): The database session.
+        pagination (PaginationModeEnum): `offset` uses start_index, `cursor` uses cursor.
+        cursor (str, optional): The `next_cursor` of the previous page in cursor mode.
+        sort_key (str): Column to order by in cursor mode.
+        count_mode (CountModeEnum): `has_more` skips the exact total count.
+        search (str, optional): Full-text search terms. Results are ranked by
+            relevance and paged with start_index.
 
     Returns:
         APIResponse: A list of request objects.
     """
-    record_list = []
     try:
         request_service = RequestService(db)
-        records = await request_service.get_all_denorm_with_count(
+        records = await request_service.get_view_with_count(
             start_index=start_index,
             batch_size=batch_size,
-            relationships=["customer", "area", "sales_person"],
+            search=search,
+            keyset=pagination == PaginationModeEnum.CURSOR,
+            cursor=cursor,
+            sort_key=sort_key,
+            descending=descending,
+            exact_count=count_mode == CountModeEnum.EXACT,
         )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    for record in records["records"]:
-        data = {c.name: getattr(record, c.name) for c in record.__table__.columns}
-        if hasattr(record, "customer"):
-            data["customer_name"] = getattr(record.customer, "name", "-")
-        if hasattr(record, "area"):
-            data["area_name"] = getattr(record.area, "name", "-")
-        if hasattr(record, "sales_person"):
-            if not record.sales_person:
-                data["sales_person"] = "-"
-            else:
-                first_name = getattr(record.sales_person, "first_name", "-")
-                last_name = getattr(record.sales_person, "last_name", "-")
-                data["sales_person"] = f"{first_name} {last_name[0]}"
-        record_list.append(data)
+    # The view projection already yields exactly the schema's fields with their
+    # SQL types, so the rows are wrapped without a second validation pass.
     return record_schemas.RequestResponseWithCount(
         total_count=records["total_count"],
+        next_cursor=records["next_cursor"],
+        has_more=records["has_more"],
         records=[
-            record_schemas.RequestViewSchema.model_validate(record)
-            for record in record_list
+            record_schemas.RequestViewSchema.model_construct(**record)
+            for record in records["records"]
         ],
     )
 
 
+@router.post("/requests/bulk-create", status_code=status.HTTP_200_OK)
+async def bulk_create_requests(
+    form_data: List[record_schemas.RequestCreateSchema],
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Create many request records in one transaction.
+
+    Args:
+        form_data (List[RequestCreateSchema]): The records to create.
+        db (AsyncSession): The database session.
+
+    Returns:
+        APIResponse: The ids of the created records, in request order.
+    """
+    try:
+        service = RequestService(db)
+        created_ids = await service.bulk_create(form_data)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(
+        response={"created_ids": created_ids},
+        message=f"{len(created_ids)} request records created successfully",
+    )
+
+
+@router.post("/requests/bulk-upsert", status_code=status.HTTP_200_OK)
+async def bulk_upsert_requests(
+    form_data: List[record_schemas.RequestUpsertSchema],
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Create or update many request records in one transaction.
+
+    Args:
+        form_data (List[RequestUpsertSchema]): The records to create or update.
+        db (AsyncSession): The database session.
+
+    Returns:
+        APIResponse: The ids of the created or updated records, in request order.
+    """
+    try:
+        service = RequestService(db)
+        upserted_ids = await service.bulk_upsert(form_data)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(
+        response={"upserted_ids": upserted_ids},
+        message=f"{len(upserted_ids)} request records saved successfully",
+    )
+
+
+@router.post("/requests/bulk-delete", status_code=status.HTTP_200_OK)
+async def bulk_delete_requests(
+    form_data: record_schemas.BulkDeleteSchema,
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Delete many request records in one transaction. Nothing is deleted
+    if any of the records is still referenced.
+
+    Returns:
+        APIResponse: The ids that existed and were deleted.
+    """
+    service = RequestService(db)
+    try:
+        deleted_ids = await service.bulk_delete_by_ids(form_data.ids)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="One or more records are still referenced and cannot be deleted.",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+    return APIResponse(response={"deleted_ids": deleted_ids}, message="Delete OK.")
+
+
 @router.post("/customers/create", status_code=status.HTTP_200_OK)
 async def create_customer(
     form_data: record_schemas.CustomerCreateSchema,
@@ -272,13 +351,24 @@ async def update_customer(
 
 @router.get("/customers/list", status_code=status.HTTP_200_OK)
 async def list_customers(
-    db: AsyncSession = Depends(get_db), start_index: int = 0, batch_size: int = 30
+    db: AsyncSession = Depends(get_db),
+    start_index: int = 0,
+    batch_size: int = 30,
+    pagination: PaginationModeEnum = PaginationModeEnum.OFFSET,
+    cursor: Optional[str] = None,
+    sort_key: str = "id",
+    descending: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT,
 ) -> record_schemas.RequestResponseWithCount:
     """
     List all customers.
 
     Args:
         db (AsyncSession): The database session.
+        pagination (PaginationModeEnum): `offset` uses start_index, `cursor` uses cursor.
+        cursor (str, optional): The `next_cursor` of the previous page in cursor mode.
+        sort_key (str): Column to order by in cursor mode.
+        count_mode (CountModeEnum): `has_more` skips the exact total count.
 
     Returns:
         APIResponse: A list of customer objects.
@@ -289,6 +379,11 @@ async def list_customers(
         records = await customer_service.get_all_denorm_with_count(
             start_index=start_index,
             batch_size=batch_size,
+            keyset=pagination == PaginationModeEnum.CURSOR,
+            cursor=cursor,
+            sort_key=sort_key,
+            descending=descending,
+            exact_count=count_mode == CountModeEnum.EXACT,
         )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -298,6 +393,8 @@ async def list_customers(
         record_list.append(data)
     return record_schemas.RequestResponseWithCount(
         total_count=records["total_count"],
+        next_cursor=records["next_cursor"],
+        has_more=records["has_more"],
         records=[
             record_schemas.CustomerViewSchema.model_validate(record)
             for record in record_list
@@ -325,6 +422,85 @@ async def delete_customer(
         )
 
 
+@router.post("/customers/bulk-create", status_code=status.HTTP_200_OK)
+async def bulk_create_customers(
+    form_data: List[record_schemas.CustomerCreateSchema],
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Create many customer records in one transaction.
+
+    Args:
+        form_data (List[CustomerCreateSchema]): The records to create.
+        db (AsyncSession): The database session.
+
+    Returns:
+        APIResponse: The ids of the created records, in request order.
+    """
+    try:
+        service = CustomerService(db)
+        created_ids = await service.bulk_create(form_data)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(
+        response={"created_ids": created_ids},
+        message=f"{len(created_ids)} customer records created successfully",
+    )
+
+
+@router.post("/customers/bulk-upsert", status_code=status.HTTP_200_OK)
+async def bulk_upsert_customers(
+    form_data: List[record_schemas.CustomerUpsertSchema],
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Create or update many customer records in one transaction.
+
+    Args:
+        form_data (List[CustomerUpsertSchema]): The records to create or update.
+        db (AsyncSession): The database session.
+
+    Returns:
+        APIResponse: The ids of the created or updated records, in request order.
+    """
+    try:
+        service = CustomerService(db)
+        upserted_ids = await service.bulk_upsert(form_data)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(
+        response={"upserted_ids": upserted_ids},
+        message=f"{len(upserted_ids)} customer records saved successfully",
+    )
+
+
+@router.post("/customers/bulk-delete", status_code=status.HTTP_200_OK)
+async def bulk_delete_customers(
+    form_data: record_schemas.BulkDeleteSchema,
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Delete many customer records in one transaction. Nothing is deleted
+    if any of the records is still referenced.
+
+    Returns:
+        APIResponse: The ids that existed and were deleted.
+    """
+    service = CustomerService(db)
+    try:
+        deleted_ids = await service.bulk_delete_by_ids(form_data.ids)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="One or more records are still referenced and cannot be deleted.",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+    return APIResponse(response={"deleted_ids": deleted_ids}, message="Delete OK.")
+
+
 @router.post("/areas/create", status_code=status.HTTP_200_OK)
 async def create_area(
     form_data: record_schemas.AreaCreateSchema, db: AsyncSession = Depends(get_db)
@@ -357,7 +533,9 @@ async def create_area(
 
 @router.patch("/areas/update/{area_id}", status_code=status.HTTP_200_OK)
 async def update_area(
-    area_id: int, db=Depends(get_db), update_data=record_schemas.AreaUpdateSchema
+    area_id: int,
+    update_data: record_schemas.AreaUpdateSchema,
+    db=Depends(get_db),
 ) -> APIResponse:
     """
     Update an existing area record.
@@ -372,6 +550,8 @@ async def update_area(
     """
     try:
         area_service = AreaService(db)
+        if isinstance(update_data.logo, str):
+            update_data.logo = area_service.decode_base64_image(update_data.logo)
         updated_record = await area_service.update(area_id, update_data)  # type: ignore
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -387,13 +567,24 @@ async def update_area(
 
 @router.get("/areas/list", status_code=status.HTTP_200_OK)
 async def list_areas(
-    db: AsyncSession = Depends(get_db), start_index: int = 0, batch_size: int = 30
+    db: AsyncSession = Depends(get_db),
+    start_index: int = 0,
+    batch_size: int = 30,
+    pagination: PaginationModeEnum = PaginationModeEnum.OFFSET,
+    cursor: Optional[str] = None,
+    sort_key: str = "id",
+    descending: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT,
 ) -> record_schemas.RequestResponseWithCount:
     """
     List all areas.
 
     Args:
         db (AsyncSession): The database session.
+        pagination (PaginationModeEnum): `offset` uses start_index, `cursor` uses cursor.
+        cursor (str, optional): The `next_cursor` of the previous page in cursor mode.
+        sort_key (str): Column to order by in cursor mode.
+        count_mode (CountModeEnum): `has_more` skips the exact total count.
 
     Returns:
         APIResponse: A list of area objects.
@@ -404,23 +595,32 @@ async def list_areas(
         records = await area_service.get_all_denorm_with_count(
             start_index=start_index,
             batch_size=batch_size,
+            keyset=pagination == PaginationModeEnum.CURSOR,
+            cursor=cursor,
+            sort_key=sort_key,
+            descending=descending,
+            exact_count=count_mode == CountModeEnum.EXACT,
         )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     for record in records["records"]:
-        data = {}
-        for column in record.__table__.columns:
-            value = getattr(record, column.name)
-
-            if isinstance(value, (bytes, bytearray)):
-                value = area_service.bytes_to_base64(value)
-            elif value == b"":  # optional safety
-                value = None
-            data[column.name] = value
+        # The logo blob is deferred; the page only carries its URL and hash
+        data = {
+            c.name: getattr(record, c.name)
+            for c in record.__table__.columns
+            if c.name != "logo"
+        }
+        data["logo"] = (
+            area_service.logo_url(record.id, record.logo_hash)
+            if record.has_logo
+            else None
+        )
         record_list.append(data)
     return record_schemas.RequestResponseWithCount(
         total_count=records["total_count"],
+        next_cursor=records["next_cursor"],
+        has_more=records["has_more"],
         records=[
             record_schemas.AreaViewSchema.model_validate(record)
             for record in record_list
@@ -428,6 +628,57 @@ async def list_areas(
     )
 
 
+@router.get("/areas/{area_id}/logo", status_code=status.HTTP_200_OK)
+async def get_area_logo(
+    area_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Serve the raw logo bytes of an area.
+
+    The ETag is the logo's content hash, so a matching If-None-Match is
+    answered with 304 without reading the blob. Versioned URLs (`?v=<hash>`,
+    as returned by the area list) are cacheable for a year.
+    """
+    area_service = AreaService(db)
+    info = await area_service.get_logo_hash(area_id)
+    if not info or not info.has_logo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Area ID = {area_id} has no logo.",
+        )
+
+    logo_hash = info.logo_hash
+    logo = None
+    if not logo_hash:
+        # Logos saved before hashes were stored
+        logo, _ = await area_service.get_logo(area_id)
+        logo_hash = area_service.logo_content_hash(logo)
+
+    etag = f'"{logo_hash}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            "public, max-age=31536000, immutable"
+            if v == logo_hash
+            else "public, no-cache"
+        ),
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if logo is None:
+        logo, _ = await area_service.get_logo(area_id)
+    return Response(
+        content=logo,
+        media_type=area_service.sniff_image_mime_type(logo),
+        headers=headers,
+    )
+
+
 @router.delete("/areas/delete/{area_id}", status_code=status.HTTP_200_OK)
 async def delete_area(area_id: int, db: AsyncSession = Depends(get_db)) -> APIResponse:
     service = AreaService(db)
@@ -446,6 +697,91 @@ async def delete_area(area_id: int, db: AsyncSession = Depends(get_db)) -> APIRe
         )
 
 
+@router.post("/areas/bulk-create", status_code=status.HTTP_200_OK)
+async def bulk_create_areas(
+    form_data: List[record_schemas.AreaCreateSchema],
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Create many area records in one transaction.
+
+    Args:
+        form_data (List[AreaCreateSchema]): The records to create.
+        db (AsyncSession): The database session.
+
+    Returns:
+        APIResponse: The ids of the created records, in request order.
+    """
+    try:
+        service = AreaService(db)
+        for item in form_data:
+            if item.logo:
+                item.logo = service.decode_base64_image(item.logo)
+        created_ids = await service.bulk_create(form_data)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(
+        response={"created_ids": created_ids},
+        message=f"{len(created_ids)} area records created successfully",
+    )
+
+
+@router.post("/areas/bulk-upsert", status_code=status.HTTP_200_OK)
+async def bulk_upsert_areas(
+    form_data: List[record_schemas.AreaUpsertSchema],
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Create or update many area records in one transaction.
+
+    Args:
+        form_data (List[AreaUpsertSchema]): The records to create or update.
+        db (AsyncSession): The database session.
+
+    Returns:
+        APIResponse: The ids of the created or updated records, in request order.
+    """
+    try:
+        service = AreaService(db)
+        for item in form_data:
+            if item.logo:
+                item.logo = service.decode_base64_image(item.logo)
+        upserted_ids = await service.bulk_upsert(form_data)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(
+        response={"upserted_ids": upserted_ids},
+        message=f"{len(upserted_ids)} area records saved successfully",
+    )
+
+
+@router.post("/areas/bulk-delete", status_code=status.HTTP_200_OK)
+async def bulk_delete_areas(
+    form_data: record_schemas.BulkDeleteSchema,
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Delete many area records in one transaction. Nothing is deleted
+    if any of the records is still referenced.
+
+    Returns:
+        APIResponse: The ids that existed and were deleted.
+    """
+    service = AreaService(db)
+    try:
+        deleted_ids = await service.bulk_delete_by_ids(form_data.ids)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="One or more records are still referenced and cannot be deleted.",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+    return APIResponse(response={"deleted_ids": deleted_ids}, message="Delete OK.")
+
+
 @router.post("/sales-persons/create", status_code=status.HTTP_200_OK)
 async def create_sales_person(
     form_data: record_schemas.SalesPersonCreateSchema,
@@ -510,13 +846,24 @@ async def update_sales_person(
 
 @router.get("/sales-persons/list", status_code=status.HTTP_200_OK)
 async def list_sales_persons(
-    db: AsyncSession = Depends(get_db), start_index: int = 0, batch_size: int = 30
+    db: AsyncSession = Depends(get_db),
+    start_index: int = 0,
+    batch_size: int = 30,
+    pagination: PaginationModeEnum = PaginationModeEnum.OFFSET,
+    cursor: Optional[str] = None,
+    sort_key: str = "id",
+    descending: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT,
 ) -> record_schemas.RequestResponseWithCount:
     """
     List all sales persons.
 
     Args:
         db (AsyncSession): The database session.
+        pagination (PaginationModeEnum): `offset` uses start_index, `cursor` uses cursor.
+        cursor (str, optional): The `next_cursor` of the previous page in cursor mode.
+        sort_key (str): Column to order by in cursor mode.
+        count_mode (CountModeEnum): `has_more` skips the exact total count.
 
     Returns:
         APIResponse: A list of sales person objects.
@@ -527,6 +874,11 @@ async def list_sales_persons(
         records = await sales_person_service.get_all_denorm_with_count(
             start_index=start_index,
             batch_size=batch_size,
+            keyset=pagination == PaginationModeEnum.CURSOR,
+            cursor=cursor,
+            sort_key=sort_key,
+            descending=descending,
+            exact_count=count_mode == CountModeEnum.EXACT,
         )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -536,6 +888,8 @@ async def list_sales_persons(
         record_list.append(data)
     return record_schemas.RequestResponseWithCount(
         total_count=records["total_count"],
+        next_cursor=records["next_cursor"],
+        has_more=records["has_more"],
         records=[
             record_schemas.SalesPersonViewSchema.model_validate(record)
             for record in record_list
@@ -563,3 +917,82 @@ async def delete_sales_person(
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
         )
+
+
+@router.post("/sales-persons/bulk-create", status_code=status.HTTP_200_OK)
+async def bulk_create_sales_persons(
+    form_data: List[record_schemas.SalesPersonCreateSchema],
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Create many sales person records in one transaction.
+
+    Args:
+        form_data (List[SalesPersonCreateSchema]): The records to create.
+        db (AsyncSession): The database session.
+
+    Returns:
+        APIResponse: The ids of the created records, in request order.
+    """
+    try:
+        service = SalesPersonService(db)
+        created_ids = await service.bulk_create(form_data)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(
+        response={"created_ids": created_ids},
+        message=f"{len(created_ids)} sales person records created successfully",
+    )
+
+
+@router.post("/sales-persons/bulk-upsert", status_code=status.HTTP_200_OK)
+async def bulk_upsert_sales_persons(
+    form_data: List[record_schemas.SalesPersonUpsertSchema],
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Create or update many sales person records in one transaction.
+
+    Args:
+        form_data (List[SalesPersonUpsertSchema]): The records to create or update.
+        db (AsyncSession): The database session.
+
+    Returns:
+        APIResponse: The ids of the created or updated records, in request order.
+    """
+    try:
+        service = SalesPersonService(db)
+        upserted_ids = await service.bulk_upsert(form_data)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(
+        response={"upserted_ids": upserted_ids},
+        message=f"{len(upserted_ids)} sales person records saved successfully",
+    )
+
+
+@router.post("/sales-persons/bulk-delete", status_code=status.HTTP_200_OK)
+async def bulk_delete_sales_persons(
+    form_data: record_schemas.BulkDeleteSchema,
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Delete many sales person records in one transaction. Nothing is deleted
+    if any of the records is still referenced.
+
+    Returns:
+        APIResponse: The ids that existed and were deleted.
+    """
+    service = SalesPersonService(db)
+    try:
+        deleted_ids = await service.bulk_delete_by_ids(form_data.ids)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="One or more records are still referenced and cannot be deleted.",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+    return APIResponse(response={"deleted_ids": deleted_ids}, message="Delete OK.")
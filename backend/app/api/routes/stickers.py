@@ -1,31 +1,209 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+import logging
+import os
+import tempfile
+from email.utils import formatdate
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
+from starlette.background import BackgroundTask
 from app.schemas.users import UserPublic
 from app.schemas import sticker as sticker_schemas
-from app.schemas.generic import APIResponse
+from app.schemas.generic import APIResponse, PaginationModeEnum, CountModeEnum
 from app.core.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.user_service import get_current_user
-from app.services.sticker_service import StickerGeneratorService, StickerStorageService
+from app.services.sticker_service import (
+    StickerGeneratorService,
+    StickerStorageService,
+    request_sticker_data,
+)
 from app.services.sticker_crud_service import (
     StickerCanvasCrudService,
     StickerCrudService,
 )
+from app.core.cache import is_not_modified
+from app.core.config import get_settings
+from app.models.stickers import StickerRenderJob
+from app.services.sticker_bulk_service import StickerBulkDownloadService
+from app.services.sticker_job_service import StickerJobService
+from app.services.storage_gc_service import StorageGcService
+from app.core.render_pool import render_pool, RenderPoolSaturated, RenderPoolTimeout
 from app.core.types import *
 
+settings = get_settings()
+logger = logging.getLogger("uvicorn.error")
+
 router = APIRouter(prefix="/sticker-service", tags=["stickers"])
 
 
+def _job_accepted(job: StickerRenderJob) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(
+            APIResponse(
+                response={"job_id": job.id, "status": job.status},
+                message=f"Render job {job.id} queued.",
+            )
+        ),
+        headers={"Location": f"{settings.prefix}/sticker-service/jobs/{job.id}"},
+    )
+
+
+async def _render(render: Awaitable[Any]) -> Any:
+    """Await a render in the worker pool; an overloaded pool answers 429 or 503."""
+    try:
+        return await render
+    except RenderPoolSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except RenderPoolTimeout as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _byte_range(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    The (start, end exclusive) of a single-range `Range: bytes=...` header.
+    None means the whole document (no or multiple ranges, which a server may
+    ignore); a range outside the document raises ValueError.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    ranges = range_header.removeprefix("bytes=").split(",")
+    if len(ranges) != 1:
+        return None
+    first, _, last = ranges[0].strip().partition("-")
+    try:
+        if not first:
+            start, end = max(0, size - int(last)), size
+        else:
+            start = int(first)
+            end = min(size, int(last) + 1) if last else size
+    except ValueError:
+        return None
+    if start >= size or start >= end:
+        raise ValueError("Range not satisfiable.")
+    return start, end
+
+
+async def _document_response(
+    request: Request,
+    relative_path: Optional[str],
+    filename: str,
+    content_disposition: str,
+) -> Response:
+    """
+    Stream a stored document, with Range support, ETag and Last-Modified; a
+    matching If-None-Match / If-Modified-Since is answered with 304.
+
+    Local files are served by FileResponse (chunked reads off the event loop).
+    Object-store documents are redirected to a presigned URL when enabled,
+    otherwise streamed from the bucket without buffering the whole PDF.
+    """
+    if not relative_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No document generated yet."
+        )
+    storage = StickerStorageService().storage
+    headers = {
+        "Content-Disposition": f"{content_disposition}; filename={filename}",
+        # The document behind a canvas URL changes when it is re-rendered
+        "Cache-Control": "private, no-cache",
+    }
+    if (
+        storage.local_path(relative_path) is None
+        and settings.sticker_s3_presigned_downloads
+    ):
+        url = await storage.presigned_url(relative_path, filename, content_disposition)
+        if url:
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    try:
+        stored = await storage.stat(relative_path)
+    except FileNotFoundError as e:
+        # The error names the storage location, which is not for clients
+        logger.warning(f"Stored document missing: {relative_path} ({e})")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found."
+        )
+    headers["ETag"] = stored.etag
+    headers["Last-Modified"] = formatdate(stored.last_modified, usegmt=True)
+    if is_not_modified(request, headers["ETag"], headers["Last-Modified"]):
+        del headers["Content-Disposition"]
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = storage.local_path(relative_path)
+    if path is not None:
+        # FileResponse serves Range requests itself
+        return FileResponse(path, media_type="application/pdf", headers=headers)
+
+    headers["Accept-Ranges"] = "bytes"
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range in (headers["ETag"], headers["Last-Modified"]):
+        try:
+            byte_range = _byte_range(request.headers.get("range"), stored.size)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                detail=str(e),
+                headers={"Content-Range": f"bytes */{stored.size}"},
+            )
+    start, end = byte_range or (0, stored.size)
+    headers["Content-Length"] = str(end - start)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{stored.size}"
+    return StreamingResponse(
+        storage.iter_bytes(relative_path, start, end),
+        status_code=(
+            status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+        ),
+        media_type="application/pdf",
+        headers=headers,
+    )
+
+
 @router.post(
     "/legacy-create",
     status_code=status.HTTP_200_OK,
 )
 async def legacy_create_sticker_canvas(
     form: sticker_schemas.LStickerRequestForm,
+    run_async: bool = False,
+    db: AsyncSession = Depends(get_db),
     _user: UserPublic = Depends(get_current_user),
 ) -> Response:
-    """Legacy endpoint for creating sticker canvas manually via Appian WebAPI."""
-    sticker_pdf_bytes: bytes = await StickerGeneratorService().generate_pdf(
-        data=[sticker.model_dump() for sticker in form.data]
+    """
+    Legacy endpoint for creating sticker canvas manually via Appian WebAPI.
+    With `run_async`, a render job is queued and its id returned (202).
+    """
+    if run_async:
+        job = await StickerJobService(db).submit(
+            "legacy",
+            {
+                "data": [sticker.model_dump() for sticker in form.data],
+                "canvasAppianId": form.canvasAppianId,
+            },
+            created_by=_user.username,
+        )
+        return _job_accepted(job)
+    sticker_pdf_bytes: bytes = await _render(
+        StickerGeneratorService().generate_pdf(
+            data=[sticker.model_dump() for sticker in form.data]
+        )
     )
     canvas_appian_id = form.canvasAppianId
     return Response(
@@ -62,13 +240,17 @@ async def create_sticker_canvas(
         # Flush so PK is assigned
         await db.flush()
 
-        # --- create stickers ---
-        for sticker in form.stickers:
-            sticker_with_canvas = sticker_schemas.StickerCreate(
-                request_id=sticker.request_id,
-                sticker_canvas_id=new_canvas.id,  # type: ignore
-            )
-            await sticker_service.create_no_commit(sticker_with_canvas)
+        # --- create stickers (one multi-row INSERT) ---
+        await sticker_service.bulk_create(
+            [
+                sticker_schemas.StickerCreate(
+                    request_id=sticker.request_id,
+                    sticker_canvas_id=new_canvas.id,  # type: ignore
+                )
+                for sticker in form.stickers
+            ],
+            commit=False,
+        )
 
     # Refresh after commit
     await db.refresh(new_canvas)
@@ -86,17 +268,33 @@ async def create_sticker_canvas(
 async def list_sticker_canvases(
     start_index: int = 0,
     batch_size: int = 10,
+    pagination: PaginationModeEnum = PaginationModeEnum.OFFSET,
+    cursor: Optional[str] = None,
+    sort_key: str = "id",
+    descending: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT,
     db: AsyncSession = Depends(get_db),
 ) -> sticker_schemas.StickerCanvasResponseWithCount:
-    """List sticker canvases with pagination."""
+    """List sticker canvases with offset or cursor pagination."""
     sticker_canvas_service = StickerCanvasCrudService(db)
     record_list = []
-    records = await sticker_canvas_service.get_all_denorm_with_count(
-        start_index=start_index,
-        batch_size=batch_size,
-        relationships=["stickers"],
-    )
+    try:
+        records = await sticker_canvas_service.get_all_denorm_with_count(
+            start_index=start_index,
+            batch_size=batch_size,
+            relationships=["stickers"],
+            keyset=pagination == PaginationModeEnum.CURSOR,
+            cursor=cursor,
+            sort_key=sort_key,
+            descending=descending,
+            exact_count=count_mode == CountModeEnum.EXACT,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+    stale_ids = await sticker_canvas_service.get_stale_canvas_ids(
+        [record.id for record in records["records"]]
+    )
     for record in records["records"]:
         data = {c.name: getattr(record, c.name) for c in record.__table__.columns}
         if hasattr(record, "stickers"):
@@ -104,9 +302,13 @@ async def list_sticker_canvases(
                 sticker_schemas.StickerView.model_validate(sticker)
                 for sticker in record.stickers
             ]
+        if record.relative_file_path:
+            data["document_stale"] = record.id in stale_ids
         record_list.append(data)
     return sticker_schemas.StickerCanvasResponseWithCount(
         total_count=records["total_count"],
+        next_cursor=records["next_cursor"],
+        has_more=records["has_more"],
         records=[
             sticker_schemas.StickerCanvasView.model_validate(record)
             for record in record_list
@@ -135,6 +337,9 @@ async def get_sticker_canvas(
             sticker_schemas.StickerView.model_validate(sticker)
             for sticker in record.stickers
         ]
+    if record.relative_file_path:
+        stale_ids = await sticker_canvas_service.get_stale_canvas_ids([record.id])
+        data["document_stale"] = record.id in stale_ids
     return sticker_schemas.StickerCanvasView.model_validate(data)
 
 
@@ -144,9 +349,14 @@ async def delete_sticker_canvas(
     relative_path: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ) -> APIResponse:
+    """
+    Delete a canvas and its document, unless a render job still serves that
+    document. `relative_path` is ignored (kept for older clients): the
+    document is the one stored on the canvas.
+    """
     service = StickerCanvasCrudService(db)
     try:
-        op = await service.delete_by_id(sticker_canvas_id, relative_path)
+        op = await service.delete_by_id(sticker_canvas_id)
         if not op:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -166,102 +376,239 @@ async def delete_sticker_canvas(
 async def generate_sticker_pdf(
     sticker_canvas_id: int,
     preview_only: bool = False,
+    run_async: bool = False,
+    force: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
+    """
+    Render a canvas and store the PDF as its document (or only return it with
+    `preview_only`). With `run_async`, a render job is queued and its id
+    returned (202); the canvas document is set when the job completes.
+
+    When the canvas document was rendered from the same stickers, request
+    fields and logos, it is returned as is unless `force` is set.
+    """
+    service = StickerCanvasCrudService(db)
+    if run_async and not preview_only:
+        if not await service.get_by_id(sticker_canvas_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Sticker canvas ID = {sticker_canvas_id} cannot be found.",
+            )
+        job = await StickerJobService(db).submit(
+            "canvas", {"sticker_canvas_id": sticker_canvas_id, "force": force}
+        )
+        return _job_accepted(job)
 
-    try:
-        service = StickerCanvasCrudService(db)
-        storage_service = StickerStorageService()
-        sticker_canvas = await service.get_canvas_with_stickers_and_requests(
-            sticker_canvas_id
+    if not preview_only:
+        document_info, rendered = await _render(
+            service.render_document(sticker_canvas_id, force=force)
+        )
+        return APIResponse(
+            response={"document_id": document_info.document_id, "rendered": rendered},
+            message=(
+                "New document generated." if rendered else "Document is up to date."
+            ),
         )
 
+    try:
+        sticker_inputs = await service.get_sticker_inputs(sticker_canvas_id)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    if not sticker_canvas:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Sticker canvas has empty stickers.",
-        )
+    pdf_bytes: bytes = await _render(
+        StickerGeneratorService().generate_pdf(data=sticker_inputs)
+    )
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": (
+                f"inline; filename=sticker_canvas_{sticker_canvas_id}.pdf"
+            )
+        },
+    )
 
-    if not sticker_canvas.stickers:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No stickers found in this canvas.",
+
+@router.post("/batch-pdf", status_code=status.HTTP_200_OK, response_model=None)
+async def generate_batch_sticker_pdf(
+    form: sticker_schemas.StickerBatchRenderForm,
+    content_disposition: str = "inline",
+    run_async: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Render the stickers of many canvases, and/or one sticker per request of an
+    ad-hoc list, into a single multi-page print-ready PDF.
+
+    The PDF is written to a temporary file by the render pool and streamed
+    from there; the page count is returned in `X-Page-Count`. With
+    `run_async`, a render job is queued and its id returned (202).
+    """
+    if run_async:
+        job = await StickerJobService(db).submit("batch", form.model_dump())
+        return _job_accepted(job)
+
+    try:
+        requests = await StickerCanvasCrudService(db).get_batch_requests(
+            form.canvas_ids, form.request_ids
         )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    sticker_inputs = []
-    for sticker in sticker_canvas.stickers:
-        req = sticker.requests
-        customer_name = req.customer.name if req.customer else ""
-        logo = req.area.logo if req.area else bytes()
-        sticker_inputs.append(
-            {
-                "customer": customer_name,
-                "product": req.short_description,
-                "description": req.long_description,
-                "labRefNo": req.ref_no,
-                "quantity": str(req.quantity),
-                "logo": logo,
-            }
+    sticker_inputs = [request_sticker_data(req) for req in requests]
+    fd, path = tempfile.mkstemp(prefix="sticker-batch-", suffix=".pdf")
+    os.close(fd)
+    try:
+        pages: int = await _render(
+            StickerGeneratorService().generate_document(sticker_inputs, path)
         )
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"{content_disposition}; filename=sticker-batch.pdf",
+            "X-Page-Count": str(pages),
+        },
+        background=BackgroundTask(os.remove, path),
+    )
 
-    pdf_bytes: bytes = await StickerGeneratorService().generate_pdf(data=sticker_inputs)
 
-    if preview_only:
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
+@router.post("/bulk-download", status_code=status.HTTP_200_OK, response_model=None)
+async def bulk_download_sticker_canvases(
+    form: sticker_schemas.StickerBulkDownloadForm,
+    content_disposition: str = "attachment",
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Download many canvases at once, by id or by `created_on` range.
+
+    `zip` streams an archive of the canvas documents, built entry by entry
+    from storage; canvases without a document are rendered on the way.
+    `pdf` renders one merged print-ready PDF (each canvas on a new page) to a
+    temporary file and streams it; skipped empty canvases are listed in
+    `X-Skipped-Canvases`.
+    """
+    service = StickerBulkDownloadService(db)
+    try:
+        canvases = await service.get_canvas_documents(
+            form.canvas_ids, form.created_from, form.created_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if form.format == sticker_schemas.BulkDownloadFormatEnum.ZIP:
+        return StreamingResponse(
+            service.iter_zip(canvases),
+            media_type="application/zip",
             headers={
-                "Content-Disposition": (
-                    f"inline; filename=sticker_canvas_{sticker_canvas_id}.pdf"
-                )
+                "Content-Disposition": f"{content_disposition}; filename=sticker-canvases.zip",
+                "X-Canvas-Count": str(len(canvases)),
             },
         )
 
-    document_info = await storage_service.save_document_bytes(pdf_bytes=pdf_bytes)
-
-    update_dto = sticker_schemas.StickerCanvasUpdate(
-        document_id=document_info.document_id,
-        relative_file_path=document_info.path,
+    fd, path = tempfile.mkstemp(prefix="sticker-bulk-", suffix=".pdf")
+    os.close(fd)
+    try:
+        pages, skipped = await _render(service.render_merged_pdf(canvases, path))
+    except BaseException:
+        os.remove(path)
+        raise
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"{content_disposition}; filename=sticker-canvases.pdf",
+            "X-Page-Count": str(pages),
+            "X-Skipped-Canvases": ",".join(str(canvas_id) for canvas_id in skipped),
+        },
+        background=BackgroundTask(os.remove, path),
     )
 
-    update_dto.document_id = document_info.document_id
-    update_dto.relative_file_path = document_info.path
 
-    _ = await service.update(sticker_canvas_id, update_dto)
-    return APIResponse(
-        response={"document_id": document_info.document_id},
-        message="New document generated.",
+@router.get("/jobs/{job_id}", status_code=status.HTTP_200_OK)
+async def get_render_job(
+    job_id: int, db: AsyncSession = Depends(get_db)
+) -> sticker_schemas.StickerRenderJobView:
+    """Status of a render job; poll until it is COMPLETED (1) or FAILED (-1)."""
+    job = await StickerJobService(db).get_by_id(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Render job ID = {job_id} cannot be found.",
+        )
+    return sticker_schemas.StickerRenderJobView.model_validate(job)
+
+
+@router.get("/jobs/{job_id}/document", status_code=status.HTTP_200_OK)
+async def download_render_job_document(
+    job_id: int,
+    request: Request,
+    content_disposition: str = "attachment",
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """The PDF of a completed render job (409 while it is not completed)."""
+    job = await StickerJobService(db).get_by_id(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Render job ID = {job_id} cannot be found.",
+        )
+    if job.status != sticker_schemas.LStickerJobStatus.COMPLETED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Render job ID = {job_id} is {sticker_schemas.LStickerJobStatus(job.status).name}.",
+        )
+    return await _document_response(
+        request,
+        job.relative_file_path,  # type: ignore
+        f"sticker-job-{job_id}.pdf",
+        content_disposition,
     )
 
 
+@router.get("/storage-usage", status_code=status.HTTP_200_OK)
+async def get_storage_usage(
+    db: AsyncSession = Depends(get_db),
+    _user: UserPublic = Depends(get_current_user),
+) -> APIResponse:
+    """
+    Diagnostics: stored documents and bytes, split into referenced, within the
+    GC grace period and orphaned (what the next GC run would delete).
+    """
+    report = await StorageGcService(db).collect(dry_run=True)
+    return APIResponse(response=report.as_dict())
+
+
+@router.get("/render-metrics", status_code=status.HTTP_200_OK)
+async def get_render_metrics(
+    _user: UserPublic = Depends(get_current_user),
+) -> APIResponse:
+    """Diagnostics: render pool load, rejections, queue wait and render times."""
+    return APIResponse(response=render_pool.metrics())
+
+
 @router.get("/document/{sticker_canvas_id}", status_code=status.HTTP_200_OK)
 async def download_sticker_canvas(
     sticker_canvas_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     content_disposition: str = "attachment",
 ) -> Response:
-    try:
-        storage_service = StickerStorageService()
-        crud_service = StickerCanvasCrudService(db)
-        canvas = await crud_service.get_by_id(sticker_canvas_id)
-        if not canvas:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Sticker canvas ID = {sticker_canvas_id} cannot be found.",
-            )
-        relative_path = getattr(canvas, "relative_file_path")
-        pdf_bytes = await storage_service.get_document_by_id(relative_path)
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"{content_disposition}; filename=sticker-canvas-{sticker_canvas_id}.pdf"
-            },
-        )
-    except Exception as e:
+    """The canvas document, streamed; supports Range and conditional requests."""
+    canvas = await StickerCanvasCrudService(db).get_by_id(sticker_canvas_id)
+    if not canvas:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Sticker canvas ID = {sticker_canvas_id} cannot be found.",
         )
+    return await _document_response(
+        request,
+        getattr(canvas, "relative_file_path"),
+        f"sticker-canvas-{sticker_canvas_id}.pdf",
+        content_disposition,
+    )
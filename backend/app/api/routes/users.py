@@ -8,6 +8,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.user_service import create_user, login_user
 from jose import jwt, JWTError
 from app.core.config import get_settings
+from app.core.login_throttle import (
+    LoginThrottled,
+    client_ip_resolver,
+    login_throttle,
+)
+from app.core.passwords import PasswordHasherBusy
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -33,7 +39,14 @@ async def register_user(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists"
         )
-    db_user = await create_user(user_repo, user)
+    try:
+        db_user = await create_user(user_repo, user)
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="User creation failed"
@@ -50,6 +63,7 @@ async def register_user(
 
 @router.post("/login", response_model=LoginResponse)
 async def authenticate_user(
+    request: Request,
     response: Response,
     user: UserLogin,
     db: AsyncSession = Depends(get_db),
@@ -57,6 +71,11 @@ async def authenticate_user(
     """
     Authenticate a user.
 
+    Usernames and client IPs with too many recent failed attempts get a 429
+    before any password check (client IPs only once `login_trusted_proxies`
+    is set); when every hashing thread is busy and the login queue is full,
+    a 503. Both carry Retry-After.
+
     Args:
         user (UserBase): The user data to authenticate.
         db (AsyncSession): The database session.
@@ -64,13 +83,33 @@ async def authenticate_user(
     Returns:
         User: The authenticated user object.
     """
+    client_ip = client_ip_resolver.resolve(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+    )
     user_repo = UserRepository(db)
-    login_result = await login_user(user_repo, user.username, user.password)
+    try:
+        login_throttle.check(user.username, client_ip)
+        login_result = await login_user(user_repo, user.username, user.password)
+    except LoginThrottled as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     if not login_result:
+        login_throttle.failed(user.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Unauthorized account or invalid credentials.",
         )
+    login_throttle.succeeded(user.username)
     user_data = login_result.get("user", dict())
     access_token = login_result.get("access_token", "")
     response.set_cookie(
@@ -1,29 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from app.schemas.generic import APIResponse
+from app.core.cache import response_cache
 from app.core.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.util_service import UtilService
+from app.services.user_service import get_current_user
+from app.schemas.users import UserPublic
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
 
+# Reference data changes rarely: serve it through the shared response cache,
+# invalidated by committed writes to customers, areas and sales persons.
+_REFERENCE_SCOPES = ["reference"]
+
+
 @router.get("/dropdown-values", status_code=status.HTTP_200_OK)
 async def get_dropdown_values(
-    category: str, db: AsyncSession = Depends(get_db)
+    category: str, request: Request, db: AsyncSession = Depends(get_db)
 ) -> APIResponse:
     service = UtilService(db)
-    try:
+
+    async def compute() -> APIResponse:
         dropdown_values = await service.get_dropdown_values(category)
         return APIResponse(response={"category": category, "values": dropdown_values})
+
+    try:
+        return await response_cache.respond(request, _REFERENCE_SCOPES, compute)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get("/all-dropdown-values", status_code=status.HTTP_200_OK)
-async def get_all_dropdown_values(db: AsyncSession = Depends(get_db)) -> APIResponse:
+async def get_all_dropdown_values(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> APIResponse:
+    service = UtilService(db)
+
+    async def compute() -> APIResponse:
+        return APIResponse(response=await service.get_all_dropdown_values())
+
+    try:
+        return await response_cache.respond(request, _REFERENCE_SCOPES, compute)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/typeahead", status_code=status.HTTP_200_OK)
+async def typeahead(
+    category: str,
+    request: Request,
+    search: str = "",
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """
+    Reference values of a category matching what the user typed so far.
+
+    Args:
+        category (str): `customer`, `area` or `salesperson`.
+        search (str): Every word must prefix a word of the name; empty lists all.
+        limit (int): Page size, 1 to 50.
+        cursor (str, optional): The `next_cursor` of the previous page.
+    """
+    service = UtilService(db)
+
+    async def compute() -> APIResponse:
+        return APIResponse(
+            response=await service.typeahead(category, search, limit, cursor)
+        )
+
+    try:
+        return await response_cache.respond(request, _REFERENCE_SCOPES, compute)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/typeahead-all", status_code=status.HTTP_200_OK)
+async def typeahead_all(
+    request: Request,
+    search: str = "",
+    limit: int = 5,
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse:
+    """First `limit` typeahead matches of `search` in every category."""
+    service = UtilService(db)
+
+    async def compute() -> APIResponse:
+        return APIResponse(response=await service.typeahead_all(search, limit))
+
+    try:
+        return await response_cache.respond(request, _REFERENCE_SCOPES, compute)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/database-profile", status_code=status.HTTP_200_OK)
+async def get_database_profile(
+    db: AsyncSession = Depends(get_db),
+    _user: UserPublic = Depends(get_current_user),
+) -> APIResponse:
+    """Diagnostics: active pool sizing and SQLite PRAGMA values."""
     service = UtilService(db)
     try:
-        all_values = await service.get_all_dropdown_values()
-        return APIResponse(response=all_values)
+        profile = await service.get_database_profile()
+        return APIResponse(response=profile)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
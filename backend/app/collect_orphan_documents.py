@@ -0,0 +1,33 @@
+# delete the stored sticker documents that no canvas or render job references
+# (once older than the GC grace period) and print the storage usage report;
+# with --dry-run, only report what would be deleted
+
+import argparse
+import asyncio
+from app.core.database import SessionLocal
+from app.models import *
+from app.services.storage_gc_service import StorageGcService, StorageReport
+
+
+async def collect_orphan_documents(dry_run: bool) -> StorageReport:
+    async with SessionLocal() as session:
+        return await StorageGcService(session).collect(dry_run=dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(collect_orphan_documents(args.dry_run))
+    print(f"Stored documents: {report.total_files} ({report.total_bytes} bytes)")
+    print(f"  referenced: {report.referenced_files} ({report.referenced_bytes} bytes)")
+    print(f"  in grace period: {report.recent_files} ({report.recent_bytes} bytes)")
+    print(f"  orphaned: {report.orphaned_files} ({report.orphaned_bytes} bytes)")
+    if args.dry_run:
+        print("⚠️ Dry run, nothing deleted.")
+    else:
+        print(
+            f"✅ Deleted {report.deleted_files} orphaned documents, "
+            f"reclaimed {report.reclaimed_bytes} bytes; usage {report.usage_bytes} bytes."
+        )
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from itertools import count
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.types import *
+
+settings = get_settings()
+
+# Tables whose writes invalidate each cache scope
+CACHE_SCOPES: Dict[str, str] = {
+    "requests": "requests",
+    "customers": "reference",
+    "areas": "reference",
+    "sales_persons": "reference",
+}
+
+_bump_counter = count()
+
+
+class CacheVersions:
+    """
+    Version tokens of the cache scopes, shared by every worker process.
+
+    Each scope is a tiny file in `cache_dir` holding an opaque token. A write
+    replaces the token atomically with a new unique value, so readers in any
+    worker see the change on their next request without a database round trip.
+
+    `get` runs on the event loop, so tokens are kept in memory and a file is
+    only read again once its stat changes. A bump always replaces the file
+    with a new inode, so the check never misses one.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._tokens: Dict[str, tuple] = {}  # scope -> (file id, token)
+
+    def _path(self, scope: str) -> str:
+        return os.path.join(self.directory, f"{scope}.version")
+
+    def get(self, scope: str) -> str:
+        path = self._path(scope)
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            return "0"
+        file_id = (stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._tokens.get(scope)
+        if cached is not None and cached[0] == file_id:
+            return cached[1]
+        try:
+            with open(path, "r", encoding="ascii") as f:
+                token = f.read()
+        except FileNotFoundError:
+            return "0"
+        self._tokens[scope] = (file_id, token)
+        return token
+
+    def bump(self, scope: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        token = f"{time.time_ns()}-{os.getpid()}-{next(_bump_counter)}"
+        tmp_path = f"{self._path(scope)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="ascii") as f:
+            f.write(token)
+        os.replace(tmp_path, self._path(scope))
+
+
+@dataclass
+class _CacheEntry:
+    versions: tuple
+    expires_at: float
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    """
+    Per-worker cache of JSON responses with strong (content hash) ETags.
+
+    An entry is served while it is younger than `ttl` seconds and none of its
+    scopes' versions changed. A client sending the entry's ETag in
+    If-None-Match gets a 304 without the route touching the database.
+    """
+
+    def __init__(self, versions: CacheVersions, ttl: int, max_entries: int = 256):
+        self.versions = versions
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+
+    async def respond(
+        self,
+        request: Request,
+        scopes: List[str],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """
+        Serve `request` from the cache, or build the response with `compute`.
+        Exceptions raised by `compute` propagate and nothing is cached.
+        """
+        key = str(request.url)
+        versions = tuple(self.versions.get(scope) for scope in scopes)
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry.versions != versions
+            or entry.expires_at <= time.monotonic()
+        ):
+            body = json.dumps(
+                jsonable_encoder(await compute()), separators=(",", ":")
+            ).encode("utf-8")
+            entry = _CacheEntry(
+                versions=versions,
+                expires_at=time.monotonic() + self.ttl,
+                body=body,
+                etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            )
+            self._store(key, entry)
+        else:
+            self._entries.move_to_end(key)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(
+            content=entry.body, media_type="application/json", headers=headers
+        )
+
+    def _store(self, key: str, entry: _CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def is_not_modified(request: Request, etag: str, last_modified: str) -> bool:
+    """
+    Whether a conditional GET can be answered with 304. If-None-Match takes
+    precedence; If-Modified-Since is only used without it (RFC 9110 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(
+            if_modified_since
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+cache_versions = CacheVersions(str(settings.cache_dir_resolved))
+response_cache = ResponseCache(cache_versions, ttl=settings.response_cache_ttl)
+
+
+def _written_scopes(session: Session) -> set:
+    return session.info.setdefault("cache_written_scopes", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_writes(session: Session, flush_context) -> None:
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        table = getattr(obj, "__tablename__", None)
+        if table in CACHE_SCOPES:
+            _written_scopes(session).add(CACHE_SCOPES[table])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(orm_execute_state) -> None:
+    # Bulk INSERT/UPDATE/DELETE statements bypass the unit of work
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name in CACHE_SCOPES:
+        _written_scopes(orm_execute_state.session).add(CACHE_SCOPES[name])
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_written_scopes(session: Session) -> None:
+    for scope in session.info.pop("cache_written_scopes", set()):
+        cache_versions.bump(scope)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_written_scopes(session: Session, previous_transaction) -> None:
+    session.info.pop("cache_written_scopes", None)
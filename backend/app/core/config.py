@@ -3,6 +3,7 @@ from functools import lru_cache
 from pydantic import field_validator
 import json
 from pathlib import Path
+from typing import Optional
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 
@@ -14,9 +15,39 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int = 30
+    # Passwords: bcrypt cost (hashes of another cost are rehashed at login),
+    # hashing threads per app worker, logins allowed to wait for a thread
+    # (beyond that: 503) and how long they may wait
+    password_bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    login_queue_limit: int = 32
+    login_queue_timeout: float = 10
+    # Failed logins allowed per username / client IP within the window (s),
+    # counted per app worker; beyond that logins are refused with 429
+    login_max_failures_per_username: int = 5
+    login_max_failures_per_ip: int = 20
+    login_failure_window: int = 300
+    # Proxies (IPs or CIDRs, JSON list) whose X-Forwarded-For is trusted to
+    # find the client IP; while empty, failed logins are not counted per IP
+    login_trusted_proxies: list = []
     database_uri: str
     database_echo: bool
     database_connect_args: dict
+    # Connection pool (ignored for in-memory SQLite, which uses a single connection)
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: int = 30
+    database_pool_recycle: int = 1800  # seconds; server connections only
+    # PostgreSQL (asyncpg): prepared statements cached per connection
+    postgres_prepared_statement_cache_size: int = 500
+    # SQLite performance profile, applied to every new connection.
+    # WAL lets readers in other workers proceed while one writer commits.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -64000  # negative = KiB, i.e. 64 MiB per connection
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout: int = 5000  # ms to wait on a locked database
     cors_allow_origins: list = []
     cors_allow_credentials: bool
     cors_allow_methods: list
@@ -24,11 +55,64 @@ class Settings(BaseSettings):
     pdf_template_path: str = "./templates/stickers/base_template.pdf"
     sqlalchemy_default_batch_size: int = 500
     sticker_storage_dir: str = "storage/stickers"
+    # Where documents are kept: "local" (sticker_storage_dir, single node) or
+    # "s3" (an S3-compatible bucket shared by every node, e.g. MinIO)
+    sticker_storage_backend: str = "local"
+    sticker_s3_bucket: Optional[str] = None
+    sticker_s3_prefix: str = "stickers/"
+    sticker_s3_endpoint_url: Optional[str] = None
+    sticker_s3_region: Optional[str] = None
+    sticker_s3_access_key_id: Optional[str] = None
+    sticker_s3_secret_access_key: Optional[str] = None
+    # HTTP connections kept alive by the shared client, multipart upload
+    # threshold and part size (bytes)
+    sticker_s3_max_pool_connections: int = 20
+    sticker_s3_multipart_threshold: int = 8 * 1024 * 1024
+    sticker_s3_multipart_chunksize: int = 8 * 1024 * 1024
+    # Downloads redirect to a presigned URL (valid for this many seconds)
+    # instead of being streamed through the app
+    sticker_s3_presigned_downloads: bool = False
+    sticker_s3_presign_expires: int = 300
+    # Sticker PDF rendering, off the event loop: "process" or "thread" pool,
+    # renders running at once per app worker, renders allowed to wait for a
+    # free slot (beyond that: 429) and how long they may wait (then: 503)
+    sticker_render_backend: str = "process"
+    sticker_render_workers: int = 2
+    sticker_render_queue_limit: int = 16
+    sticker_render_queue_timeout: float = 30
+    # Prepared area logos kept per render process (LRU, keyed by logo hash)
+    sticker_logo_cache_size: int = 32
+    # Stickers allowed in one batch PDF (10 per page)
+    sticker_batch_max_stickers: int = 2000
+    # Bulk downloads: canvases per download, documents looked up or rendered
+    # ahead of the one being streamed
+    sticker_bulk_max_canvases: int = 500
+    sticker_bulk_concurrency: int = 4
+    # Background render jobs: worker tasks per app process, idle poll interval
+    # and job lease (s), attempts per job, first retry delay (s, then doubled)
+    sticker_job_workers: int = 2
+    sticker_job_poll_interval: float = 2
+    sticker_job_lease_seconds: int = 600
+    sticker_job_max_attempts: int = 3
+    sticker_job_retry_delay: float = 5
+    # Orphaned document GC: stored documents referenced by no canvas or render
+    # job are deleted once older than the grace period (s), checked against the
+    # database in batches; the app runs it every interval (s, 0 = never)
+    sticker_gc_interval_seconds: int = 21600
+    sticker_gc_grace_seconds: int = 86400
+    sticker_gc_batch_size: int = 500
+    # Response cache: version files shared by the workers, entry lifetime in seconds
+    cache_dir: str = "storage/cache"
+    response_cache_ttl: int = 30
     timezone: str
     model_config = SettingsConfigDict(env_file=BASE_DIR / ".env")
 
     @field_validator(
-        "cors_allow_origins", "cors_allow_methods", "cors_allow_headers", mode="before"
+        "cors_allow_origins",
+        "cors_allow_methods",
+        "cors_allow_headers",
+        "login_trusted_proxies",
+        mode="before",
     )
     def parse_json_list(cls, v):
         if isinstance(v, str):
@@ -41,12 +125,30 @@ class Settings(BaseSettings):
             return json.loads(v)
         return v
 
+    @property
+    def sqlite_pragmas(self) -> dict:
+        """PRAGMA name -> value of the SQLite profile, in the order they are applied."""
+        return {
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "cache_size": self.sqlite_cache_size,
+            "mmap_size": self.sqlite_mmap_size,
+            "temp_store": self.sqlite_temp_store,
+            "busy_timeout": self.sqlite_busy_timeout,
+        }
+
     @property
     def sticker_storage_dir_resolved(self):
         path = (BASE_DIR / self.sticker_storage_dir).resolve()
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    @property
+    def cache_dir_resolved(self):
+        path = (BASE_DIR / self.cache_dir).resolve()
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
     @property
     def base_dir(self):
         """Base DIR where .env and storage repo is located"""
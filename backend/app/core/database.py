@@ -1,28 +1,101 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from typing import AsyncGenerator
-from sqlalchemy import event
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import Table, event, text
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.engine import Connection, make_url
 from app.core.config import get_settings
 
 settings = get_settings()
+local_timezone = ZoneInfo(settings.timezone)
 
-engine = create_async_engine(
-    settings.database_uri,
-    connect_args=settings.database_connect_args,
-    echo=settings.database_echo,
-)
 
-SessionLocal = async_sessionmaker(engine)
-Base = declarative_base()
+def _engine_kwargs(database_uri: str) -> dict:
+    """
+    Dialect-specific engine options. `database_connect_args` from the
+    environment always wins over the defaults set here.
+    """
+    url = make_url(database_uri)
+    backend = url.get_backend_name()
+    connect_args: dict = {}
+    kwargs: dict = {}
+
+    if backend == "sqlite":
+        # In-memory SQLite keeps its single-connection pool
+        if url.database not in (None, "", ":memory:"):
+            kwargs.update(
+                pool_size=settings.database_pool_size,
+                max_overflow=settings.database_max_overflow,
+                pool_timeout=settings.database_pool_timeout,
+            )
+    else:
+        kwargs.update(
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=settings.database_pool_recycle,
+            pool_pre_ping=True,
+        )
+        if backend == "postgresql" and url.get_driver_name() == "asyncpg":
+            connect_args.update(
+                prepared_statement_cache_size=settings.postgres_prepared_statement_cache_size,
+                server_settings={"application_name": settings.app_name},
+            )
 
+    kwargs["connect_args"] = {**connect_args, **settings.database_connect_args}
+    return kwargs
 
-@event.listens_for(engine.sync_engine, "connect")
-def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+
+def _local_date(value: Optional[str]) -> Optional[str]:
+    """
+    SQLite `local_date(timestamp)`: the day of a UTC timestamp in the configured
+    timezone. The rollup triggers call it, so every connection registers it.
+    """
+    if value is None:
+        return None
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(local_timezone).date().isoformat()
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    dbapi_connection.create_function("local_date", 1, _local_date, deterministic=True)
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
+    for name, value in settings.sqlite_pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
     cursor.close()
 
 
+def make_engine(database_uri: str) -> AsyncEngine:
+    """An engine for `database_uri`, with the options and setup of its dialect."""
+    new_engine = create_async_engine(
+        database_uri,
+        echo=settings.database_echo,
+        **_engine_kwargs(database_uri),
+    )
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _configure_sqlite_connection)
+    return new_engine
+
+
+engine = make_engine(settings.database_uri)
+
+SessionLocal = async_sessionmaker(engine)
+Base = declarative_base()
+
+# Committed writes to cached tables bump the response cache versions
+import app.core.cache  # noqa: E402, F401
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         try:
@@ -30,3 +103,25 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception as e:
             await session.rollback()
             raise e
+
+
+def add_missing_columns(connection: Connection, table: Table, names: list) -> list:
+    """
+    Add the `names` columns of `table` that the database lacks, for databases
+    created before they existed: create_all never alters an existing table.
+    Safe to run repeatedly. The columns must be nullable.
+
+    Returns:
+        list: The names of the columns that were added.
+    """
+    existing = {c["name"] for c in sa_inspect(connection).get_columns(table.name)}
+    added = []
+    for name in names:
+        if name in existing:
+            continue
+        column_type = table.c[name].type.compile(connection.dialect)
+        connection.execute(
+            text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}")
+        )
+        added.append(name)
+    return added
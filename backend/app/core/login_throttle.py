@@ -0,0 +1,145 @@
+import ipaddress
+import time
+from collections import OrderedDict, deque
+from app.core.config import get_settings
+from app.core.types import *
+
+settings = get_settings()
+
+
+class LoginThrottled(Exception):
+    """Too many failed logins for this username or client; retry later."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _FailureLog:
+    """Failure times per key within `window` seconds, for at most `max_keys` keys."""
+
+    def __init__(self, limit: int, window: float, max_keys: int):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._failures: "OrderedDict[str, deque]" = OrderedDict()
+
+    def _recent(self, key: str, now: float) -> Optional[deque]:
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def retry_after(self, key: str, now: float) -> Optional[int]:
+        """Seconds until `key` may try again, None if it is not throttled."""
+        failures = self._recent(key, now)
+        if failures is None or len(failures) < self.limit:
+            return None
+        return max(1, int(failures[-self.limit] + self.window - now) + 1)
+
+    def add(self, key: str, now: float) -> None:
+        failures = self._recent(key, now) or deque(maxlen=self.limit)
+        failures.append(now)
+        self._failures[key] = failures
+        self._failures.move_to_end(key)
+        # Spraying many usernames must not grow the log without bound
+        while len(self._failures) > self.max_keys:
+            self._failures.popitem(last=False)
+
+    def clear(self, key: str) -> None:
+        self._failures.pop(key, None)
+
+
+class LoginThrottle:
+    """
+    Per-worker limit on failed logins, by username and by client IP.
+
+    Once a username or IP reaches its limit of failures within
+    `login_failure_window` seconds, `check` rejects its logins before any
+    password hashing, until the oldest counted failure leaves the window.
+    A successful login clears the username's failures.
+    """
+
+    def __init__(
+        self,
+        max_per_username: int,
+        max_per_ip: int,
+        window: float,
+        max_keys: int = 10000,
+    ):
+        self._by_username = _FailureLog(max_per_username, window, max_keys)
+        self._by_ip = _FailureLog(max_per_ip, window, max_keys)
+
+    def check(self, username: str, ip: Optional[str]) -> None:
+        now = time.monotonic()
+        retry_after = self._by_username.retry_after(username.lower(), now)
+        if retry_after is None and ip:
+            retry_after = self._by_ip.retry_after(ip, now)
+        if retry_after is not None:
+            raise LoginThrottled(
+                "Too many failed login attempts, retry later.", retry_after
+            )
+
+    def failed(self, username: str, ip: Optional[str]) -> None:
+        now = time.monotonic()
+        self._by_username.add(username.lower(), now)
+        if ip:
+            self._by_ip.add(ip, now)
+
+    def succeeded(self, username: str) -> None:
+        self._by_username.clear(username.lower())
+
+
+class ClientIpResolver:
+    """
+    The client IP of a request, as far as it can be trusted.
+
+    A request from one of `trusted_proxies` (IPs or CIDRs) comes from the
+    rightmost address of its X-Forwarded-For that is not a trusted proxy;
+    any other request from its peer. Without trusted proxies no IP is
+    resolved (None): behind an unknown proxy every client would share the
+    proxy's IP, and throttling it would lock everyone out.
+    """
+
+    def __init__(self, trusted_proxies: List[str]):
+        self._networks = [
+            ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies
+        ]
+
+    def _is_trusted(self, ip: str) -> bool:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self._networks)
+
+    def resolve(
+        self, peer: Optional[str], forwarded_for: Optional[str]
+    ) -> Optional[str]:
+        if not self._networks or not peer:
+            return None
+        if not self._is_trusted(peer):
+            return peer
+        hops = [hop.strip() for hop in (forwarded_for or "").split(",")]
+        for hop in reversed(hops):
+            if not self._is_trusted(hop):
+                try:
+                    return str(ipaddress.ip_address(hop))
+                except ValueError:
+                    # Malformed hop: nothing left of it can be trusted
+                    return None
+        return None
+
+
+client_ip_resolver = ClientIpResolver(settings.login_trusted_proxies)
+
+login_throttle = LoginThrottle(
+    max_per_username=settings.login_max_failures_per_username,
+    max_per_ip=settings.login_max_failures_per_ip,
+    window=settings.login_failure_window,
+)
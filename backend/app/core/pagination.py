@@ -0,0 +1,51 @@
+import base64
+import json
+from datetime import date, datetime
+from app.core.types import *
+
+
+def encode_cursor(sort_key: str, sort_value: Any, last_id: int) -> str:
+    """
+    Build an opaque keyset cursor from the last row of a page.
+
+    Args:
+        sort_key (str): The column the page is sorted on.
+        sort_value (Any): The value of the sort column on the last row.
+        last_id (int): The primary key of the last row (tie-breaker).
+
+    Returns:
+        str: URL-safe base64 encoded cursor.
+    """
+    if isinstance(sort_value, (datetime, date)):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps({"s": sort_key, "v": sort_value, "id": last_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort_key: str, python_type: type) -> tuple[Any, int]:
+    """
+    Decode a keyset cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor sent back by the client.
+        sort_key (str): The sort column the caller expects the cursor to be for.
+        python_type (type): Python type of the sort column, used to restore dates.
+
+    Returns:
+        tuple[Any, int]: The sort value and the primary key to seek after.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cursor_sort_key, sort_value, last_id = payload["s"], payload["v"], payload["id"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor.")
+
+    if cursor_sort_key != sort_key:
+        raise ValueError(
+            f"Cursor was issued for sort key '{cursor_sort_key}', not '{sort_key}'."
+        )
+    if sort_value is not None and python_type is datetime:
+        sort_value = datetime.fromisoformat(sort_value)
+    elif sort_value is not None and python_type is date:
+        sort_value = date.fromisoformat(sort_value)
+    return sort_value, int(last_id)
@@ -0,0 +1,107 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from app.core.config import get_settings
+from app.core.types import *
+
+settings = get_settings()
+
+# Hashes with any other cost than `password_bcrypt_rounds` need an update, so
+# changing the setting rehashes each password at its owner's next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.password_bcrypt_rounds,
+    bcrypt__min_rounds=settings.password_bcrypt_rounds,
+    bcrypt__max_rounds=settings.password_bcrypt_rounds,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many logins are waiting for a hashing thread; retry later."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop, in `workers` threads (bcrypt releases the
+    GIL), so a login never blocks the other requests of the worker.
+
+    Like the render pool, at most `queue_limit` more calls wait for a thread,
+    for at most `queue_timeout` seconds; beyond that `PasswordHasherBusy` is
+    raised, so a login burst is shed instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, queue_timeout: float):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password"
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiting = 0
+        # Verified when the user does not exist, so that a login costs the same
+        # whether the username exists or not
+        self._dummy_hash: Optional[str] = None
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        slots = self._get_slots()
+        if slots.locked() and self._waiting >= self.queue_limit:
+            raise PasswordHasherBusy(
+                "Too many logins in progress, retry later.", retry_after=1
+            )
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            raise PasswordHasherBusy(
+                "Too many logins in progress, retry later.",
+                retry_after=max(1, round(self.queue_timeout)),
+            )
+        finally:
+            self._waiting -= 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(
+        self, password: str, password_hash: str
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Check `password`. Returns whether it matches and, when the hash uses
+        an outdated cost, the new hash to store.
+        """
+        return await self._run(pwd_context.verify_and_update, password, password_hash)
+
+    async def verify_dummy(self, password: str) -> None:
+        """Spend the cost of a verification, for a user that does not exist."""
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash("dummy-password")
+        await self._run(pwd_context.verify, password, self._dummy_hash)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    queue_limit=settings.login_queue_limit,
+    queue_timeout=settings.login_queue_timeout,
+)
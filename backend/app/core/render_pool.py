@@ -0,0 +1,187 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from app.core.config import get_settings
+from app.core.types import *
+
+settings = get_settings()
+
+
+class RenderPoolSaturated(Exception):
+    """Too many renders are already waiting; the client should retry later."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RenderPoolTimeout(Exception):
+    """A render waited longer than the queue timeout for a free worker."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Timing:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total_seconds, 6),
+            "avg_seconds": (
+                round(self.total_seconds / self.count, 6) if self.count else None
+            ),
+            "max_seconds": round(self.max_seconds, 6),
+        }
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> tuple[Any, float]:
+    # Runs in the worker, so the render time excludes queueing and transfer
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class RenderPool:
+    """
+    Runs CPU-bound render functions off the event loop with bounded concurrency.
+
+    At most `workers` renders run at once (in a process or thread pool); up to
+    `queue_limit` more wait for a slot for at most `queue_timeout` seconds.
+    Beyond that, `run` fails fast with `RenderPoolSaturated` so an overloaded
+    worker sheds load instead of piling up requests.
+    Functions submitted to a process pool must be picklable (module-level).
+    """
+
+    def __init__(
+        self, backend: str, workers: int, queue_limit: int, queue_timeout: float
+    ):
+        if backend not in ("process", "thread"):
+            raise ValueError(
+                f"Invalid render backend: {backend}. Available backends: ['process', 'thread']"
+            )
+        self.backend = backend
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiting = 0
+        self._running = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.queue_wait = _Timing()
+        self.render_time = _Timing()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.backend == "process":
+                # spawn: never fork a process that runs an event loop and threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="render"
+                )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` in the pool once a slot is free and return its result."""
+        slots = self._get_slots()
+        if slots.locked() and self._waiting >= self.queue_limit:
+            self.rejected += 1
+            raise RenderPoolSaturated(
+                f"Render queue is full ({self.queue_limit} waiting), retry later.",
+                retry_after=max(1, round(self._avg_render_seconds())),
+            )
+
+        self._waiting += 1
+        enqueued = time.perf_counter()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            self.timed_out += 1
+            raise RenderPoolTimeout(
+                f"No render worker became free within {self.queue_timeout}s.",
+                retry_after=max(1, round(self.queue_timeout)),
+            )
+        finally:
+            self._waiting -= 1
+        self.queue_wait.add(time.perf_counter() - enqueued)
+
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, seconds = await loop.run_in_executor(
+                self._get_executor(), _timed, fn, *args
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM): start a fresh pool for the next render
+            self.failed += 1
+            self._executor = None
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._running -= 1
+            slots.release()
+        self.render_time.add(seconds)
+        return result
+
+    def _avg_render_seconds(self) -> float:
+        if not self.render_time.count:
+            return 1.0
+        return self.render_time.total_seconds / self.render_time.count
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "queue_timeout": self.queue_timeout,
+            "running": self._running,
+            "waiting": self._waiting,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "queue_wait": self.queue_wait.as_dict(),
+            "render_time": self.render_time.as_dict(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = RenderPool(
+    backend=settings.sticker_render_backend,
+    workers=settings.sticker_render_workers,
+    queue_limit=settings.sticker_render_queue_limit,
+    queue_timeout=settings.sticker_render_queue_timeout,
+)
@@ -0,0 +1,439 @@
+import asyncio
+import os
+import shutil
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import AsyncIterator
+from app.core.config import get_settings
+from app.core.types import *
+
+settings = get_settings()
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class StoredObject:
+    size: int
+    last_modified: float  # POSIX timestamp
+    etag: str  # quoted, as sent in the ETag header
+
+
+@dataclass
+class StorageEntry:
+    key: str
+    size: int
+    last_modified: float  # POSIX timestamp
+
+
+class DocumentStorage(ABC):
+    """
+    Where sticker documents are kept. A document is addressed by its key, the
+    relative path stored on canvases and render jobs (`2026/10/<uuid>.pdf`).
+    Missing documents raise FileNotFoundError.
+    """
+
+    @abstractmethod
+    async def save_bytes(self, key: str, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    async def save_file(self, key: str, source_path: str) -> None:
+        """Store the file at `source_path` under `key`, then remove the source."""
+        pass
+
+    @abstractmethod
+    async def read_bytes(self, key: str) -> bytes:
+        pass
+
+    @abstractmethod
+    async def stat(self, key: str) -> StoredObject:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete a document. Returns False if it did not exist."""
+        pass
+
+    @abstractmethod
+    def iter_bytes(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream bytes `start` to `end` (exclusive, None = end of document)."""
+        pass
+
+    @abstractmethod
+    def iter_entries(self) -> AsyncIterator[StorageEntry]:
+        """Every stored object, in no particular order."""
+        pass
+
+    async def delete_many(self, keys: List[str]) -> None:
+        for key in keys:
+            await self.delete(key)
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self.stat(key)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """The document's file on this node, for backends that have one."""
+        return None
+
+    async def presigned_url(
+        self, key: str, filename: str, content_disposition: str
+    ) -> Optional[str]:
+        """A time-limited URL downloading the document directly, if supported."""
+        return None
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalDocumentStorage(DocumentStorage):
+    """
+    Documents as files under `root`. File work runs in a worker thread so it
+    never blocks the event loop, and files are written to a temporary file
+    renamed into place, so a reader never sees a partially written PDF.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        return self.root / Path(key)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    async def save_bytes(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self._write, self._path(key), data)
+
+    async def save_file(self, key: str, source_path: str) -> None:
+        await asyncio.to_thread(self._move, source_path, self._path(key))
+
+    async def read_bytes(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._path(key).read_bytes)
+
+    async def stat(self, key: str) -> StoredObject:
+        stat_result = await asyncio.to_thread(os.stat, self._path(key))
+        return StoredObject(
+            size=stat_result.st_size,
+            last_modified=stat_result.st_mtime,
+            etag=f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"',
+        )
+
+    async def delete(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self._path(key).unlink)
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def iter_bytes(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def iter_entries(self) -> AsyncIterator[StorageEntry]:
+        # One directory per thread call, so a large tree is never held at once
+        pending = [self.root]
+        while pending:
+            directories, entries = await asyncio.to_thread(self._scan, pending.pop())
+            pending.extend(directories)
+            for entry in entries:
+                yield entry
+
+    async def delete_many(self, keys: List[str]) -> None:
+        await asyncio.to_thread(self._delete_many, keys)
+
+    def _delete_many(self, keys: List[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    def _scan(self, directory: Path) -> tuple[List[Path], List[StorageEntry]]:
+        directories, entries = [], []
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if item.is_dir(follow_symlinks=False):
+                        directories.append(Path(item.path))
+                    elif item.is_file(follow_symlinks=False):
+                        stat_result = item.stat()
+                        entries.append(
+                            StorageEntry(
+                                key=Path(item.path).relative_to(self.root).as_posix(),
+                                size=stat_result.st_size,
+                                last_modified=stat_result.st_mtime,
+                            )
+                        )
+        except FileNotFoundError:
+            pass
+        return directories, entries
+
+    @staticmethod
+    def _tmp_path(file_path: Path) -> Path:
+        # Same directory as the target, so the rename never crosses filesystems
+        return file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+
+    def _write(self, file_path: Path, data: bytes) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._tmp_path(file_path)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _move(self, source_path: str, file_path: Path) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # Atomic when the source is on the same filesystem
+            os.replace(source_path, file_path)
+        except OSError:
+            tmp_path = self._tmp_path(file_path)
+            try:
+                shutil.copyfile(source_path, tmp_path)
+                os.replace(tmp_path, file_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            os.remove(source_path)
+
+
+class S3DocumentStorage(DocumentStorage):
+    """
+    Documents in an S3-compatible bucket (AWS S3, MinIO, ...), under `prefix`.
+
+    boto3 is synchronous, so its calls run in worker threads. One client is
+    shared by all of them (boto3 clients are thread-safe) and keeps up to
+    `max_pool_connections` HTTP connections alive. Uploads larger than
+    `multipart_threshold` are sent as a multipart upload of
+    `multipart_chunksize` parts, several parts at a time. Listings are read
+    `list_page_size` keys (at most 1000) per request.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        max_pool_connections: int = 20,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024,
+        presign_expires: int = 300,
+        list_page_size: int = 1000,
+    ):
+        # Only S3 deployments need boto3
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+        from botocore.exceptions import ClientError
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.presign_expires = presign_expires
+        self.list_page_size = list_page_size
+        self._client_error = ClientError
+        self._client = boto3.session.Session().client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={"max_attempts": 3, "mode": "standard"},
+            ),
+        )
+        self._transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=min(10, max_pool_connections),
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def _call(self, fn: Callable[..., Any], key: str, **kwargs: Any) -> Any:
+        try:
+            return await asyncio.to_thread(fn, **kwargs)
+        except self._client_error as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(f"Document with key={key} does not exists.")
+            raise
+
+    async def save_bytes(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(
+            self._client.upload_fileobj,
+            BytesIO(data),
+            self.bucket,
+            self._key(key),
+            ExtraArgs={"ContentType": "application/pdf"},
+            Config=self._transfer_config,
+        )
+
+    async def save_file(self, key: str, source_path: str) -> None:
+        await asyncio.to_thread(
+            self._client.upload_file,
+            source_path,
+            self.bucket,
+            self._key(key),
+            ExtraArgs={"ContentType": "application/pdf"},
+            Config=self._transfer_config,
+        )
+        await asyncio.to_thread(os.remove, source_path)
+
+    async def read_bytes(self, key: str) -> bytes:
+        response = await self._call(
+            self._client.get_object, key, Bucket=self.bucket, Key=self._key(key)
+        )
+        body = response["Body"]
+        try:
+            return await asyncio.to_thread(body.read)
+        finally:
+            body.close()
+
+    async def stat(self, key: str) -> StoredObject:
+        response = await self._call(
+            self._client.head_object, key, Bucket=self.bucket, Key=self._key(key)
+        )
+        return StoredObject(
+            size=response["ContentLength"],
+            last_modified=response["LastModified"].timestamp(),
+            etag=response["ETag"],
+        )
+
+    async def delete(self, key: str) -> bool:
+        # DeleteObject succeeds for missing keys: check first to report it
+        if not await self.exists(key):
+            return False
+        await self._call(
+            self._client.delete_object, key, Bucket=self.bucket, Key=self._key(key)
+        )
+        return True
+
+    async def iter_bytes(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        byte_range = f"bytes={start}-{'' if end is None else end - 1}"
+        response = await self._call(
+            self._client.get_object,
+            key,
+            Bucket=self.bucket,
+            Key=self._key(key),
+            Range=byte_range,
+        )
+        body = response["Body"]
+        chunks = body.iter_chunks(CHUNK_SIZE)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def iter_entries(self) -> AsyncIterator[StorageEntry]:
+        pages = iter(
+            self._client.get_paginator("list_objects_v2").paginate(
+                Bucket=self.bucket,
+                Prefix=self.prefix,
+                PaginationConfig={"PageSize": self.list_page_size},
+            )
+        )
+        while True:
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                break
+            for item in page.get("Contents", []):
+                yield StorageEntry(
+                    key=item["Key"].removeprefix(self.prefix),
+                    size=item["Size"],
+                    last_modified=item["LastModified"].timestamp(),
+                )
+
+    async def delete_many(self, keys: List[str]) -> None:
+        # DeleteObjects takes up to 1000 keys per request
+        for index in range(0, len(keys), 1000):
+            await asyncio.to_thread(
+                self._client.delete_objects,
+                Bucket=self.bucket,
+                Delete={
+                    "Objects": [
+                        {"Key": self._key(key)} for key in keys[index : index + 1000]
+                    ],
+                    "Quiet": True,
+                },
+            )
+
+    async def presigned_url(
+        self, key: str, filename: str, content_disposition: str
+    ) -> Optional[str]:
+        return await asyncio.to_thread(
+            self._client.generate_presigned_url,
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self._key(key),
+                "ResponseContentType": "application/pdf",
+                "ResponseContentDisposition": f"{content_disposition}; filename={filename}",
+            },
+            ExpiresIn=self.presign_expires,
+        )
+
+    async def close(self) -> None:
+        self._client.close()
+
+
+def create_document_storage() -> DocumentStorage:
+    """The storage backend selected by `sticker_storage_backend`."""
+    if settings.sticker_storage_backend == "local":
+        return LocalDocumentStorage(settings.sticker_storage_dir_resolved)
+    if settings.sticker_storage_backend == "s3":
+        if not settings.sticker_s3_bucket:
+            raise ValueError("sticker_s3_bucket is required by the s3 storage backend.")
+        return S3DocumentStorage(
+            bucket=settings.sticker_s3_bucket,
+            prefix=settings.sticker_s3_prefix,
+            endpoint_url=settings.sticker_s3_endpoint_url,
+            region=settings.sticker_s3_region,
+            access_key_id=settings.sticker_s3_access_key_id,
+            secret_access_key=settings.sticker_s3_secret_access_key,
+            max_pool_connections=settings.sticker_s3_max_pool_connections,
+            multipart_threshold=settings.sticker_s3_multipart_threshold,
+            multipart_chunksize=settings.sticker_s3_multipart_chunksize,
+            presign_expires=settings.sticker_s3_presign_expires,
+        )
+    raise ValueError(
+        f"Invalid storage backend: {settings.sticker_storage_backend}. Available backends: ['local', 's3']"
+    )
+
+
+document_storage = create_document_storage()
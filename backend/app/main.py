@@ -4,6 +4,11 @@ from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.main import api_router
 from app.core.config import get_settings
+from app.core.render_pool import render_pool
+from app.core.passwords import password_hasher
+from app.core.storage import document_storage
+from app.services.sticker_job_service import sticker_job_worker
+from app.services.storage_gc_service import storage_gc_scheduler
 from contextlib import asynccontextmanager
 import logging
 from pathlib import Path
@@ -20,8 +25,15 @@ async def lifespan(app: FastAPI):
     logger.info(
         f"Starting up {settings.app_name} in {settings.environment} environment"
     )
+    sticker_job_worker.start()
+    storage_gc_scheduler.start()
     yield
     logger.info(f"Shutting down {settings.app_name}")
+    await storage_gc_scheduler.stop()
+    await sticker_job_worker.stop()
+    render_pool.shutdown()
+    await document_storage.close()
+    password_hasher.shutdown()
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
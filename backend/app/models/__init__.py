@@ -2,10 +2,23 @@
 
 from .requests import Request, Area, Customer
 from .user import User
-from .stickers import StickerCanvas, Sticker
+from .stickers import StickerCanvas, Sticker, StickerRenderJob
 
 # 🔥 This registers the event listener
 import app.models.events  # noqa: F401
 
+# Registers the full-text search table and triggers on create_all
+import app.models.search  # noqa: F401
 
-__all__ = ["Request", "Area", "Customer", "StickerCanvas", "Sticker", "User"]
+# Registers the request_stats aggregate table and its triggers on create_all
+import app.models.stats  # noqa: F401
+
+__all__ = [
+    "Request",
+    "Area",
+    "Customer",
+    "StickerCanvas",
+    "Sticker",
+    "StickerRenderJob",
+    "User",
+]
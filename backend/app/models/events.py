@@ -1,10 +1,9 @@
 from sqlalchemy import event
-from sqlalchemy.orm import Session
+from sqlalchemy.engine import Connection
 from datetime import datetime
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
-from datetime import datetime
-from app.models.requests import Request
+from sqlalchemy import select, func, text, insert, update
+from sqlalchemy.dialects import sqlite
+from app.models.requests import Request, LabRefCounter
 from zoneinfo import ZoneInfo
 from app.core.config import get_settings
 
@@ -12,35 +11,114 @@ settings = get_settings()
 env_timezone = ZoneInfo(settings.timezone)
 
 
-def generate_lab_ref_no(session: Session) -> str:
+def allocate_lab_ref_no(connection: Connection) -> str:
+    """
+    Allocate the next MM-YYYY-XXXX lab reference number (sequence per month).
+    Example: 01-2026-0001
+    """
+    return allocate_lab_ref_nos(connection, 1)[0]
+
+
+def allocate_lab_ref_nos(connection: Connection, count: int) -> list[str]:
     """
-    Generate MM-YYYY-XXXXXX (zero-padded sequence per year).
-    Example: 01-2026-000001
+    Allocate `count` unique lab reference numbers in ascending order, for bulk
+    inserts that bypass the `before_insert` listener.
+
+    The numbers come from the `lab_ref_counters` row of the current month,
+    incremented atomically inside the caller's transaction, so the cost does
+    not depend on the size of `requests` and concurrent writers cannot be
+    handed the same number. Such a block is consecutive.
+
+    PostgreSQL uses a native per-month sequence instead. Its numbers are
+    unique too, but concurrent writers draw from it at the same time, so one
+    block may interleave with theirs and need not be consecutive.
     """
     now = datetime.now(env_timezone)
     month = now.month
     year = now.year
 
+    if connection.dialect.name == "postgresql":
+        seqs = _next_ref_seqs_from_sequence(connection, month, year, count)
+    else:
+        last_seq = _increment_counter(connection, month, year, count)
+        seqs = list(range(last_seq - count + 1, last_seq + 1))
+
+    return [f"{month:02d}-{year}-{seq:04d}" for seq in seqs]
+
+
+def _increment_counter(
+    connection: Connection, month: int, year: int, count: int
+) -> int:
+    """Add `count` to the month's counter and return its new value."""
+    counter = LabRefCounter.__table__
+    last_seq = connection.execute(
+        update(counter)
+        .where(counter.c.year == year, counter.c.month == month)
+        .values(last_seq=counter.c.last_seq + count)
+        .returning(counter.c.last_seq)
+    ).scalar()
+    if last_seq is not None:
+        return last_seq
+
+    # First number of the month: seed from any ref_no issued before the
+    # counter existed. A concurrent first writer turns this into an increment.
+    values = {
+        "year": year,
+        "month": month,
+        "last_seq": _last_ref_seq(connection, month, year) + count,
+    }
+    if connection.dialect.name == "sqlite":
+        stmt = sqlite.insert(counter).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[counter.c.year, counter.c.month],
+            set_={"last_seq": counter.c.last_seq + count},
+        )
+    else:
+        stmt = insert(counter).values(**values)
+    return connection.execute(stmt.returning(counter.c.last_seq)).scalar_one()
+
+
+def _last_ref_seq(connection: Connection, month: int, year: int) -> int:
     stmt = select(func.max(Request.ref_no)).where(
         Request.ref_no.like(f"{month:02d}-{year}-%")
     )
+    last_ref_no = connection.execute(stmt).scalar()
+    return int(last_ref_no.split("-")[-1]) if last_ref_no else 0
 
-    last_ref_no = session.execute(stmt).scalar()
 
-    if last_ref_no:
-        last_seq = int(last_ref_no.split("-")[-1])
-        next_seq = last_seq + 1
-    else:
-        next_seq = 1
-
-    return f"{month:02d}-{year}-{next_seq:04d}"
+def _next_ref_seqs_from_sequence(
+    connection: Connection, month: int, year: int, count: int
+) -> list[int]:
+    """
+    PostgreSQL: draw sequence numbers from a native per-month sequence, which
+    unlike a counter row is not locked until commit. The sequence is created
+    on first use, starting after any existing number of that month. Numbers
+    consumed by rolled-back transactions leave gaps.
+    """
+    seq_name = f"lab_ref_no_{year}_{month:02d}_seq"
+    exists = connection.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": seq_name}
+    ).scalar()
+    if not exists:
+        # Serialise creation so concurrent first writers agree on the start value
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": seq_name}
+        )
+        start = _last_ref_seq(connection, month, year) + 1
+        connection.execute(
+            text(f"CREATE SEQUENCE IF NOT EXISTS {seq_name} START WITH {start}")
+        )
+    result = connection.execute(
+        text(
+            "SELECT nextval(CAST(CAST(:name AS text) AS regclass)) "
+            "FROM generate_series(1, :count)"
+        ),
+        {"name": seq_name, "count": count},
+    )
+    return sorted(result.scalars().all())
 
 
 @event.listens_for(Request, "before_insert")
-def request_before_insert(mapper, connection, target: Request):
+def request_before_insert(mapper, connection: Connection, target: Request):
     if not bool(target.ref_no):
-        session = Session(bind=connection)
-        try:
-            target.ref_no = generate_lab_ref_no(session)  # type: ignore
-        finally:
-            session.close()
+        target.ref_no = allocate_lab_ref_no(connection)  # type: ignore
@@ -9,7 +9,7 @@ from sqlalchemy import (
     func,
     LargeBinary,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, column_property
 from app.core.database import Base
 
 
@@ -18,7 +18,11 @@ class Area(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, unique=True)
-    logo = Column(LargeBinary, nullable=True)
+    # Loaded only on explicit access/undefer; lists and joins never pull the blob
+    logo = deferred(Column(LargeBinary, nullable=True))
+    # sha256 of `logo`, kept in sync by AreaRepository; used for ETags and cache-busting
+    logo_hash = Column(String(64), nullable=True)
+    has_logo = column_property(logo.columns[0].is_not(None))
     requests = relationship("Request", back_populates="area")
 
 
@@ -57,7 +61,19 @@ class Request(Base):
     created_on = Column(DateTime(timezone=True), server_default=func.now())
     modified_by = Column(String(255), nullable=True)
     modified_on = Column(DateTime(timezone=True), onupdate=func.now())
+    # Stamped by a database trigger when status becomes Completed (models/stats.py)
+    completed_on = Column(DateTime(timezone=True), nullable=True)
     customer = relationship("Customer", back_populates="requests")
     area = relationship("Area", back_populates="requests")
     sales_person = relationship("SalesPerson", back_populates="requests")
     stickers = relationship("Sticker", back_populates="requests")
+
+
+class LabRefCounter(Base):
+    """Last lab reference sequence number issued per month (see models/events.py)."""
+
+    __tablename__ = "lab_ref_counters"
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    last_seq = Column(Integer, nullable=False, default=0)
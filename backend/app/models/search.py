@@ -0,0 +1,129 @@
+from sqlalchemy import DDL, event, table, column
+from app.core.database import Base
+from app.models.requests import Request, Customer, Area, SalesPerson
+
+# Full-text index over the searchable request columns (SQLite FTS5).
+# It is an external-content table: the text lives in `requests` and the
+# triggers below keep the index in sync with inserts, updates and deletes.
+REQUESTS_FTS_TABLE = "requests_fts"
+REQUESTS_FTS_COLUMNS = ["ref_no", "short_description", "long_description", "lpo_no"]
+
+# Typeahead indexes of the reference tables, by table: word-prefix search on
+# the display name columns, with the same FTS5 / pg_trgm split as requests.
+REFERENCE_FTS_COLUMNS = {
+    Customer.__tablename__: ["name"],
+    Area.__tablename__: ["name"],
+    SalesPerson.__tablename__: ["first_name", "last_name"],
+}
+
+
+def fts_ddl(content_table: str, columns: list[str], prefix: str = "2 3") -> list[str]:
+    """FTS5 table `<content_table>_fts` over `columns`, and its sync triggers."""
+    fts_name = f"{content_table}_fts"
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_name} USING fts5(
+            {cols},
+            content='{content_table}',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='{prefix}'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_name}_ai
+        AFTER INSERT ON {content_table} BEGIN
+            INSERT INTO {fts_name}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_name}_ad
+        AFTER DELETE ON {content_table} BEGIN
+            INSERT INTO {fts_name}({fts_name}, rowid, {cols})
+            VALUES ('delete', old.id, {old_cols});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_name}_au
+        AFTER UPDATE OF {cols} ON {content_table} BEGIN
+            INSERT INTO {fts_name}({fts_name}, rowid, {cols})
+            VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts_name}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+        """,
+    ]
+
+
+def trgm_ddl(content_table: str, columns: list[str]) -> list[str]:
+    """pg_trgm GIN indexes serving ilike '%word%' on `columns`."""
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        *(
+            f"CREATE INDEX IF NOT EXISTS ix_{content_table}_{c}_trgm "
+            f"ON {content_table} USING gin ({c} gin_trgm_ops)"
+            for c in columns
+        ),
+    ]
+
+
+def fts_rebuild(content_table: str) -> str:
+    """Statement re-indexing every row of `content_table` into its FTS5 table."""
+    fts_name = f"{content_table}_fts"
+    return f"INSERT INTO {fts_name}({fts_name}) VALUES ('rebuild')"
+
+
+def fts_table(content_table: str):
+    """
+    Lightweight handle for querying an FTS5 table; it is not part of
+    Base.metadata so create_all() never tries to create it as a plain table.
+    """
+    fts_name = f"{content_table}_fts"
+    return table(fts_name, column("rowid"), column("rank"), column(fts_name))
+
+
+REQUESTS_FTS_DDL = fts_ddl(Request.__tablename__, REQUESTS_FTS_COLUMNS)
+
+# PostgreSQL has no FTS5; search falls back to ilike '%word%' on the same
+# columns, which trigram GIN indexes can serve without a sequential scan.
+REQUESTS_TRGM_DDL = trgm_ddl(Request.__tablename__, REQUESTS_FTS_COLUMNS)
+
+REQUESTS_FTS_REBUILD = fts_rebuild(Request.__tablename__)
+
+requests_fts = fts_table(Request.__tablename__)
+
+# Names are short, so typeahead also indexes 1-character prefixes
+REFERENCE_FTS_DDL = {
+    name: fts_ddl(name, columns, prefix="1 2 3")
+    for name, columns in REFERENCE_FTS_COLUMNS.items()
+}
+REFERENCE_TRGM_DDL = {
+    name: trgm_ddl(name, columns) for name, columns in REFERENCE_FTS_COLUMNS.items()
+}
+
+
+def build_match_query(search: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Each word becomes a quoted prefix phrase, so punctuation such as the dashes
+    in `01-2026-0001` cannot break the FTS5 query syntax. Words are AND-ed.
+    """
+    words = search.split()
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def _listen_ddl(target, statements: list[str], dialect: str) -> None:
+    for statement in statements:
+        event.listen(target, "after_create", DDL(statement).execute_if(dialect=dialect))
+
+
+_listen_ddl(Request.__table__, REQUESTS_FTS_DDL, "sqlite")
+_listen_ddl(Request.__table__, REQUESTS_TRGM_DDL, "postgresql")
+
+for _table, _columns in REFERENCE_FTS_COLUMNS.items():
+    _model_table = Base.metadata.tables[_table]
+    _listen_ddl(_model_table, REFERENCE_FTS_DDL[_table], "sqlite")
+    _listen_ddl(_model_table, REFERENCE_TRGM_DDL[_table], "postgresql")
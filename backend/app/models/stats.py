@@ -0,0 +1,303 @@
+from dataclasses import dataclass
+from sqlalchemy import DDL, Column, Integer, String, Date, event
+from app.core.config import get_settings
+from app.core.database import Base
+from app.models.generic import RequestStatusEnum
+
+settings = get_settings()
+
+
+class RequestStats(Base):
+    """
+    Request counts per area, status and month of `created_on`.
+
+    Like the other rollups below, it is maintained by database triggers in the
+    same transaction as every write on `requests`, whichever code path issued
+    it. Missing ids and status are stored as 0 and "" so they take part in the key.
+
+    Days and months are those of `settings.timezone`, like the dashboard date
+    ranges. After changing the timezone, rebuild the rollups with
+    reconcile_request_stats, which also recreates the triggers.
+    """
+
+    __tablename__ = "request_stats"
+
+    area_id = Column(Integer, primary_key=True, autoincrement=False, default=0)
+    status = Column(String(50), primary_key=True, default="")
+    month = Column(String(7), primary_key=True)  # YYYY-MM
+    request_count = Column(Integer, nullable=False, default=0)
+
+
+class RequestDailyStats(Base):
+    """Requests created per day, customer and sales person."""
+
+    __tablename__ = "request_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    customer_id = Column(Integer, primary_key=True, autoincrement=False, default=0)
+    sales_person_id = Column(Integer, primary_key=True, autoincrement=False, default=0)
+    request_count = Column(Integer, nullable=False, default=0)
+
+
+class RequestTurnaroundStats(Base):
+    """
+    Requests completed per day of `completed_on`, with the summed days
+    from `date_received` to completion. Requests without a received date are
+    not counted.
+    """
+
+    __tablename__ = "request_turnaround_stats"
+
+    day = Column(Date, primary_key=True)
+    completed_count = Column(Integer, nullable=False, default=0)
+    turnaround_days = Column(Integer, nullable=False, default=0)
+
+
+@dataclass
+class _Rollup:
+    """How one rollup table is derived from a `requests` row ({row} placeholder)."""
+
+    table: str
+    keys: list[tuple[str, str]]
+    values: list[tuple[str, str]]
+    watched: list[str]
+    condition: str = "1 = 1"
+
+    def _match(self, row: str) -> str:
+        return " AND ".join(
+            f"{col} = {expr.format(row=row)}" for col, expr in self.keys
+        )
+
+    def increment(self, row: str) -> str:
+        cols = ", ".join(col for col, _ in self.keys + self.values)
+        exprs = ", ".join(e.format(row=row) for _, e in self.keys + self.values)
+        key_cols = ", ".join(col for col, _ in self.keys)
+        updates = ", ".join(
+            f"{col} = {self.table}.{col} + excluded.{col}" for col, _ in self.values
+        )
+        # The WHERE is required by SQLite to parse ON CONFLICT after a SELECT
+        return (
+            f"INSERT INTO {self.table} ({cols}) SELECT {exprs} "
+            f"WHERE {self.condition.format(row=row)} "
+            f"ON CONFLICT ({key_cols}) DO UPDATE SET {updates};"
+        )
+
+    def decrement(self, row: str) -> str:
+        updates = ", ".join(
+            f"{col} = {col} - ({expr.format(row=row)})" for col, expr in self.values
+        )
+        count_col = self.values[0][0]
+        return (
+            f"UPDATE {self.table} SET {updates} "
+            f"WHERE {self._match(row)} AND {self.condition.format(row=row)}; "
+            f"DELETE FROM {self.table} "
+            f"WHERE {self._match(row)} AND {count_col} <= 0;"
+        )
+
+    def changed(self, operator: str) -> str:
+        return " OR ".join(f"old.{col} {operator} new.{col}" for col in self.watched)
+
+    def rebuild(self) -> str:
+        """INSERT ... SELECT recomputing the whole table from `requests`."""
+        keys = [expr.format(row="requests") for _, expr in self.keys]
+        sums = [f"sum({expr.format(row='requests')})" for _, expr in self.values]
+        cols = ", ".join(col for col, _ in self.keys + self.values)
+        return (
+            f"INSERT INTO {self.table} ({cols}) "
+            f"SELECT {', '.join(keys + sums)} FROM requests "
+            f"WHERE {self.condition.format(row='requests')} "
+            f"GROUP BY {', '.join(keys)}"
+        )
+
+
+_COMPLETED = RequestStatusEnum.COMPLETED.value
+
+# Timestamps are UTC. SQLite has no time zone database: local_date() is a
+# Python function registered on each connection (app.core.database).
+_PG_TIMEZONE = settings.timezone.replace("'", "''")
+
+_EXPRESSIONS = {
+    "sqlite": {
+        "day": "local_date(coalesce({row}.created_on, CURRENT_TIMESTAMP))",
+        "month": (
+            "substr(local_date(coalesce({row}.created_on, CURRENT_TIMESTAMP)), 1, 7)"
+        ),
+        "completed_day": "local_date({row}.completed_on)",
+        "turnaround": (
+            "CAST(julianday(local_date({row}.completed_on)) "
+            "- julianday({row}.date_received) AS INTEGER)"
+        ),
+    },
+    "postgresql": {
+        "day": f"CAST({{row}}.created_on AT TIME ZONE '{_PG_TIMEZONE}' AS date)",
+        "month": f"to_char({{row}}.created_on AT TIME ZONE '{_PG_TIMEZONE}', 'YYYY-MM')",
+        "completed_day": (
+            f"CAST({{row}}.completed_on AT TIME ZONE '{_PG_TIMEZONE}' AS date)"
+        ),
+        "turnaround": (
+            f"CAST({{row}}.completed_on AT TIME ZONE '{_PG_TIMEZONE}' AS date) "
+            "- {row}.date_received"
+        ),
+    },
+}
+
+
+def rollups(dialect: str) -> list[_Rollup]:
+    """The rollup tables maintained from `requests`, for the given dialect."""
+    expr = _EXPRESSIONS[dialect]
+    return [
+        _Rollup(
+            table="request_stats",
+            keys=[
+                ("area_id", "coalesce({row}.area_id, 0)"),
+                ("status", "coalesce({row}.status, '')"),
+                ("month", expr["month"]),
+            ],
+            values=[("request_count", "1")],
+            watched=["area_id", "status", "created_on"],
+        ),
+        _Rollup(
+            table="request_daily_stats",
+            keys=[
+                ("day", expr["day"]),
+                ("customer_id", "coalesce({row}.customer_id, 0)"),
+                ("sales_person_id", "coalesce({row}.sales_person_id, 0)"),
+            ],
+            values=[("request_count", "1")],
+            watched=["customer_id", "sales_person_id", "created_on"],
+        ),
+        _Rollup(
+            table="request_turnaround_stats",
+            keys=[("day", expr["completed_day"])],
+            values=[("completed_count", "1"), ("turnaround_days", expr["turnaround"])],
+            watched=["completed_on", "date_received"],
+            condition=(
+                "{row}.completed_on IS NOT NULL AND {row}.date_received IS NOT NULL"
+            ),
+        ),
+    ]
+
+
+def _sqlite_ddl() -> list[str]:
+    statements = [
+        # Stamp completed_on when a request enters (or is created in) Completed
+        # and clear it when it leaves; the rollup triggers then see the change
+        f"""
+        CREATE TRIGGER IF NOT EXISTS requests_completed_on_ai AFTER INSERT ON requests
+        WHEN new.status = '{_COMPLETED}' AND new.completed_on IS NULL BEGIN
+            UPDATE requests SET completed_on = CURRENT_TIMESTAMP WHERE id = new.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS requests_completed_on_au
+        AFTER UPDATE OF status ON requests
+        WHEN coalesce(new.status = '{_COMPLETED}', 0)
+            != coalesce(old.status = '{_COMPLETED}', 0)
+        BEGIN
+            UPDATE requests SET completed_on = CASE
+                WHEN new.status = '{_COMPLETED}' THEN CURRENT_TIMESTAMP END
+            WHERE id = new.id;
+        END
+        """,
+    ]
+    for rollup in rollups("sqlite"):
+        # Recreated rather than kept, so a rebuild picks up a changed timezone
+        statements += [
+            f"DROP TRIGGER IF EXISTS {rollup.table}_{suffix}"
+            for suffix in ("ai", "ad", "au")
+        ]
+        statements += [
+            f"""
+            CREATE TRIGGER {rollup.table}_ai AFTER INSERT ON requests
+            BEGIN {rollup.increment("new")} END
+            """,
+            f"""
+            CREATE TRIGGER {rollup.table}_ad AFTER DELETE ON requests
+            BEGIN {rollup.decrement("old")} END
+            """,
+            f"""
+            CREATE TRIGGER {rollup.table}_au
+            AFTER UPDATE OF {", ".join(rollup.watched)} ON requests
+            WHEN {rollup.changed("IS NOT")}
+            BEGIN {rollup.decrement("old")} {rollup.increment("new")} END
+            """,
+        ]
+    return statements
+
+
+def _postgresql_ddl() -> list[str]:
+    pg_rollups = rollups("postgresql")
+    deletes = "\n".join(rollup.decrement("OLD") for rollup in pg_rollups)
+    inserts = "\n".join(rollup.increment("NEW") for rollup in pg_rollups)
+    updates = "\n".join(f"""
+                IF {rollup.changed("IS DISTINCT FROM")} THEN
+                    {rollup.decrement("OLD")}
+                    {rollup.increment("NEW")}
+                END IF;""" for rollup in pg_rollups)
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION requests_stamp_completed_on() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.status IS DISTINCT FROM '{_COMPLETED}' THEN
+                NEW.completed_on := NULL;
+            ELSIF TG_OP = 'INSERT' THEN
+                NEW.completed_on := coalesce(NEW.completed_on, now());
+            ELSIF OLD.status IS DISTINCT FROM '{_COMPLETED}' THEN
+                NEW.completed_on := now();
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS requests_stamp_completed_on ON requests",
+        """
+        CREATE TRIGGER requests_stamp_completed_on
+        BEFORE INSERT OR UPDATE OF status ON requests
+        FOR EACH ROW EXECUTE FUNCTION requests_stamp_completed_on()
+        """,
+        f"""
+        CREATE OR REPLACE FUNCTION request_rollups_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                {deletes}
+            ELSIF TG_OP = 'INSERT' THEN
+                {inserts}
+            ELSE
+                {updates}
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        # Replaced by request_rollups_sync
+        "DROP TRIGGER IF EXISTS request_stats_sync ON requests",
+        "DROP FUNCTION IF EXISTS request_stats_sync()",
+        # completed_on is set by the BEFORE trigger, outside any SET list, so
+        # this fires on every update and compares the keys itself
+        "DROP TRIGGER IF EXISTS request_rollups_sync ON requests",
+        """
+        CREATE TRIGGER request_rollups_sync
+        AFTER INSERT OR DELETE OR UPDATE ON requests
+        FOR EACH ROW EXECUTE FUNCTION request_rollups_sync()
+        """,
+    ]
+
+
+def rollup_ddl(dialect: str) -> list[str]:
+    """Trigger DDL keeping the rollup tables in sync, for the given dialect."""
+    if dialect == "sqlite":
+        return _sqlite_ddl()
+    if dialect == "postgresql":
+        return _postgresql_ddl()
+    return []
+
+
+# Registered on the metadata so `requests` and the rollup tables all exist
+# before the triggers are created. DDL() %-formats its text, hence the escape.
+for _dialect in ("sqlite", "postgresql"):
+    for _statement in rollup_ddl(_dialect):
+        event.listen(
+            Base.metadata,
+            "after_create",
+            DDL(_statement.replace("%", "%%")).execute_if(dialect=_dialect),
+        )
@@ -1,5 +1,15 @@
 from app.core.database import Base
-from sqlalchemy import DateTime, Column, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 
@@ -26,6 +36,10 @@ class StickerCanvas(Base):
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(String(36), nullable=True, unique=True)
     relative_file_path = Column(String(500), nullable=True)
+    # sha256 of the inputs the document was rendered from (see render_fingerprint)
+    render_fingerprint = Column(String(64), nullable=True)
+    # When the document was last known to match its requests (database clock)
+    rendered_on = Column(DateTime(timezone=True), nullable=True)
     created_on = Column(DateTime(timezone=True), server_default=func.now())
     created_by = Column(String(255), nullable=True)
 
@@ -35,3 +49,34 @@ class StickerCanvas(Base):
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
+
+
+class StickerRenderJob(Base):
+    """
+    A sticker render queued for the background workers.
+
+    `status` holds `LStickerJobStatus` values; a job stays IN_PROGRESS while it
+    waits (`started_on` is NULL) or runs, and between retries. A worker owns a
+    job until `locked_until`, so the job of a crashed worker is picked up again.
+    """
+
+    __tablename__ = "sticker_render_jobs"
+    __table_args__ = (
+        Index("ix_sticker_render_jobs_queue", "status", "next_attempt_on"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)  # canvas | batch | legacy
+    payload = Column(JSON, nullable=False)
+    status = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    document_id = Column(String(36), nullable=True)
+    relative_file_path = Column(String(500), nullable=True)
+    next_attempt_on = Column(DateTime(timezone=True), nullable=False)
+    locked_by = Column(String(255), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    created_on = Column(DateTime(timezone=True), server_default=func.now())
+    created_by = Column(String(255), nullable=True)
+    started_on = Column(DateTime(timezone=True), nullable=True)
+    finished_on = Column(DateTime(timezone=True), nullable=True)
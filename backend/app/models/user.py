@@ -1,14 +1,12 @@
 from sqlalchemy import Integer, String, Boolean, DateTime
 from app.core.database import Base
-from passlib.context import CryptContext
+from app.core.passwords import pwd_context
 from datetime import datetime
 from sqlalchemy.orm import mapped_column, Mapped
 from app.core.config import get_settings
 from zoneinfo import ZoneInfo
 from enum import Enum
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class UserRole(str, Enum):
     ADMIN = "admin"
@@ -32,6 +30,7 @@ class User(Base):
         nullable=False,
     )
 
+    # Synchronous bcrypt: async code goes through `password_hasher` instead
     def set_password(self, password: str) -> None:
         self.password_hash = pwd_context.hash(password)
 
@@ -0,0 +1,22 @@
+# rebuild the full-text search indexes of requests and of the reference data
+# typeahead (e.g. for databases created before the indexes existed)
+
+import asyncio
+from app.core.database import SessionLocal
+from app.models import *
+from app.services.request_service import RequestService
+from app.services.util_service import UtilService
+
+
+async def rebuild_search_index() -> bool:
+    async with SessionLocal() as session:
+        requests_rebuilt = await RequestService(session).rebuild_search_index()
+        reference_rebuilt = await UtilService(session).rebuild_search_index()
+        return requests_rebuilt and reference_rebuilt
+
+
+if __name__ == "__main__":
+    if asyncio.run(rebuild_search_index()):
+        print("✅ Search indexes rebuilt successfully.")
+    else:
+        print("⚠️ Search indexes are only supported on SQLite and PostgreSQL, skipped.")
@@ -0,0 +1,18 @@
+# rebuild the dashboard rollup tables (request_stats, request_daily_stats,
+# request_turnaround_stats) from the requests table,
+# e.g. for databases created before the table existed or after manual edits
+
+import asyncio
+from app.core.database import SessionLocal
+from app.models import *
+from app.services.dashboard_service import DashboardService
+
+
+async def reconcile_request_stats() -> int:
+    async with SessionLocal() as session:
+        return await DashboardService(session).reconcile_request_stats()
+
+
+if __name__ == "__main__":
+    rows = asyncio.run(reconcile_request_stats())
+    print(f"✅ Dashboard rollups rebuilt: {rows} rows.")
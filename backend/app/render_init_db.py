@@ -1,19 +1,60 @@
-# initialize db for render.com deployment
+# initialize db for render.com deployment, and upgrade databases created
+# by an earlier release (create_all only creates the missing tables)
 
 import asyncio
-from app.core.database import engine, Base
+from sqlalchemy import select, update
+from sqlalchemy.engine import Connection
+from app.core.database import engine, Base, add_missing_columns
 from app.models import *
 from app.core.config import get_settings
+from app.repositories.request import logo_content_hash
 
 settings = get_settings()
 
 
+def upgrade_schema(connection: Connection) -> list[str]:
+    """
+    Add the columns introduced since the tables were first created, and fill
+    them in for existing rows. Safe to run on every deployment.
+
+    Returns:
+        list[str]: The added columns, as table.column.
+    """
+    added = []
+    for table, names in [
+        (Area.__table__, ["logo_hash"]),
+        # NULL until the next render: such documents are never reused
+        (StickerCanvas.__table__, ["render_fingerprint", "rendered_on"]),
+    ]:
+        added += [
+            f"{table.name}.{name}"
+            for name in add_missing_columns(connection, table, names)
+        ]
+
+    areas = Area.__table__
+    unhashed = connection.execute(
+        select(areas.c.id, areas.c.logo).where(
+            areas.c.logo.is_not(None), areas.c.logo_hash.is_(None)
+        )
+    )
+    for id, logo in unhashed.all():
+        connection.execute(
+            update(areas)
+            .where(areas.c.id == id)
+            .values(logo_hash=logo_content_hash(logo))
+        )
+    return added
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        return await conn.run_sync(upgrade_schema)
 
 
 if __name__ == "__main__":
-    print("✅ Database tables created successfully.")
     print(f"Settings URI={settings.database_uri} | base_dir={settings.base_dir}")
-    asyncio.run(init_db())
+    added = asyncio.run(init_db())
+    print("✅ Database tables created successfully.")
+    if added:
+        print(f"✅ Columns added: {', '.join(added)}")
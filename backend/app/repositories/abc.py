@@ -1,15 +1,23 @@
 from abc import ABC, abstractmethod
 from dataclasses import fields
-from typing import Generic, Type, List, Optional, Union, Dict, Any
+from typing import Generic, Type, List, Optional, Union, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.generic import RecordType
 from sqlalchemy.orm import joinedload, selectinload, RelationshipProperty
-from sqlalchemy import and_, func
+from sqlalchemy import and_, or_, func, type_coerce, insert, update, delete, Row
+from sqlalchemy import Select
+from sqlalchemy import exists, literal
+from sqlalchemy import Date, DateTime, String
+from sqlalchemy.dialects import sqlite, postgresql
 from sqlalchemy.inspection import inspect
+from app.core.pagination import encode_cursor, decode_cursor
 
 
 class AbstractAsyncRepository(ABC, Generic[RecordType]):
+    # Unique column that identifies an existing row in `bulk_upsert`
+    upsert_conflict_key: str = "id"
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
@@ -33,6 +41,125 @@ class AbstractAsyncRepository(ABC, Generic[RecordType]):
         self.db.add(obj)
         return obj
 
+    async def bulk_create(
+        self, rows: List[Dict[str, Any]], commit: bool = True
+    ) -> List[int]:
+        """
+        Insert many rows in one executemany INSERT ... RETURNING id.
+
+        Args:
+            rows (List[Dict[str, Any]]): Column values of each new row.
+            commit (bool): Commit when done. Pass False inside an outer transaction.
+
+        Returns:
+            List[int]: The new ids, in the same order as `rows`.
+        """
+        if not rows:
+            return []
+        # sort_by_parameter_order would force one statement per row on SQLite,
+        # where ids are assigned in VALUES order and sorting restores row order.
+        # PostgreSQL batches it natively, so let it guarantee the order there.
+        ordered = self.db.get_bind().dialect.name != "sqlite"
+        stmt = insert(self.model).returning(
+            self.model.id, sort_by_parameter_order=ordered
+        )
+        try:
+            result = await self.db.execute(stmt, rows)
+            ids = list(result.scalars().all())
+            if not ordered:
+                ids.sort()
+            if commit:
+                await self.db.commit()
+            return ids
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
+    async def bulk_upsert(
+        self, rows: List[Dict[str, Any]], commit: bool = True
+    ) -> List[int]:
+        """
+        Insert rows, updating the existing ones that collide on
+        `upsert_conflict_key`, with INSERT ... ON CONFLICT DO UPDATE ... RETURNING id.
+
+        Rows are grouped by the set of columns they carry so that a missing
+        column is never overwritten with NULL. When the conflict key is `id`,
+        rows without an id are plain inserts. All groups run in one transaction.
+
+        Returns:
+            List[int]: The inserted or updated ids, in the same order as `rows`.
+        """
+        if not rows:
+            return []
+        # Copies: the caller's dicts are left as they were passed in
+        rows = [dict(row) for row in rows]
+        key = self.upsert_conflict_key
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for index, row in enumerate(rows):
+            if row.get("id", 0) is None:
+                row.pop("id")
+            if key != "id" and row.get(key) is None:
+                raise ValueError(f"Every row needs a '{key}' value to be upserted.")
+            groups.setdefault(tuple(sorted(row)), []).append(index)
+
+        ids: List[int] = [0] * len(rows)
+        try:
+            for columns, indexes in groups.items():
+                stmt = self._dialect_insert()
+                update_columns = {
+                    c: stmt.excluded[c] for c in columns if c not in (key, "id")
+                }
+                if update_columns:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[key], set_=update_columns
+                    )
+                else:
+                    # Nothing to update, but a no-op SET still returns the id
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[key], set_={key: stmt.excluded[key]}
+                    )
+                stmt = stmt.returning(self.model.id, getattr(self.model, key))
+                result = await self.db.execute(stmt, [rows[i] for i in indexes])
+                returned = result.all()
+                if key in columns:
+                    id_by_key = {row[1]: row[0] for row in returned}
+                    for index in indexes:
+                        ids[index] = id_by_key[rows[index][key]]
+                else:
+                    # Plain inserts: new ids follow VALUES order
+                    for index, id in zip(indexes, sorted(row[0] for row in returned)):
+                        ids[index] = id
+            if commit:
+                await self.db.commit()
+            return ids
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
+    async def bulk_delete_by_ids(self, ids: List[int]) -> List[int]:
+        """
+        Delete many rows with one DELETE ... WHERE id IN (...) RETURNING id.
+
+        Returns:
+            List[int]: The ids that existed and were deleted.
+        """
+        if not ids:
+            return []
+        stmt = (
+            delete(self.model)
+            .where(self.model.id.in_(ids))
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await self.db.execute(stmt)
+            deleted_ids = list(result.scalars().all())
+            await self.db.commit()
+            return deleted_ids
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
     async def get_by_id(
         self, id: int, relationships: Optional[List[str]] = None
     ) -> Optional[RecordType]:
@@ -100,19 +227,9 @@ class AbstractAsyncRepository(ABC, Generic[RecordType]):
                 *(joinedload(getattr(self.model, rel)) for rel in relationships)
             )
 
-        if filters:
-            conditions = []
-
-            for field, value in filters.items():
-                col = getattr(self.model, field, None)
-                if col is not None and value is not None:
-                    if isinstance(value, str):
-                        conditions.append(col.ilike(f"%{value}%"))
-                    else:
-                        conditions.append(col == value)
-
-            if conditions:
-                query = query.where(and_(*conditions))
+        conditions = self._build_filter_conditions(filters)
+        if conditions:
+            query = query.where(and_(*conditions))
 
         query = query.offset(start_index).limit(batch_size)
 
@@ -125,37 +242,279 @@ class AbstractAsyncRepository(ABC, Generic[RecordType]):
 
             return list(result.unique().scalars().all())
 
-    async def update(self, id: int, update_data: dict) -> RecordType:
-        if id is None or update_data is None:
-            raise ValueError("Invalid id or object.")
+    async def get_all_denorm_with_total(
+        self,
+        start_index: int,
+        batch_size: int,
+        field_names: Optional[List[str]] = None,
+        relationships: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        exact_count: bool = True,
+        projection: Optional[Select] = None,
+    ) -> Tuple[Union[List[Dict[str, Any]], List[RecordType]], Optional[int], bool]:
+        """
+        Get a page of denormalized records and the total in a single query.
 
-        existing = await self.get_by_id(id)
-        if not existing:
-            raise ValueError(f"Record with id {id} does not exist.")
+        With `exact_count`, the total is read from a `count(*) OVER ()` window column
+        computed over the same filtered rows. Without it, no count is computed at all:
+        one extra row is fetched only to tell whether another page follows.
 
-        for key, value in update_data.items():
-            setattr(existing, key, value)
+        Args:
+            start_index (int): Query starting index. Default: 0
+            batch_size (int): The number of data you want to obtain, or simply the page size.
+            field_names (List[str], optional): Specific field names to select.
+            relationships (List[str], optional): Relationships to join-load.
+            filters (Dict[str, Any], optional): Filtering conditions {field: value}.
+            exact_count (bool): Compute the exact total of the filtered rows.
+            projection (Select, optional): Flat column select to page instead of
+                entities; see `_projection_records`.
 
-        await self.db.commit()
-        await self.db.refresh(existing)
-        return existing
+        Returns:
+            Tuple: The records, the total count (None without `exact_count`) and
+            whether more rows follow this page.
+        """
+        total_col = func.count().over().label("_total_count")
 
-    async def count_all(self, filters: Optional[Dict[str, Any]] = None) -> int:
-        query = select(func.count()).select_from(self.model)
+        if projection is not None:
+            query = projection
+        elif field_names:
+            query = select(*(getattr(self.model, field) for field in field_names))
+        else:
+            query = select(self.model)
+
+        if exact_count:
+            query = query.add_columns(total_col)
+
+        if relationships:
+            query = query.options(
+                *(joinedload(getattr(self.model, rel)) for rel in relationships)
+            )
+
+        conditions = self._build_filter_conditions(filters)
+        if conditions:
+            query = query.where(and_(*conditions))
+
+        limit = batch_size if exact_count else batch_size + 1
+        query = query.offset(start_index).limit(limit)
 
-        if filters:
-            conditions = []
-            for field, value in filters.items():
-                col = getattr(self.model, field, None)
-                if col is not None and value is not None:
-                    if isinstance(value, str):
-                        # case-insensitive partial match
-                        conditions.append(col.ilike(f"%{value}%"))
-                    else:
-                        conditions.append(col == value)
+        result = await self.db.execute(query)
+        if field_names or projection is not None:
+            rows = result.all()
+        else:
+            rows = result.unique().all()
+
+        if exact_count:
+            if rows:
+                total_count = rows[0]._total_count
+            elif start_index > 0:
+                # Page past the end: the window column has no row to ride on
+                total_count = await self.count_all(filters=filters)
+            else:
+                total_count = 0
+            has_more = start_index + len(rows) < total_count
+        else:
+            total_count = None
+            has_more = len(rows) > batch_size
+            rows = rows[:batch_size]
+
+        if projection is not None:
+            records = self._projection_records(projection, rows)
+        elif field_names:
+            records = [dict(zip(field_names, row[: len(field_names)])) for row in rows]
+        else:
+            records = [row[0] for row in rows]
+        return records, total_count, has_more
 
+    async def get_all_denorm_keyset(
+        self,
+        batch_size: int,
+        cursor: Optional[str] = None,
+        sort_key: str = "id",
+        descending: bool = False,
+        field_names: Optional[List[str]] = None,
+        relationships: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        projection: Optional[Select] = None,
+        exact_count: bool = False,
+    ) -> Tuple[
+        Union[List[Dict[str, Any]], List[RecordType]], Optional[str], Optional[int]
+    ]:
+        """
+        Get a page of denormalized records using keyset (cursor) pagination.
+
+        Instead of OFFSET, the query seeks past the last row of the previous page
+        on `(sort_key, id)`, so deep pages cost the same as the first one.
+
+        With `exact_count`, the total of the filtered rows comes back in the same
+        query. It cannot be a `count(*) OVER ()` window column like in offset
+        mode: the window would only count the rows past the cursor. It is a
+        scalar subquery column over the filtered rows instead.
+
+        Args:
+            batch_size (int): The page size.
+            cursor (str, optional): Opaque cursor returned by the previous page.
+            sort_key (str): Column to order by. `id` is always the tie-breaker.
+            descending (bool): Sort from newest/largest to oldest/smallest.
+            field_names (List[str], optional): Specific field names to select.
+            relationships (List[str], optional): Relationships to join-load.
+            filters (Dict[str, Any], optional): Filtering conditions {field: value}.
+            projection (Select, optional): Flat column select to page instead of
+                entities; see `_projection_records`.
+            exact_count (bool): Also compute the total count of the filtered rows.
+
+        Returns:
+            Tuple: The records, the cursor of the next page (None on the last page)
+            and the total count (None without `exact_count`).
+        """
+        sort_expr, sort_type = self._get_sort_expression(sort_key)
+        id_col = self.model.id
+        cursor_value = sort_expr.label("_cursor_sort_value")
+        flat_rows = bool(field_names) or projection is not None
+
+        if projection is not None:
+            query = projection.add_columns(id_col.label("_cursor_id"), cursor_value)
+        elif field_names:
+            query = select(
+                *(getattr(self.model, field) for field in field_names),
+                id_col.label("_cursor_id"),
+                cursor_value,
+            )
+        else:
+            query = select(self.model, cursor_value)
+
+        if relationships:
+            query = query.options(
+                *(joinedload(getattr(self.model, rel)) for rel in relationships)
+            )
+
+        conditions = self._build_filter_conditions(filters)
+
+        count_query = None
+        if exact_count:
+            # Only the ids: the projection's joins and filters, not its columns
+            counted = (
+                projection.with_only_columns(id_col)
+                if projection is not None
+                else select(id_col)
+            )
             if conditions:
-                query = query.where(and_(*conditions))
+                counted = counted.where(and_(*conditions))
+            count_query = select(func.count()).select_from(
+                counted.order_by(None).subquery()
+            )
+            query = query.add_columns(
+                count_query.scalar_subquery().label("_total_count")
+            )
+
+        if cursor:
+            last_value, last_id = decode_cursor(cursor, sort_key, sort_type)
+            conditions.append(
+                self._build_seek_condition(
+                    sort_expr, last_value, last_id, descending, is_id=sort_key == "id"
+                )
+            )
+
+        if conditions:
+            query = query.where(and_(*conditions))
+
+        if sort_key == "id":
+            order_by = [id_col.desc() if descending else id_col.asc()]
+        elif descending:
+            order_by = [sort_expr.desc().nulls_last(), id_col.desc()]
+        else:
+            order_by = [sort_expr.asc().nulls_first(), id_col.asc()]
+
+        # Fetch one extra row to know whether there is a next page
+        query = query.order_by(*order_by).limit(batch_size + 1)
+        result = await self.db.execute(query)
+
+        if flat_rows:
+            rows = result.all()
+        else:
+            rows = result.unique().all()
+
+        has_more = len(rows) > batch_size
+        rows = rows[:batch_size]
+        next_cursor = None
+        if has_more:
+            last_row = rows[-1]
+            last_id = last_row._cursor_id if flat_rows else last_row[0].id
+            next_cursor = encode_cursor(sort_key, last_row._cursor_sort_value, last_id)
+
+        total_count = None
+        if count_query is not None:
+            if rows:
+                total_count = rows[0]._total_count
+            elif cursor:
+                # Page past the end: the count column has no row to ride on
+                total_count = (await self.db.execute(count_query)).scalar_one()
+            else:
+                total_count = 0
+
+        if projection is not None:
+            records = self._projection_records(projection, rows)
+        elif field_names:
+            records = [dict(zip(field_names, row[: len(field_names)])) for row in rows]
+        else:
+            records = [row[0] for row in rows]
+        return records, next_cursor, total_count
+
+    async def update_returning(self, id: int, update_data: dict) -> Optional[Row]:
+        """
+        Update a record with a single UPDATE ... WHERE id = :id RETURNING statement,
+        without loading the entity into the session.
+
+        The WHERE clause also requires at least one column to differ from the
+        payload, so an unchanged payload writes nothing (and does not touch
+        `modified_on`). Only in that case, or when the id does not exist, a
+        plain SELECT tells the two apart.
+
+        Returns:
+            Optional[Row]: The row's columns after the update, None if not found.
+        """
+        if id is None or update_data is None:
+            raise ValueError("Invalid id or object.")
+
+        # Deferred columns (e.g. blobs) are written but not sent back
+        columns = [
+            attr.columns[0]
+            for attr in inspect(self.model).column_attrs
+            if not attr.deferred
+        ]
+        if update_data:
+            changed = or_(
+                *(
+                    getattr(self.model, key).is_distinct_from(value)
+                    for key, value in update_data.items()
+                )
+            )
+            stmt = (
+                update(self.model)
+                .where(self.model.id == id, changed)
+                .values(**update_data)
+                .returning(*columns)
+                .execution_options(synchronize_session=False)
+            )
+            try:
+                result = await self.db.execute(stmt)
+                row = result.one_or_none()
+                if row is not None:
+                    await self.db.commit()
+                    return row
+            except Exception as e:
+                await self.db.rollback()
+                raise e
+
+        # Nothing was written: the payload is unchanged or the id does not exist
+        result = await self.db.execute(select(*columns).where(self.model.id == id))
+        return result.one_or_none()
+
+    async def count_all(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        query = select(func.count()).select_from(self.model)
+
+        conditions = self._build_filter_conditions(filters)
+        if conditions:
+            query = query.where(and_(*conditions))
 
         result = await self.db.execute(query)
         return result.scalar_one()
@@ -165,35 +524,123 @@ class AbstractAsyncRepository(ABC, Generic[RecordType]):
         pk_config: dict[str, Any],
         other_field_queries: Optional[Dict[str, Any]] = None,
     ) -> bool:
-        """Check if data exists"""
-        query = (
-            select(func.count())
-            .select_from(self.model)
-            .filter(
-                getattr(self.model, pk_config["fieldName"]) == pk_config["fieldValue"]
-            )
-        )
-
+        """Check if data exists. Stops at the first matching row."""
+        conditions = [
+            getattr(self.model, pk_config["fieldName"]) == pk_config["fieldValue"]
+        ]
         if other_field_queries:
             for field, value in other_field_queries.items():
-                query = query.filter(getattr(self.model, field) == value)
+                conditions.append(getattr(self.model, field) == value)
 
+        query = select(
+            exists(select(literal(1)).where(*conditions).limit(1))  # type: ignore
+        )
         result = await self.db.execute(query)
-        return result.scalar_one() > 0
+        return bool(result.scalar_one())
 
     async def delete_by_id(self, id: int) -> bool:
+        """
+        Delete a record with a single DELETE ... WHERE id = :id RETURNING id,
+        without loading it first. Returns False if the record does not exist.
+        """
         if id is None:
             raise ValueError("Invalid ID.")
 
-        record = await self.get_by_id(id)
-
-        if not record:
-            return False
-
+        stmt = (
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
         try:
-            await self.db.delete(record)
+            result = await self.db.execute(stmt)
+            deleted_id = result.scalar_one_or_none()
             await self.db.commit()
-            return True
+            return deleted_id is not None
         except Exception as e:
             await self.db.rollback()
             raise e
+
+    @staticmethod
+    def _projection_records(
+        projection: Select, rows: List[Row]
+    ) -> List[Dict[str, Any]]:
+        """
+        Turn rows of a flat `projection` into plain dicts keyed by column label.
+        Bookkeeping columns added after the projection (window total, cursor
+        values) are dropped.
+        """
+        keys = list(projection.selected_columns.keys())
+        return [dict(zip(keys, row)) for row in rows]
+
+    def _build_filter_conditions(self, filters: Optional[Dict[str, Any]]) -> list:
+        conditions = []
+        if not filters:
+            return conditions
+        for field, value in filters.items():
+            col = getattr(self.model, field, None)
+            if col is not None and value is not None:
+                if isinstance(value, str):
+                    # case-insensitive partial match
+                    conditions.append(col.ilike(f"%{value}%"))
+                else:
+                    conditions.append(col == value)
+        return conditions
+
+    def _get_sort_expression(self, sort_key: str) -> Tuple[Any, type]:
+        """
+        Return the expression to order and seek on, with the Python type of its values.
+
+        SQLite stores dates as text in more than one format (server defaults have no
+        microseconds, ORM writes do), so dates are compared as their stored text to
+        keep the seek consistent with ORDER BY.
+        """
+        columns = self.model.__table__.columns  # type: ignore
+        if sort_key not in columns:
+            raise ValueError(
+                f"Invalid sort key: {sort_key}. Available sort keys: {[c.name for c in columns]}"
+            )
+        sort_col = getattr(self.model, sort_key)
+        if (
+            isinstance(sort_col.type, (Date, DateTime))
+            and self.db.get_bind().dialect.name == "sqlite"
+        ):
+            return type_coerce(sort_col, String), str
+        return sort_col, sort_col.type.python_type
+
+    def _build_seek_condition(
+        self, sort_col, last_value: Any, last_id: int, descending: bool, is_id: bool
+    ) -> Any:
+        """
+        Rows strictly after (last_value, last_id) in the page ordering.
+        NULL sort values come first in ascending order and last in descending order.
+        """
+        id_col = self.model.id
+        if is_id:
+            return id_col < last_id if descending else id_col > last_id
+
+        if descending:
+            if last_value is None:
+                return and_(sort_col.is_(None), id_col < last_id)
+            return or_(
+                sort_col < last_value,
+                and_(sort_col == last_value, id_col < last_id),
+                sort_col.is_(None),
+            )
+
+        if last_value is None:
+            return or_(
+                and_(sort_col.is_(None), id_col > last_id), sort_col.is_not(None)
+            )
+        return or_(
+            sort_col > last_value, and_(sort_col == last_value, id_col > last_id)
+        )
+
+    def _dialect_insert(self):
+        """INSERT construct supporting ON CONFLICT for the bound dialect."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            return sqlite.insert(self.model)
+        if dialect == "postgresql":
+            return postgresql.insert(self.model)
+        raise ValueError(f"Bulk upsert is not supported on {dialect}.")
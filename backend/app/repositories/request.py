@@ -1,7 +1,27 @@
 from app.repositories.abc import AbstractAsyncRepository
+import hashlib
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Type
+from sqlalchemy import select, func, and_, or_, text, Row, Select
+from sqlalchemy.orm import joinedload
+from typing import Type, List, Optional, Dict, Any, Tuple, Union
 from app.models.requests import Request, Customer, Area, SalesPerson
+from app.models.events import allocate_lab_ref_nos
+from app.models.stickers import Sticker
+from app.models.search import (
+    requests_fts,
+    build_match_query,
+    REQUESTS_FTS_COLUMNS,
+    REQUESTS_FTS_DDL,
+    REQUESTS_FTS_REBUILD,
+    REQUESTS_TRGM_DDL,
+    REFERENCE_FTS_COLUMNS,
+    REFERENCE_FTS_DDL,
+    REFERENCE_TRGM_DDL,
+    fts_rebuild,
+    fts_table,
+)
+from app.models.generic import RecordType
+from app.core.pagination import encode_cursor, decode_cursor
 
 
 class RequestRepository(AbstractAsyncRepository[Request]):
@@ -13,8 +33,289 @@ class RequestRepository(AbstractAsyncRepository[Request]):
     def model(self) -> Type[Request]:
         return Request
 
+    def view_projection(self) -> Select:
+        """
+        Flat select of exactly the fields of `RequestViewSchema`.
 
-class CustomerRepository(AbstractAsyncRepository[Customer]):
+        Customer, area and sales person are outer-joined and their display
+        values computed in SQL ("-" when missing, "First L" for sales persons),
+        so list pages are read as plain rows without hydrating any entity.
+        """
+        sales_person_name = (
+            SalesPerson.first_name + " " + func.substr(SalesPerson.last_name, 1, 1)
+        )
+        return (
+            select(
+                Request.id,
+                Request.ref_no,
+                Request.date_received,
+                Request.status,
+                Request.feedback,
+                Request.lpo_no,
+                Request.quantity,
+                Request.short_description,
+                Request.long_description,
+                func.coalesce(sales_person_name, "-").label("sales_person"),
+                Request.created_by,
+                Request.created_on,
+                Request.modified_by,
+                Request.modified_on,
+                func.coalesce(Customer.name, "-").label("customer_name"),
+                func.coalesce(Area.name, "-").label("area_name"),
+            )
+            .outerjoin(Customer, Request.customer_id == Customer.id)
+            .outerjoin(Area, Request.area_id == Area.id)
+            .outerjoin(SalesPerson, Request.sales_person_id == SalesPerson.id)
+        )
+
+    async def get_blocking_sticker_canvas_ids(self, request_id: int) -> List[int]:
+        """
+        Sticker canvases whose stickers still reference the request and would
+        make deleting it fail. One query on `stickers`, no transaction opened.
+        """
+        result = await self.db.execute(
+            select(Sticker.sticker_canvas_id)
+            .where(Sticker.request_id == request_id)
+            .distinct()
+        )
+        return list(result.scalars().all())
+
+    async def bulk_create(
+        self, rows: List[Dict[str, Any]], commit: bool = True
+    ) -> List[int]:
+        # Bulk INSERTs skip the ORM `before_insert` listener, so assign ref_no
+        # here, on copies: the caller's dicts are left as they were passed in
+        rows = [dict(row) for row in rows]
+        await self._assign_ref_nos([row for row in rows if not row.get("ref_no")])
+        return await super().bulk_create(rows, commit=commit)
+
+    async def bulk_upsert(
+        self, rows: List[Dict[str, Any]], commit: bool = True
+    ) -> List[int]:
+        rows = [dict(row) for row in rows]
+        missing = [row for row in rows if not row.get("ref_no")]
+        existing_ids = [row["id"] for row in missing if row.get("id") is not None]
+        if existing_ids:
+            result = await self.db.execute(
+                select(Request.id, Request.ref_no).where(Request.id.in_(existing_ids))
+            )
+            existing_ref_nos = dict(result.tuples().all())
+            for row in missing:
+                if row.get("id") in existing_ref_nos:
+                    row["ref_no"] = existing_ref_nos[row["id"]]
+        await self._assign_ref_nos([row for row in missing if not row.get("ref_no")])
+        return await super().bulk_upsert(rows, commit=commit)
+
+    async def _assign_ref_nos(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        ref_nos = await self.db.run_sync(
+            lambda session: allocate_lab_ref_nos(session.connection(), len(rows))
+        )
+        for row, ref_no in zip(rows, ref_nos):
+            row["ref_no"] = ref_no
+
+    async def search_with_total(
+        self,
+        search: str,
+        start_index: int,
+        batch_size: int,
+        relationships: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        exact_count: bool = True,
+        projection: Optional[Select] = None,
+    ) -> Tuple[Union[List[Dict[str, Any]], List[Request]], Optional[int], bool]:
+        """
+        Full-text search over ref_no, short/long description and LPO no.
+
+        On SQLite the `requests_fts` index is used and results are ranked by
+        relevance (bm25). Other dialects fall back to ilike matching on the
+        same columns, ordered by id; on PostgreSQL it is served by the pg_trgm
+        indexes.
+
+        Args:
+            search (str): Free-text search terms. Every word must match (prefix match).
+            start_index (int): Query starting index.
+            batch_size (int): The page size.
+            relationships (List[str], optional): Relationships to join-load.
+            filters (Dict[str, Any], optional): Additional filtering conditions.
+            exact_count (bool): Compute the exact total of the matching rows.
+            projection (Select, optional): Flat column select to page instead of
+                entities, such as `view_projection()`.
+
+        Returns:
+            Tuple: The records, the total count (None without `exact_count`) and
+            whether more rows follow this page.
+        """
+        match_query = build_match_query(search)
+        if not match_query:
+            return await self.get_all_denorm_with_total(
+                start_index,
+                batch_size,
+                relationships=relationships,
+                filters=filters,
+                exact_count=exact_count,
+                projection=projection,
+            )
+
+        query = projection if projection is not None else select(Request)
+        if exact_count:
+            query = query.add_columns(func.count().over().label("_total_count"))
+
+        conditions = self._build_filter_conditions(filters)
+        if self.db.get_bind().dialect.name == "sqlite":
+            query = query.join(requests_fts, requests_fts.c.rowid == Request.id)
+            conditions.append(requests_fts.c.requests_fts.op("MATCH")(match_query))
+            query = query.order_by(requests_fts.c.rank, Request.id)
+        else:
+            for word in search.split():
+                conditions.append(
+                    or_(
+                        *(
+                            getattr(Request, col).ilike(f"%{word}%")
+                            for col in REQUESTS_FTS_COLUMNS
+                        )
+                    )
+                )
+            query = query.order_by(Request.id)
+
+        query = query.where(and_(*conditions))
+
+        if relationships:
+            query = query.options(
+                *(joinedload(getattr(Request, rel)) for rel in relationships)
+            )
+
+        limit = batch_size if exact_count else batch_size + 1
+        result = await self.db.execute(query.offset(start_index).limit(limit))
+        rows = result.all() if projection is not None else result.unique().all()
+
+        if exact_count:
+            total_count = rows[0]._total_count if rows else None
+            if total_count is None:
+                total_count = (
+                    0
+                    if start_index == 0
+                    else await self._count_search(query.order_by(None))
+                )
+            has_more = start_index + len(rows) < total_count
+        else:
+            total_count = None
+            has_more = len(rows) > batch_size
+            rows = rows[:batch_size]
+        if projection is not None:
+            return self._projection_records(projection, rows), total_count, has_more
+        return [row[0] for row in rows], total_count, has_more
+
+    async def _count_search(self, query) -> int:
+        subquery = query.with_only_columns(Request.id).subquery()
+        result = await self.db.execute(select(func.count()).select_from(subquery))
+        return result.scalar_one()
+
+    async def rebuild_search_index(self) -> bool:
+        """
+        Create the search indexes if missing. On SQLite every request is also
+        re-indexed into FTS5; on PostgreSQL the pg_trgm indexes maintain
+        themselves. Returns False on other dialects.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            for statement in REQUESTS_TRGM_DDL:
+                await self.db.execute(text(statement))
+            await self.db.commit()
+            return True
+        if dialect != "sqlite":
+            return False
+        for statement in REQUESTS_FTS_DDL:
+            await self.db.execute(text(statement))
+        await self.db.execute(text(REQUESTS_FTS_REBUILD))
+        await self.db.commit()
+        return True
+
+
+class ReferenceRepository(AbstractAsyncRepository[RecordType]):
+    """
+    Repository of a reference table (customers, areas, sales persons) with a
+    typeahead search on its display name.
+    """
+
+    def display_name(self) -> Any:
+        """SQL expression of the name shown to users and sorted on."""
+        return self.model.name
+
+    async def typeahead(
+        self, search: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Page of `{id, name}` whose name has a word starting with every word of
+        `search`, sorted by name; an empty search pages through the whole table.
+
+        On SQLite the `<table>_fts` index answers the word-prefix match; other
+        dialects use ilike '%word%' on the indexed columns (pg_trgm on
+        PostgreSQL), with % and _ in the words matched literally. Pages are
+        keyset-paginated on (name, id); a NULL name sorts as ''.
+
+        Returns:
+            Tuple: The matches and the cursor of the next page (None on the last page).
+        """
+        table_name = self.model.__tablename__
+        # NULL never compares equal, which would stall the keyset
+        name = func.coalesce(self.display_name(), "")
+        query = select(self.model.id, name.label("name"))
+
+        if search.split():
+            if self.db.get_bind().dialect.name == "sqlite":
+                fts = fts_table(table_name)
+                query = query.join(fts, fts.c.rowid == self.model.id).where(
+                    fts.c[fts.name].op("MATCH")(build_match_query(search))
+                )
+            else:
+                columns = [
+                    getattr(self.model, c) for c in REFERENCE_FTS_COLUMNS[table_name]
+                ]
+                query = query.where(
+                    *(
+                        or_(*(col.icontains(word, autoescape=True) for col in columns))
+                        for word in search.split()
+                    )
+                )
+
+        if cursor:
+            last_name, last_id = decode_cursor(cursor, "name", str)
+            query = query.where(
+                or_(name > last_name, and_(name == last_name, self.model.id > last_id))
+            )
+
+        # Fetch one extra row to know whether there is a next page
+        query = query.order_by(name, self.model.id).limit(limit + 1)
+        rows = (await self.db.execute(query)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor("name", rows[-1].name, rows[-1].id)
+        return [{"id": row.id, "name": row.name} for row in rows], next_cursor
+
+    async def rebuild_search_index(self) -> bool:
+        """Like `RequestRepository.rebuild_search_index`, for this table."""
+        table_name = self.model.__tablename__
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            for statement in REFERENCE_TRGM_DDL[table_name]:
+                await self.db.execute(text(statement))
+            await self.db.commit()
+            return True
+        if dialect != "sqlite":
+            return False
+        for statement in REFERENCE_FTS_DDL[table_name]:
+            await self.db.execute(text(statement))
+        await self.db.execute(text(fts_rebuild(table_name)))
+        await self.db.commit()
+        return True
+
+
+class CustomerRepository(ReferenceRepository[Customer]):
+
+    upsert_conflict_key = "name"
 
     def __init__(self, db: AsyncSession):
         super().__init__(db)
@@ -24,7 +325,9 @@ class CustomerRepository(AbstractAsyncRepository[Customer]):
         return Customer
 
 
-class AreaRepository(AbstractAsyncRepository[Area]):
+class AreaRepository(ReferenceRepository[Area]):
+
+    upsert_conflict_key = "name"
 
     def __init__(self, db: AsyncSession):
         super().__init__(db)
@@ -33,8 +336,39 @@ class AreaRepository(AbstractAsyncRepository[Area]):
     def model(self) -> Type[Area]:
         return Area
 
+    async def create(self, obj: Area) -> Area:
+        obj.logo_hash = logo_content_hash(obj.logo)  # type: ignore
+        return await super().create(obj)
+
+    async def bulk_create(
+        self, rows: List[Dict[str, Any]], commit: bool = True
+    ) -> List[int]:
+        return await super().bulk_create(_with_logo_hash(rows), commit=commit)
 
-class SalesPersonRepository(AbstractAsyncRepository[SalesPerson]):
+    async def bulk_upsert(
+        self, rows: List[Dict[str, Any]], commit: bool = True
+    ) -> List[int]:
+        return await super().bulk_upsert(_with_logo_hash(rows), commit=commit)
+
+    async def update_returning(self, id: int, update_data: dict) -> Optional[Row]:
+        return await super().update_returning(id, _with_logo_hash([update_data])[0])
+
+    async def get_logo_hash(self, area_id: int) -> Optional[Row]:
+        """(id, logo_hash, has_logo) of an area, without reading the blob."""
+        result = await self.db.execute(
+            select(Area.id, Area.logo_hash, Area.has_logo).where(Area.id == area_id)
+        )
+        return result.one_or_none()
+
+    async def get_logo(self, area_id: int) -> Optional[Row]:
+        """(logo, logo_hash) of an area; the only query that reads the blob."""
+        result = await self.db.execute(
+            select(Area.logo, Area.logo_hash).where(Area.id == area_id)
+        )
+        return result.one_or_none()
+
+
+class SalesPersonRepository(ReferenceRepository[SalesPerson]):
 
     def __init__(self, db: AsyncSession):
         super().__init__(db)
@@ -42,3 +376,18 @@ class SalesPersonRepository(AbstractAsyncRepository[SalesPerson]):
     @property
     def model(self) -> Type[SalesPerson]:
         return SalesPerson
+
+    def display_name(self) -> Any:
+        return SalesPerson.first_name + " " + SalesPerson.last_name
+
+
+def logo_content_hash(logo: Optional[bytes]) -> Optional[str]:
+    return hashlib.sha256(logo).hexdigest() if logo else None
+
+
+def _with_logo_hash(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """`rows`, with copies carrying `logo_hash` in place of those writing a logo."""
+    return [
+        dict(row, logo_hash=logo_content_hash(row["logo"])) if "logo" in row else row
+        for row in rows
+    ]
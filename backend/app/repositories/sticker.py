@@ -2,9 +2,10 @@ from app.repositories.abc import AbstractAsyncRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
-from typing import Type, Optional
-from app.models.stickers import Sticker, StickerCanvas
-from app.models.requests import Request
+from datetime import datetime
+from typing import Type, Optional, List, Set, Dict, Tuple
+from app.models.stickers import Sticker, StickerCanvas, StickerRenderJob
+from app.models.requests import Request, Area
 
 
 class StickerRepository(AbstractAsyncRepository[Sticker]):
@@ -37,10 +38,131 @@ class StickerCanvasRepository(AbstractAsyncRepository[StickerCanvas]):
                 .joinedload(Request.customer),  # load customer
                 joinedload(StickerCanvas.stickers)
                 .joinedload(Sticker.requests)
-                .joinedload(Request.area),  # load area
+                .joinedload(Request.area)
+                .undefer(Area.logo),  # load area with its (deferred) logo
             )
             .where(StickerCanvas.id == sticker_canvas_id)
         )
 
         result = await self.db.execute(stmt)
         return result.unique().scalar_one_or_none()
+
+    async def get_sticker_request_ids(self, canvas_ids: List[int]) -> List[int]:
+        """
+        Request ids of the stickers of `canvas_ids`, canvas by canvas in the
+        given order, stickers in creation order.
+        """
+        by_canvas = await self.get_canvas_request_ids(canvas_ids)
+        return [rid for cid in canvas_ids for rid in by_canvas[cid]]
+
+    async def get_canvas_request_ids(
+        self, canvas_ids: List[int]
+    ) -> Dict[int, List[int]]:
+        """Request ids of the stickers of each canvas, in creation order."""
+        existing = await self.db.execute(
+            select(StickerCanvas.id).where(StickerCanvas.id.in_(canvas_ids))
+        )
+        missing = set(canvas_ids) - set(existing.scalars().all())
+        if missing:
+            raise ValueError(f"Sticker canvases not found: {sorted(missing)}")
+
+        result = await self.db.execute(
+            select(Sticker.sticker_canvas_id, Sticker.request_id)
+            .where(Sticker.sticker_canvas_id.in_(canvas_ids))
+            .order_by(Sticker.id)
+        )
+        by_canvas: Dict[int, List[int]] = {cid: [] for cid in canvas_ids}
+        for canvas_id, request_id in result.all():
+            by_canvas[canvas_id].append(request_id)
+        return by_canvas
+
+    async def get_canvas_documents(
+        self,
+        canvas_ids: Optional[List[int]] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, Optional[str]]]:
+        """
+        (id, relative_file_path) of the canvases `canvas_ids` in the given
+        order, or else of the canvases created in [created_from, created_to)
+        by creation time. At most `limit` canvases (ValueError beyond).
+        """
+        stmt = select(StickerCanvas.id, StickerCanvas.relative_file_path)
+        if canvas_ids:
+            stmt = stmt.where(StickerCanvas.id.in_(canvas_ids))
+        else:
+            if created_from is not None:
+                stmt = stmt.where(StickerCanvas.created_on >= created_from)
+            if created_to is not None:
+                stmt = stmt.where(StickerCanvas.created_on < created_to)
+            stmt = stmt.order_by(StickerCanvas.created_on, StickerCanvas.id)
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        rows = [(row.id, row.relative_file_path) for row in await self.db.execute(stmt)]
+        if limit is not None and len(rows) > limit:
+            raise ValueError(f"A bulk download cannot exceed {limit} canvases.")
+
+        if not canvas_ids:
+            return rows
+        paths = dict(rows)
+        missing = set(canvas_ids) - set(paths)
+        if missing:
+            raise ValueError(f"Sticker canvases not found: {sorted(missing)}")
+        return [(cid, paths[cid]) for cid in dict.fromkeys(canvas_ids)]
+
+    async def get_requests_for_stickers(self, request_ids: List[int]) -> List[Request]:
+        """
+        Requests with customer and area (logo undeferred) in the order of
+        `request_ids`, which may repeat. Each distinct request and area is
+        loaded once.
+        """
+        result = await self.db.execute(
+            select(Request)
+            .options(
+                joinedload(Request.customer),
+                joinedload(Request.area).undefer(Area.logo),
+            )
+            .where(Request.id.in_(set(request_ids)))
+        )
+        requests = {req.id: req for req in result.unique().scalars().all()}
+        missing = set(request_ids) - set(requests)
+        if missing:
+            raise ValueError(f"Requests not found: {sorted(missing)}")
+        return [requests[rid] for rid in request_ids]
+
+    async def get_stale_canvas_ids(self, canvas_ids: List[int]) -> Set[int]:
+        """
+        Canvases among `canvas_ids` whose document is older than the last
+        modification of one of their requests, or predates render tracking.
+        """
+        if not canvas_ids:
+            return set()
+        untracked = await self.db.execute(
+            select(StickerCanvas.id).where(
+                StickerCanvas.id.in_(canvas_ids),
+                StickerCanvas.relative_file_path.is_not(None),
+                StickerCanvas.rendered_on.is_(None),
+            )
+        )
+        outdated = await self.db.execute(
+            select(Sticker.sticker_canvas_id)
+            .join(StickerCanvas, Sticker.sticker_canvas_id == StickerCanvas.id)
+            .join(Request, Sticker.request_id == Request.id)
+            .where(
+                StickerCanvas.id.in_(canvas_ids),
+                StickerCanvas.relative_file_path.is_not(None),
+                Request.modified_on > StickerCanvas.rendered_on,
+            )
+            .distinct()
+        )
+        return set(untracked.scalars().all()) | set(outdated.scalars().all())
+
+    async def is_document_referenced_by_job(self, relative_path: str) -> bool:
+        """Whether a render job still points to the document at `relative_path`."""
+        result = await self.db.execute(
+            select(StickerRenderJob.id)
+            .where(StickerRenderJob.relative_file_path == relative_path)
+            .limit(1)
+        )
+        return result.scalar_one_or_none() is not None
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.user import User
+from app.core.passwords import password_hasher
 from typing import Optional
 
 
@@ -52,8 +53,21 @@ class UserRepository:
         return True
 
     async def authenticate_user(self, username: str, password: str) -> Optional[User]:
-        """Authenticate a user by their username and password."""
+        """
+        Authenticate a user by their username and password. A password hash
+        with an outdated bcrypt cost is replaced by a current one.
+        """
         user = await self.get_user_by_username(username)
-        if user and user.check_password(password):
-            return user
-        return None
+        if not user:
+            await password_hasher.verify_dummy(password)
+            return None
+        valid, new_hash = await password_hasher.verify_and_update(
+            password, str(user.password_hash)
+        )
+        if not valid:
+            return None
+        if new_hash:
+            user.password_hash = new_hash
+            await self.db.commit()
+            await self.db.refresh(user)
+        return user
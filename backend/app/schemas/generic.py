@@ -1,6 +1,23 @@
 from pydantic import BaseModel
 from app.schemas.users import UserPublic
 from app.core.types import *
+from enum import Enum
+
+
+class PaginationModeEnum(str, Enum):
+    OFFSET = "offset"
+    CURSOR = "cursor"
+
+
+class CountModeEnum(str, Enum):
+    EXACT = "exact"
+    HAS_MORE = "has_more"
+
+
+class GranularityEnum(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
 
 
 class APIResponse(BaseModel):
@@ -2,6 +2,7 @@ from datetime import date, datetime
 from typing import Optional
 
 from pydantic import BaseModel, Field
+from typing import List
 
 
 # -------------------------
@@ -28,6 +29,11 @@ class RequestCreateSchema(RequestBaseSchema):
     # lab_ref_no is NOT here → auto-generated
 
 
+class RequestUpsertSchema(RequestCreateSchema):
+    id: Optional[int] = None  # None → insert, existing id → update
+    modified_by: Optional[str] = None
+
+
 # -------------------------
 # Update Schema (PATCH/PUT)
 # -------------------------
@@ -60,6 +66,10 @@ class CustomerCreateSchema(CustomerBaseSchema):
     pass
 
 
+class CustomerUpsertSchema(CustomerBaseSchema):
+    pass  # matched on the unique name
+
+
 class CustomerUpdateSchema(BaseModel):
     name: Optional[str] = Field(None, max_length=255)
 
@@ -84,15 +94,20 @@ class AreaCreateSchema(AreaBaseSchema):
     pass
 
 
+class AreaUpsertSchema(AreaBaseSchema):
+    pass  # matched on the unique name
+
+
 class AreaUpdateSchema(BaseModel):
     name: Optional[str] = Field(None, max_length=255)
-    logo: Optional[str | bytes]
+    logo: Optional[str | bytes] = None
 
 
 class AreaViewSchema(BaseModel):
     id: int
     name: str
-    logo: Optional[str | bytes]
+    logo: Optional[str | bytes]  # URL of /records/areas/{id}/logo
+    logo_hash: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -110,6 +125,10 @@ class SalesPersonCreateSchema(SalesPersonBaseSchema):
     pass
 
 
+class SalesPersonUpsertSchema(SalesPersonBaseSchema):
+    id: Optional[int] = None  # None → insert, existing id → update
+
+
 class SalesPersonUpdateSchema(BaseModel):
     first_name: Optional[str] = Field(None, max_length=255)
     last_name: Optional[str] = Field(None, max_length=255)
@@ -184,10 +203,16 @@ class RequestNormalViewSchema(BaseModel):
 
 
 class RequestResponseWithCount(BaseModel):
-    total_count: int
+    total_count: Optional[int]
+    next_cursor: Optional[str] = None
+    has_more: Optional[bool] = None
     records: (
         list[RequestViewSchema]
         | list[AreaViewSchema]
         | list[CustomerViewSchema]
         | list[SalesPersonViewSchema]
     )
+
+
+class BulkDeleteSchema(BaseModel):
+    ids: List[int]
@@ -69,6 +69,9 @@ class StickerCanvasView(StickerCanvasBase):
     id: int
     stickers: Union[List[StickerView], List[Dict]]
     created_on: datetime
+    rendered_on: Optional[datetime] = None
+    # True when a request changed after the document was rendered
+    document_stale: Optional[bool] = None
 
     @computed_field
     @property
@@ -79,6 +82,45 @@ class StickerCanvasView(StickerCanvasBase):
         from_attributes = True
 
 
+class StickerBatchRenderForm(BaseModel):
+    """Stickers of whole canvases (in order), followed by one sticker per request."""
+
+    canvas_ids: List[int] = []
+    request_ids: List[int] = []
+
+
+class BulkDownloadFormatEnum(str, Enum):
+    ZIP = "zip"
+    PDF = "pdf"
+
+
+class StickerBulkDownloadForm(BaseModel):
+    """Canvases by id (in order) or, without ids, by creation time range."""
+
+    canvas_ids: List[int] = []
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    format: BulkDownloadFormatEnum = BulkDownloadFormatEnum.ZIP
+
+
 class StickerCanvasResponseWithCount(BaseModel):
-    total_count: int
+    total_count: Optional[int]
+    next_cursor: Optional[str] = None
+    has_more: Optional[bool] = None
     records: List[StickerCanvasView]
+
+
+class StickerRenderJobView(BaseModel):
+    id: int
+    kind: str
+    status: LStickerJobStatus
+    attempts: int
+    error: Optional[str] = None
+    document_id: Optional[str] = None
+    created_on: Optional[datetime] = None
+    created_by: Optional[str] = None
+    started_on: Optional[datetime] = None
+    finished_on: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
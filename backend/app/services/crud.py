@@ -1,12 +1,16 @@
 from typing import Type, Generic, List, Optional, Any, Union, Dict, TypedDict
+from pydantic import BaseModel
+from sqlalchemy import Row, Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.abc import AbstractAsyncRepository
 from app.models.generic import RecordType, CreateSchemaType, UpdateSchemaType
 
 
 class RecordResponseWithCount(TypedDict):
-    total_count: int
+    total_count: Optional[int]
     records: Any
+    next_cursor: Optional[str]
+    has_more: bool
 
 
 class CrudService(Generic[RecordType, CreateSchemaType, UpdateSchemaType]):
@@ -40,8 +44,36 @@ class CrudService(Generic[RecordType, CreateSchemaType, UpdateSchemaType]):
         await self.repo.add_only(obj)
         return obj
 
-    async def update(self, id: int, update_data: UpdateSchemaType) -> RecordType:
-        return await self.repo.update(id, update_data.model_dump(exclude_unset=True))
+    async def bulk_create(
+        self, create_data: List[CreateSchemaType], commit: bool = True
+    ) -> List[int]:
+        return await self.repo.bulk_create(
+            [data.model_dump() for data in create_data], commit=commit
+        )
+
+    async def bulk_upsert(
+        self, upsert_data: List[BaseModel], commit: bool = True
+    ) -> List[int]:
+        """Insert or update many records; only the fields set on each item are written."""
+        return await self.repo.bulk_upsert(
+            [data.model_dump(exclude_unset=True) for data in upsert_data],
+            commit=commit,
+        )
+
+    async def bulk_delete_by_ids(self, ids: List[int]) -> List[int]:
+        return await self.repo.bulk_delete_by_ids(ids)
+
+    async def update(self, id: int, update_data: UpdateSchemaType) -> Row:
+        """
+        Update a record in one UPDATE ... RETURNING statement.
+        Returns the updated row (columns only, no relationships).
+        """
+        row = await self.repo.update_returning(
+            id, update_data.model_dump(exclude_unset=True)
+        )
+        if row is None:
+            raise ValueError(f"Record with id {id} does not exist.")
+        return row
 
     async def get_by_field(self, field: str, value: Any) -> Optional[RecordType]:
         return await self.repo.get_by_field(field, value)
@@ -64,12 +96,59 @@ class CrudService(Generic[RecordType, CreateSchemaType, UpdateSchemaType]):
         field_names: Optional[List[str]] = None,
         relationships: Optional[List[str]] = None,
         filters: Optional[Dict[str, Any]] = None,
+        keyset: bool = False,
+        cursor: Optional[str] = None,
+        sort_key: str = "id",
+        descending: bool = False,
+        exact_count: bool = True,
+        projection: Optional[Select] = None,
     ) -> RecordResponseWithCount:
-        records = await self.repo.get_all_denorm(
-            start_index, batch_size, field_names, relationships, filters
-        )
-        total_count = await self.repo.count_all(filters=filters)
-        return {"total_count": total_count, "records": records}
+        """
+        Get a page of records with the total count.
+
+        When `keyset` is set, `start_index` is ignored and the page is fetched by
+        seeking past `cursor` on `(sort_key, id)`; the returned `next_cursor` is
+        used to request the following page.
+
+        In both modes the total comes back from the page query. Without
+        `exact_count` no count is computed: in offset mode `total_count` is only
+        the number of rows up to the end of this page, plus one if `has_more`;
+        in keyset mode, where the position of the page is unknown, it is None.
+
+        A `projection` select pages flat rows (dicts) instead of entities.
+        """
+        next_cursor = None
+        if keyset:
+            records, next_cursor, total_count = await self.repo.get_all_denorm_keyset(
+                batch_size,
+                cursor=cursor,
+                sort_key=sort_key,
+                descending=descending,
+                field_names=field_names,
+                relationships=relationships,
+                filters=filters,
+                projection=projection,
+                exact_count=exact_count,
+            )
+            has_more = next_cursor is not None
+        else:
+            records, total_count, has_more = await self.repo.get_all_denorm_with_total(
+                start_index,
+                batch_size,
+                field_names,
+                relationships,
+                filters,
+                exact_count=exact_count,
+                projection=projection,
+            )
+            if total_count is None:
+                total_count = start_index + len(records) + int(has_more)
+        return {
+            "total_count": total_count,
+            "records": records,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
 
     async def get_all_denorm(
         self,
@@ -1,37 +1,56 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, case
+from sqlalchemy import select, func, case, cast, text, delete, Date
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
 from app.core.types import *
-from app.models.requests import Request, Area
+from app.core.cache import cache_versions
+from app.core.config import get_settings
+from app.core.database import add_missing_columns
+from app.models.requests import Request, Area, Customer, SalesPerson
+from app.models.stats import (
+    RequestStats,
+    RequestDailyStats,
+    RequestTurnaroundStats,
+    rollups,
+    rollup_ddl,
+)
 from app.models.generic import RequestStatusEnum
+from app.schemas.generic import GranularityEnum
+
+settings = get_settings()
+
+_ROLLUP_MODELS = [RequestStats, RequestDailyStats, RequestTurnaroundStats]
 
 
 class DashboardService:
+    # Widest range a single time-series call may cover
+    _MAX_RANGE_DAYS = 3660
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def get_requests_data(self) -> Dict[str, Any]:
-
-        stmt = select(
-            func.count(Request.id).label("total_count"),
-            func.sum(
+        # Read from the `request_stats` aggregate (a few rows per area and
+        # month), not from `requests`, so the cost does not grow with the table
+        def status_count(status: RequestStatusEnum):
+            return func.sum(
                 case(
-                    (Request.status == RequestStatusEnum.NOT_STARTED.value, 1), else_=0
+                    (RequestStats.status == status.value, RequestStats.request_count),
+                    else_=0,
                 )
-            ).label("not_started_count"),
-            func.sum(
-                case(
-                    (Request.status == RequestStatusEnum.IN_PROGRESS.value, 1), else_=0
-                )
-            ).label("in_progress_count"),
-            func.sum(
-                case((Request.status == RequestStatusEnum.COMPLETED.value, 1), else_=0)
-            ).label("completed_count"),
+            )
+
+        stmt = select(
+            func.sum(RequestStats.request_count).label("total_count"),
+            status_count(RequestStatusEnum.NOT_STARTED).label("not_started_count"),
+            status_count(RequestStatusEnum.IN_PROGRESS).label("in_progress_count"),
+            status_count(RequestStatusEnum.COMPLETED).label("completed_count"),
         )
 
         result = await self.db.execute(stmt)
         result = result.one()
         return {
-            "total_count": result.total_count,
+            "total_count": result.total_count if result.total_count else 0,
             "not_started_count": (
                 result.not_started_count if result.not_started_count else 0
             ),
@@ -45,11 +64,213 @@ class DashboardService:
 
     async def get_request_count_per_area(self) -> dict[str, int]:
         stmt = (
-            select(Area.name, func.count(Request.id))
-            .join(Request, Request.area_id == Area.id)
+            select(Area.name, func.sum(RequestStats.request_count))
+            .join(RequestStats, RequestStats.area_id == Area.id)
             .group_by(Area.name)
         )
 
         result = await self.db.execute(stmt)
 
         return {area_name: request_count for area_name, request_count in result.all()}
+
+    async def get_requests_over_time(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        granularity: GranularityEnum = GranularityEnum.DAY,
+    ) -> Dict[str, Any]:
+        """
+        Requests created per day, week (starting Monday) or month, read from
+        `request_daily_stats`. Periods without requests are omitted.
+        """
+        start_date, end_date = self._resolve_range(start_date, end_date)
+        period = self._period_start(RequestDailyStats.day, granularity)
+        stmt = (
+            select(period, func.sum(RequestDailyStats.request_count))
+            .where(RequestDailyStats.day.between(start_date, end_date))
+            .group_by(period)
+            .order_by(period)
+        )
+        result = await self.db.execute(stmt)
+        series = [
+            {"period": str(period_start), "request_count": count}
+            for period_start, count in result.all()
+        ]
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "granularity": granularity.value,
+            "total_count": sum(point["request_count"] for point in series),
+            "series": series,
+        }
+
+    async def get_turnaround(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        granularity: GranularityEnum = GranularityEnum.MONTH,
+    ) -> Dict[str, Any]:
+        """
+        Average days from `date_received` to completion, per period of the
+        completion date, read from `request_turnaround_stats`.
+        """
+        start_date, end_date = self._resolve_range(start_date, end_date)
+        period = self._period_start(RequestTurnaroundStats.day, granularity)
+        stmt = (
+            select(
+                period,
+                func.sum(RequestTurnaroundStats.completed_count),
+                func.sum(RequestTurnaroundStats.turnaround_days),
+            )
+            .where(RequestTurnaroundStats.day.between(start_date, end_date))
+            .group_by(period)
+            .order_by(period)
+        )
+        rows = (await self.db.execute(stmt)).all()
+        series = [
+            {
+                "period": str(period_start),
+                "completed_count": completed,
+                "avg_turnaround_days": round(days / completed, 2),
+            }
+            for period_start, completed, days in rows
+        ]
+        # From the raw sums: the per-period averages are already rounded
+        completed_total = sum(completed for _, completed, _ in rows)
+        days_total = sum(days for _, _, days in rows)
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "granularity": granularity.value,
+            "completed_count": completed_total,
+            "avg_turnaround_days": (
+                round(days_total / completed_total, 2) if completed_total else None
+            ),
+            "series": series,
+        }
+
+    async def get_top_customers(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Customers with the most requests created in the range."""
+        total = func.sum(RequestDailyStats.request_count).label("request_count")
+        stmt = (
+            select(Customer.id, Customer.name, total)
+            .join(Customer, Customer.id == RequestDailyStats.customer_id)
+            .where(
+                RequestDailyStats.day.between(
+                    *self._resolve_range(start_date, end_date)
+                )
+            )
+            .group_by(Customer.id, Customer.name)
+            .order_by(total.desc(), Customer.id)
+            .limit(self._check_limit(limit))
+        )
+        result = await self.db.execute(stmt)
+        return [
+            {"customer_id": id, "name": name, "request_count": count}
+            for id, name, count in result.all()
+        ]
+
+    async def get_top_sales_persons(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Sales persons with the most requests created in the range."""
+        total = func.sum(RequestDailyStats.request_count).label("request_count")
+        name = SalesPerson.first_name + " " + func.substr(SalesPerson.last_name, 1, 1)
+        stmt = (
+            select(SalesPerson.id, name, total)
+            .join(SalesPerson, SalesPerson.id == RequestDailyStats.sales_person_id)
+            .where(
+                RequestDailyStats.day.between(
+                    *self._resolve_range(start_date, end_date)
+                )
+            )
+            .group_by(SalesPerson.id, SalesPerson.first_name, SalesPerson.last_name)
+            .order_by(total.desc(), SalesPerson.id)
+            .limit(self._check_limit(limit))
+        )
+        result = await self.db.execute(stmt)
+        return [
+            {"sales_person_id": id, "name": name, "request_count": count}
+            for id, name, count in result.all()
+        ]
+
+    async def reconcile_request_stats(self) -> int:
+        """
+        Rebuild the dashboard rollup tables from scratch out of `requests`,
+        creating them and their triggers first if the database predates them.
+        Completed requests without `completed_on` are backfilled from
+        `modified_on`, the closest record of when they were completed.
+
+        Returns:
+            int: The number of rollup rows written.
+        """
+        dialect = self.db.get_bind().dialect.name
+        await self.db.run_sync(self._create_rollup_schema)
+        for statement in rollup_ddl(dialect):
+            await self.db.execute(text(statement))
+        if dialect == "postgresql":
+            # Keep writers out until the rebuilt counts are committed
+            await self.db.execute(text("LOCK TABLE requests IN SHARE MODE"))
+
+        await self.db.execute(
+            Request.__table__.update()
+            .where(
+                Request.status == RequestStatusEnum.COMPLETED.value,
+                Request.completed_on.is_(None),
+            )
+            .values(completed_on=func.coalesce(Request.modified_on, Request.created_on))
+        )
+        rows = 0
+        for model in _ROLLUP_MODELS:
+            await self.db.execute(delete(model))
+        for rollup in rollups(dialect):
+            result = await self.db.execute(text(rollup.rebuild()))
+            rows += result.rowcount
+        await self.db.commit()
+        # The rebuild runs as text() statements, which the cache hooks cannot
+        # attribute to a table: drop the cached dashboards explicitly
+        cache_versions.bump("requests")
+        return rows
+
+    @staticmethod
+    def _create_rollup_schema(session) -> None:
+        connection = session.connection()
+        add_missing_columns(connection, Request.__table__, ["completed_on"])
+        for model in _ROLLUP_MODELS:
+            model.__table__.create(connection, checkfirst=True)
+
+    def _resolve_range(
+        self, start_date: Optional[date], end_date: Optional[date]
+    ) -> tuple[date, date]:
+        """Default to the last 30 days, ending today in the configured timezone."""
+        end_date = end_date or datetime.now(ZoneInfo(settings.timezone)).date()
+        start_date = start_date or end_date - timedelta(days=29)
+        if start_date > end_date:
+            raise ValueError("start_date must not be after end_date.")
+        if (end_date - start_date).days > self._MAX_RANGE_DAYS:
+            raise ValueError(f"Date range must not exceed {self._MAX_RANGE_DAYS} days.")
+        return start_date, end_date
+
+    @staticmethod
+    def _check_limit(limit: int) -> int:
+        if not 1 <= limit <= 100:
+            raise ValueError("limit must be between 1 and 100.")
+        return limit
+
+    def _period_start(self, day, granularity: GranularityEnum):
+        """SQL expression for the first day of the period containing `day`."""
+        if granularity == GranularityEnum.DAY:
+            return day
+        if self.db.get_bind().dialect.name == "postgresql":
+            return cast(func.date_trunc(granularity.value, day), Date)
+        if granularity == GranularityEnum.WEEK:
+            return func.date(day, "weekday 0", "-6 days")
+        return func.date(day, "start of month")
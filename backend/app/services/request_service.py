@@ -1,4 +1,4 @@
-from app.services.crud import CrudService
+from app.services.crud import CrudService, RecordResponseWithCount
 from app.schemas import request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.requests import Request, Customer, Area, SalesPerson
@@ -7,15 +7,103 @@ from app.repositories.request import (
     CustomerRepository,
     AreaRepository,
     SalesPersonRepository,
+    logo_content_hash,
 )
+from app.core.types import *
+from app.core.config import get_settings
+from sqlalchemy import Row, Select
 import base64
 
+settings = get_settings()
+
+_IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
 
 class RequestService(
     CrudService[Request, request.RequestCreateSchema, request.RequestUpdateSchema]
 ):
     def __init__(self, db: AsyncSession):
         super().__init__(Request, RequestRepository, db)  # type: ignore
+        self.repo: RequestRepository
+
+    async def search_with_count(
+        self,
+        search: str,
+        start_index: int,
+        batch_size: int,
+        relationships: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        exact_count: bool = True,
+        projection: Optional[Select] = None,
+    ) -> RecordResponseWithCount:
+        """Ranked full-text search page, shaped like `get_all_denorm_with_count`."""
+        records, total_count, has_more = await self.repo.search_with_total(
+            search,
+            start_index,
+            batch_size,
+            relationships=relationships,
+            filters=filters,
+            exact_count=exact_count,
+            projection=projection,
+        )
+        if total_count is None:
+            total_count = start_index + len(records) + int(has_more)
+        return {
+            "total_count": total_count,
+            "records": records,
+            "next_cursor": None,
+            "has_more": has_more,
+        }
+
+    async def get_view_with_count(
+        self,
+        start_index: int,
+        batch_size: int,
+        search: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        keyset: bool = False,
+        cursor: Optional[str] = None,
+        sort_key: str = "id",
+        descending: bool = False,
+        exact_count: bool = True,
+    ) -> RecordResponseWithCount:
+        """
+        A page of `RequestViewSchema`-shaped dicts read through the repository's
+        flat view projection, with the same paging and search options as
+        `get_all_denorm_with_count` / `search_with_count`.
+        """
+        projection = self.repo.view_projection()
+        if search:
+            return await self.search_with_count(
+                search=search,
+                start_index=start_index,
+                batch_size=batch_size,
+                filters=filters,
+                exact_count=exact_count,
+                projection=projection,
+            )
+        return await self.get_all_denorm_with_count(
+            start_index=start_index,
+            batch_size=batch_size,
+            filters=filters,
+            keyset=keyset,
+            cursor=cursor,
+            sort_key=sort_key,
+            descending=descending,
+            exact_count=exact_count,
+            projection=projection,
+        )
+
+    async def rebuild_search_index(self) -> bool:
+        return await self.repo.rebuild_search_index()
+
+    async def get_blocking_sticker_canvas_ids(self, request_id: int) -> List[int]:
+        return await self.repo.get_blocking_sticker_canvas_ids(request_id)
 
 
 class CustomerService(
@@ -30,6 +118,32 @@ class AreaService(
 ):
     def __init__(self, db: AsyncSession):
         super().__init__(Area, AreaRepository, db)  # type: ignore
+        self.repo: AreaRepository
+
+    async def get_logo_hash(self, area_id: int) -> Optional[Row]:
+        return await self.repo.get_logo_hash(area_id)
+
+    async def get_logo(self, area_id: int) -> Optional[Row]:
+        return await self.repo.get_logo(area_id)
+
+    def logo_content_hash(self, logo: bytes) -> Optional[str]:
+        return logo_content_hash(logo)
+
+    def logo_url(self, area_id: int, logo_hash: Optional[str]) -> str:
+        """
+        URL of the area logo endpoint. The content hash in the query string
+        changes whenever the logo does, so browsers may cache it for good.
+        """
+        url = f"{settings.prefix}/records/areas/{area_id}/logo"
+        return f"{url}?v={logo_hash}" if logo_hash else url
+
+    def sniff_image_mime_type(self, data: bytes) -> str:
+        for signature, mime_type in _IMAGE_SIGNATURES:
+            if data.startswith(signature):
+                return mime_type
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            return "image/webp"
+        return "application/octet-stream"
 
     def decode_base64_image(self, b64_string) -> bytes:
         """
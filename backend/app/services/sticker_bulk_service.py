@@ -0,0 +1,200 @@
+import asyncio
+import io
+import logging
+import zipfile
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.repositories.sticker import StickerCanvasRepository
+from app.services.sticker_crud_service import StickerCanvasCrudService
+from app.services.sticker_service import (
+    STICKERS_PER_PAGE,
+    StickerGeneratorService,
+    StickerStorageService,
+    request_sticker_data,
+)
+from app.core.types import *
+
+settings = get_settings()
+logger = logging.getLogger("uvicorn.error")
+
+
+class _ZipSink(io.RawIOBase):
+    """
+    Unseekable file object collecting what ZipFile writes, drained after each
+    write. ZipFile then streams entries with data descriptors instead of
+    seeking back to patch their headers.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class StickerBulkDownloadService:
+    """
+    Many canvas documents in one download: a ZIP of the stored documents, or
+    a single merged PDF of the canvases.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = StickerCanvasRepository(db)
+        self._storage_service = StickerStorageService()
+
+    async def get_canvas_documents(
+        self,
+        canvas_ids: List[int],
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Tuple[int, Optional[str]]]:
+        """(id, relative_file_path) of the canvases to download, in order."""
+        if not canvas_ids and created_from is None and created_to is None:
+            raise ValueError("Either canvas_ids or a created_on range is required.")
+        canvases = await self.repo.get_canvas_documents(
+            canvas_ids,
+            created_from,
+            created_to,
+            limit=settings.sticker_bulk_max_canvases,
+        )
+        if not canvases:
+            raise ValueError("No sticker canvases found.")
+        return canvases
+
+    async def iter_zip(
+        self, canvases: List[Tuple[int, Optional[str]]]
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a ZIP of the canvas documents, read chunk by chunk from storage.
+
+        Canvases without a (stored) document are rendered on demand. Up to
+        `sticker_bulk_concurrency` documents are looked up or rendered ahead of
+        the one being streamed. Canvases that cannot be rendered (e.g. without
+        stickers) or read from storage are listed in `errors.txt` at the end of
+        the archive. A read failing mid-document leaves that entry truncated
+        but the archive valid.
+        """
+        sink = _ZipSink()
+        archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+        pending: deque = deque()
+        remaining = iter(canvases)
+        errors = []
+
+        def schedule() -> None:
+            for canvas_id, path in remaining:
+                task = asyncio.create_task(self._ensure_document(canvas_id, path))
+                pending.append((canvas_id, task))
+                if len(pending) >= settings.sticker_bulk_concurrency:
+                    break
+
+        try:
+            schedule()
+            while pending:
+                canvas_id, task = pending.popleft()
+                schedule()
+                try:
+                    path = await task
+                except Exception as e:
+                    logger.warning(f"Bulk download of canvas {canvas_id}: {e!r}")
+                    errors.append(
+                        f"sticker-canvas-{canvas_id}: {e or type(e).__name__}"
+                    )
+                    continue
+
+                chunks = self._storage_service.storage.iter_bytes(path)
+                try:
+                    # Open the entry only once the document turns out readable
+                    try:
+                        chunk = await anext(chunks, None)
+                    except Exception as e:
+                        logger.warning(f"Bulk download of canvas {canvas_id}: {e!r}")
+                        errors.append(
+                            f"sticker-canvas-{canvas_id}: document could not be read"
+                        )
+                        continue
+
+                    entry = archive.open(f"sticker-canvas-{canvas_id}.pdf", "w")
+                    try:
+                        while chunk is not None:
+                            # Deflate in a worker thread, off the event loop
+                            await asyncio.to_thread(entry.write, chunk)
+                            data = sink.drain()
+                            if data:
+                                yield data
+                            chunk = await anext(chunks, None)
+                    except Exception as e:
+                        # What was sent cannot be taken back: end the entry so
+                        # the archive stays valid, and flag it as cut short
+                        logger.warning(f"Bulk download of canvas {canvas_id}: {e!r}")
+                        errors.append(
+                            f"sticker-canvas-{canvas_id}: document incomplete, "
+                            "reading it failed"
+                        )
+                    await asyncio.to_thread(entry.close)
+                    yield sink.drain()
+                finally:
+                    await chunks.aclose()
+
+            if errors:
+                archive.writestr("errors.txt", "\n".join(errors) + "\n")
+            archive.close()
+            yield sink.drain()
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def _ensure_document(self, canvas_id: int, path: Optional[str]) -> str:
+        """The canvas's stored document, rendered first if it has none."""
+        if path and await self._storage_service.document_exists(path):
+            return path
+        # Concurrent renders cannot share the request's session
+        async with SessionLocal() as session:
+            document, _ = await StickerCanvasCrudService(session).render_document(
+                canvas_id
+            )
+        return document.path
+
+    async def render_merged_pdf(
+        self, canvases: List[Tuple[int, Optional[str]]], path: str
+    ) -> Tuple[int, List[int]]:
+        """
+        Render the canvases into one PDF at `path` in the render pool, each
+        canvas starting on a new page. Returns the number of pages and the
+        skipped (empty) canvases.
+        """
+        canvas_ids = [canvas_id for canvas_id, _ in canvases]
+        request_ids = await self.repo.get_canvas_request_ids(canvas_ids)
+        requests = await self.repo.get_requests_for_stickers(
+            [rid for cid in canvas_ids for rid in request_ids[cid]]
+        )
+        pages, skipped, index = [], [], 0
+        for canvas_id in canvas_ids:
+            count = len(request_ids[canvas_id])
+            if not count:
+                skipped.append(canvas_id)
+                continue
+            stickers = [
+                request_sticker_data(req) for req in requests[index : index + count]
+            ]
+            index += count
+            pages += [
+                stickers[start : start + STICKERS_PER_PAGE]
+                for start in range(0, count, STICKERS_PER_PAGE)
+            ]
+        if not pages:
+            raise ValueError("No stickers found in these canvases.")
+        return await StickerGeneratorService().generate_pages(pages, path), skipped
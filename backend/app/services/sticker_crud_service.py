@@ -1,10 +1,21 @@
 from app.services.crud import CrudService
-from app.services.sticker_service import StickerStorageService
+from app.services.sticker_service import (
+    DocumentInformation,
+    StickerGeneratorService,
+    StickerStorageService,
+    render_fingerprint,
+    request_sticker_data,
+)
 from app.schemas import sticker
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.stickers import Sticker, StickerCanvas
 from app.repositories.sticker import StickerRepository, StickerCanvasRepository
-from typing import Optional
+from app.models.requests import Request
+from app.core.config import get_settings
+from sqlalchemy import func
+from typing import Optional, List, Dict, Any, Set, Tuple
+
+settings = get_settings()
 
 
 class StickerCrudService(
@@ -27,15 +38,113 @@ class StickerCanvasCrudService(
     ) -> Optional[StickerCanvas]:
         return await self.repo.get_canvas_with_stickers_and_requests(sticker_canvas_id)
 
-    async def delete_by_id(self, id: int, relative_path: Optional[str]) -> bool:
-        if not relative_path:
-            print("No relative path")
-            return await super().delete_by_id(id)
-        # Delete document first from storage if document is existing from relative_path
-        storage_deletion_ok = await self._storage_service.delete_document_by_id(
-            relative_path=relative_path
+    async def get_sticker_inputs(self, sticker_canvas_id: int) -> List[Dict[str, Any]]:
+        """Render inputs of the stickers of a canvas."""
+        sticker_canvas = await self._get_canvas_for_render(sticker_canvas_id)
+        return [
+            request_sticker_data(sticker.requests)
+            for sticker in sticker_canvas.stickers
+        ]
+
+    async def render_document(
+        self, sticker_canvas_id: int, force: bool = False
+    ) -> Tuple[DocumentInformation, bool]:
+        """
+        Render a canvas and store the PDF as its current document.
+
+        The render inputs are fingerprinted first: when they match the
+        fingerprint of the canvas's existing document (and its file is still
+        there), that document is returned without rendering, and marked
+        current again. `force` always renders.
+
+        Returns:
+            Tuple: The canvas document and whether it was rendered by this call.
+        """
+        sticker_canvas = await self._get_canvas_for_render(sticker_canvas_id)
+        sticker_inputs = [
+            request_sticker_data(sticker.requests)
+            for sticker in sticker_canvas.stickers
+        ]
+        fingerprint = render_fingerprint(sticker_inputs)
+        previous_path: Optional[str] = sticker_canvas.relative_file_path  # type: ignore
+
+        if (
+            not force
+            and previous_path
+            and sticker_canvas.render_fingerprint == fingerprint
+            and await self._storage_service.document_exists(previous_path)
+        ):
+            await self.repo.update_returning(
+                sticker_canvas_id, {"rendered_on": func.now()}
+            )
+            document_info = DocumentInformation(
+                document_id=sticker_canvas.document_id,  # type: ignore
+                path=previous_path,
+            )
+            return document_info, False
+
+        pdf_bytes = await StickerGeneratorService().generate_pdf(data=sticker_inputs)
+        document_info = await self._storage_service.save_document_bytes(
+            pdf_bytes=pdf_bytes
+        )
+        await self.repo.update_returning(
+            sticker_canvas_id,
+            {
+                "document_id": document_info.document_id,
+                "relative_file_path": document_info.path,
+                "render_fingerprint": fingerprint,
+                "rendered_on": func.now(),
+            },
         )
-        if storage_deletion_ok:
-            return await super().delete_by_id(id)
-        else:
+        # The replaced document is left to the storage GC: a completed render
+        # job may still point to it
+        return document_info, True
+
+    async def get_stale_canvas_ids(self, canvas_ids: List[int]) -> Set[int]:
+        return await self.repo.get_stale_canvas_ids(canvas_ids)
+
+    async def _get_canvas_for_render(self, sticker_canvas_id: int) -> StickerCanvas:
+        sticker_canvas = await self.get_canvas_with_stickers_and_requests(
+            sticker_canvas_id
+        )
+        if not sticker_canvas:
+            raise ValueError("Sticker canvas has empty stickers.")
+        if not sticker_canvas.stickers:
+            raise ValueError("No stickers found in this canvas.")
+        return sticker_canvas
+
+    async def get_batch_requests(
+        self, canvas_ids: List[int], request_ids: List[int]
+    ) -> List[Request]:
+        """
+        The requests of one sticker each for a batch render: the stickers of
+        `canvas_ids` in order, then the ad-hoc `request_ids`.
+        """
+        all_request_ids = []
+        if canvas_ids:
+            all_request_ids += await self.repo.get_sticker_request_ids(canvas_ids)
+        all_request_ids += request_ids
+        if not all_request_ids:
+            raise ValueError("No stickers to render.")
+        if len(all_request_ids) > settings.sticker_batch_max_stickers:
+            raise ValueError(
+                f"A batch cannot exceed {settings.sticker_batch_max_stickers} stickers."
+            )
+        return await self.repo.get_requests_for_stickers(all_request_ids)
+
+    async def delete_by_id(self, id: int) -> bool:
+        """
+        Delete a canvas, then its document unless a render job still points to
+        it (that one, like any leftover, is collected by the storage GC).
+        """
+        sticker_canvas = await self.repo.get_by_id(id)
+        if not sticker_canvas:
+            return False
+        relative_path = sticker_canvas.relative_file_path
+        if not await super().delete_by_id(id):
             return False
+        if relative_path and not await self.repo.is_document_referenced_by_job(
+            relative_path  # type: ignore
+        ):
+            await self._storage_service.delete_document_by_id(relative_path)  # type: ignore
+        return True
@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import os
+import socket
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.models.stickers import StickerRenderJob
+from app.schemas.sticker import LStickerJobStatus
+from app.services.sticker_crud_service import StickerCanvasCrudService
+from app.services.sticker_service import (
+    DocumentInformation,
+    StickerGeneratorService,
+    StickerStorageService,
+    request_sticker_data,
+)
+from app.core.types import *
+
+settings = get_settings()
+logger = logging.getLogger("uvicorn.error")
+
+JOB_KINDS = ["canvas", "batch", "legacy"]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class StickerJobService:
+    """
+    Queue of sticker renders stored in `sticker_render_jobs`.
+
+    Job kinds and their payload:
+        canvas: {"sticker_canvas_id", "force"}; the PDF becomes the canvas's
+            document, unless the current one was rendered from the same inputs.
+        batch: {"canvas_ids", "request_ids"}; see `batch-pdf`.
+        legacy: {"data", "canvasAppianId"}; see `legacy-create`.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._storage_service = StickerStorageService()
+
+    async def submit(
+        self, kind: str, payload: Dict[str, Any], created_by: Optional[str] = None
+    ) -> StickerRenderJob:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Invalid job kind: {kind}. Available kinds: {JOB_KINDS}")
+        job = StickerRenderJob(
+            kind=kind,
+            payload=payload,
+            status=LStickerJobStatus.IN_PROGRESS.value,
+            next_attempt_on=_utcnow(),
+            created_by=created_by,
+        )
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        sticker_job_worker.notify()
+        return job
+
+    async def get_by_id(self, job_id: int) -> Optional[StickerRenderJob]:
+        return await self.db.get(StickerRenderJob, job_id)
+
+    async def claim_next(self, worker_id: str) -> Optional[StickerRenderJob]:
+        """
+        Lock the oldest due job for `worker_id` for `sticker_job_lease_seconds`.
+        The claim is a single UPDATE that re-checks the conditions, so two
+        workers (in any process) can never both claim the same job.
+        """
+        now = _utcnow()
+        claimable = and_(
+            StickerRenderJob.status == LStickerJobStatus.IN_PROGRESS.value,
+            StickerRenderJob.next_attempt_on <= now,
+            StickerRenderJob.attempts < settings.sticker_job_max_attempts,
+            or_(
+                StickerRenderJob.locked_until.is_(None),
+                StickerRenderJob.locked_until < now,
+            ),
+        )
+        next_id = (
+            select(StickerRenderJob.id)
+            .where(claimable)
+            .order_by(StickerRenderJob.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(StickerRenderJob)
+            .where(StickerRenderJob.id == next_id, claimable)
+            .values(
+                locked_by=worker_id,
+                locked_until=now
+                + timedelta(seconds=settings.sticker_job_lease_seconds),
+                attempts=StickerRenderJob.attempts + 1,
+                started_on=func.coalesce(StickerRenderJob.started_on, now),
+            )
+            .returning(StickerRenderJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        job_id = result.scalar()
+        await self.db.commit()
+        return await self.get_by_id(job_id) if job_id is not None else None
+
+    async def run(self, job: StickerRenderJob) -> DocumentInformation:
+        """Render a job and store its PDF. ValueError means the job cannot succeed."""
+        payload: Dict[str, Any] = job.payload  # type: ignore
+        generator = StickerGeneratorService()
+
+        if job.kind == "canvas":
+            document, _ = await StickerCanvasCrudService(self.db).render_document(
+                payload["sticker_canvas_id"], force=payload.get("force", False)
+            )
+            return document
+
+        if job.kind == "legacy":
+            pdf_bytes = await generator.generate_pdf(data=payload["data"])
+            return await self._storage_service.save_document_bytes(pdf_bytes)
+
+        if job.kind == "batch":
+            requests = await StickerCanvasCrudService(self.db).get_batch_requests(
+                payload["canvas_ids"], payload["request_ids"]
+            )
+            sticker_inputs = [request_sticker_data(req) for req in requests]
+            fd, path = tempfile.mkstemp(prefix="sticker-batch-", suffix=".pdf")
+            os.close(fd)
+            try:
+                await generator.generate_document(sticker_inputs, path)
+                return await self._storage_service.save_document_file(path)
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        raise ValueError(f"Invalid job kind: {job.kind}")
+
+    async def complete(
+        self, job_id: int, worker_id: str, document: DocumentInformation
+    ) -> None:
+        await self._finish(
+            job_id,
+            worker_id,
+            status=LStickerJobStatus.COMPLETED.value,
+            document_id=document.document_id,
+            relative_file_path=document.path,
+            error=None,
+            finished_on=_utcnow(),
+        )
+
+    async def fail(
+        self, job_id: int, worker_id: str, attempts: int, error: str, retry: bool
+    ) -> None:
+        """
+        Record a failed attempt. Retryable jobs with attempts left are put back
+        in the queue after `sticker_job_retry_delay` seconds, doubled for each
+        attempt already made; the others are marked FAILED.
+        """
+        if retry and attempts < settings.sticker_job_max_attempts:
+            delay = settings.sticker_job_retry_delay * 2 ** (attempts - 1)
+            await self._finish(
+                job_id,
+                worker_id,
+                error=error,
+                next_attempt_on=_utcnow() + timedelta(seconds=delay),
+            )
+        else:
+            await self._finish(
+                job_id,
+                worker_id,
+                status=LStickerJobStatus.FAILED.value,
+                error=error,
+                finished_on=_utcnow(),
+            )
+
+    async def fail_abandoned(self) -> int:
+        """Mark FAILED the jobs whose last allowed attempt lost its worker."""
+        now = _utcnow()
+        result = await self.db.execute(
+            update(StickerRenderJob)
+            .where(
+                StickerRenderJob.status == LStickerJobStatus.IN_PROGRESS.value,
+                StickerRenderJob.attempts >= settings.sticker_job_max_attempts,
+                StickerRenderJob.locked_until < now,
+            )
+            .values(
+                status=LStickerJobStatus.FAILED.value,
+                error="Render worker stopped before the job finished.",
+                locked_by=None,
+                locked_until=None,
+                finished_on=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def _finish(self, job_id: int, worker_id: str, **values: Any) -> None:
+        # A worker whose lease expired has lost the job to another worker
+        await self.db.execute(
+            update(StickerRenderJob)
+            .where(
+                StickerRenderJob.id == job_id,
+                StickerRenderJob.locked_by == worker_id,
+            )
+            .values(locked_by=None, locked_until=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+
+class StickerJobWorker:
+    """
+    Background tasks running the queued sticker render jobs, `concurrency` at
+    a time in each app process. Renders still go through the render pool,
+    which bounds the CPU used across jobs and HTTP renders.
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._next_sweep = 0.0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(self._run(f"{prefix}:{index}"))
+            for index in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers; their running jobs are retried once the lease expires."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers now instead of at their next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self, worker_id: str) -> None:
+        while True:
+            try:
+                processed = await self.run_once(worker_id)
+            except Exception:
+                logger.exception(f"Sticker job worker {worker_id} failed")
+                processed = False
+            if not processed:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=self.poll_interval  # type: ignore
+                    )
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()  # type: ignore
+
+    async def run_once(self, worker_id: str) -> bool:
+        """Claim and run one job. Returns False when no job was due."""
+        async with SessionLocal() as session:
+            service = StickerJobService(session)
+            job = await service.claim_next(worker_id)
+            if job is None:
+                # Abandoned jobs only appear once a lease expires: sweep rarely
+                if time.monotonic() >= self._next_sweep:
+                    self._next_sweep = (
+                        time.monotonic() + settings.sticker_job_lease_seconds
+                    )
+                    await service.fail_abandoned()
+                return False
+
+            job_id, attempts = job.id, job.attempts
+            try:
+                document = await service.run(job)
+            except Exception as e:
+                await session.rollback()
+                logger.warning(f"Sticker render job {job_id} attempt {attempts}: {e!r}")
+                await service.fail(
+                    job_id,  # type: ignore
+                    worker_id,
+                    attempts,  # type: ignore
+                    error=str(e) or type(e).__name__,
+                    retry=not isinstance(e, ValueError),
+                )
+            else:
+                await service.complete(job_id, worker_id, document)  # type: ignore
+        return True
+
+
+sticker_job_worker = StickerJobWorker(
+    concurrency=settings.sticker_job_workers,
+    poll_interval=settings.sticker_job_poll_interval,
+)
@@ -3,18 +3,29 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.colors import black, lightgrey
 from reportlab.lib.utils import ImageReader
 from io import BytesIO
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Union, Tuple
+from collections import OrderedDict
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from app.core.config import get_settings
+from app.core.render_pool import render_pool
+from app.core.storage import DocumentStorage, document_storage
+from app.models.requests import Request
 from PIL import Image
 import base64
+import hashlib
+import json
+import threading
 import uuid
 from dataclasses import dataclass
-from pathlib import Path
 
 settings = get_settings()
 
+STICKERS_PER_PAGE = 10
+# Bump whenever a change to the drawing code changes the output for the same
+# inputs, so documents fingerprinted with the old layout are re-rendered
+STICKER_LAYOUT_VERSION = 1
+
 
 @dataclass
 class DocumentInformation:
@@ -22,6 +33,60 @@ class DocumentInformation:
     path: str
 
 
+class LogoCache:
+    """
+    LRU of area logos prepared for drawing: decoded, converted to RGBA and
+    downscaled to `dpi` at the size they are printed. Keyed by the sha256 of
+    the logo bytes (`Area.logo_hash`), so a replaced logo is a new key and its
+    old entry is evicted by the LRU. Each render worker process has its own;
+    the threads of a thread render pool share it, so the LRU is locked (not
+    the decoding: two threads may prepare the same logo at once).
+    """
+
+    def __init__(self, max_entries: int, dpi: int = 300):
+        self.max_entries = max_entries
+        self.dpi = dpi
+        self._entries: "OrderedDict[tuple, ImageReader]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, logo: bytes, logo_hash: Optional[str], width: float, height: float
+    ) -> Tuple[str, ImageReader]:
+        """(content hash, prepared image) of `logo` drawn at `width` x `height` pt."""
+        logo_hash = logo_hash or hashlib.sha256(logo).hexdigest()
+        key = (logo_hash, width, height)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return logo_hash, image
+            self.misses += 1
+
+        with Image.open(BytesIO(logo)) as im:
+            im = im.convert("RGBA")
+            # Never embed more pixels than the printer can use
+            im.thumbnail(
+                (round(width / 72 * self.dpi), round(height / 72 * self.dpi)),
+                Image.Resampling.LANCZOS,
+            )
+            image = ImageReader(im)
+        with self._lock:
+            self._entries[key] = image
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return logo_hash, image
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+logo_cache = LogoCache(max_entries=settings.sticker_logo_cache_size)
+
+
 class StickerGeneratorService:
     def __init__(self):
         # template_path kept for backward compatibility, not used
@@ -91,19 +156,134 @@ class StickerGeneratorService:
 
         return y
 
+    def _logo_form(
+        self,
+        c: canvas.Canvas,
+        logo: bytes,
+        logo_hash: Optional[str],
+        width: float,
+        height: float,
+        drawn_logos: set,
+    ) -> str:
+        """
+        Name of a form XObject drawing `logo` at `width` x `height`. The form
+        is created on first use in the PDF; later cells reference it, so each
+        distinct logo is prepared once per process and embedded once per PDF.
+        """
+        logo_hash, logo_image = logo_cache.get(logo, logo_hash, width, height)
+        form_name = f"logo-{logo_hash}"
+        if form_name not in drawn_logos:
+            c.beginForm(form_name, 0, 0, width, height)
+            c.drawImage(logo_image, 0, 0, width=width, height=height)
+            c.endForm()
+            drawn_logos.add(form_name)
+        return form_name
+
     async def generate_pdf(self, data: List[Dict[str, Union[str, bytes]]]) -> bytes:
         """
-        Generate a single-page A4 sticker PDF (2x3 layout) and return Base64.
+        Render `data` with `render_pdf` in the render pool, so the CPU-bound
+        drawing never blocks the event loop.
+
+        Raises:
+            RenderPoolSaturated, RenderPoolTimeout: when the pool is overloaded.
+        """
+        if len(data) > STICKERS_PER_PAGE:
+            raise ValueError("Maximum of 10 stickers allowed per page")
+        return await render_pool.run(render_sticker_pdf, data)
+
+    async def generate_document(
+        self, data: List[Dict[str, Union[str, bytes]]], path: str
+    ) -> int:
+        """
+        Render any number of stickers with `render_document` in the render
+        pool, writing the PDF to `path`. Returns the number of pages.
+        """
+        return await render_pool.run(render_sticker_document, data, path)
+
+    async def generate_pages(
+        self, pages: List[List[Dict[str, Union[str, bytes]]]], path: str
+    ) -> int:
+        """`render_pages` in the render pool. Returns the number of pages."""
+        return await render_pool.run(render_sticker_pages, pages, path)
+
+    def render_pdf(self, data: List[Dict[str, Union[str, bytes]]]) -> bytes:
+        """
+        Generate a single-page A4 sticker PDF (2x5 layout) and return its bytes.
+        Synchronous and CPU-bound: call it through `generate_pdf`.
 
-        :param data: List of sticker dicts (max 6)
-        :return: Base64 encoded PDF
+        :param data: List of sticker dicts (max 10)
+        :return: PDF bytes
         """
-        if len(data) > 10:
+        if len(data) > STICKERS_PER_PAGE:
             raise ValueError("Maximum of 10 stickers allowed per page")
 
         buffer = BytesIO()
         c = canvas.Canvas(buffer, pagesize=A4)
+        self._draw_page(c, data, drawn_logos=set())
+        c.showPage()
+        c.save()
+
+        return buffer.getvalue()
+
+    def render_document(
+        self, data: List[Dict[str, Union[str, bytes]]], path: str
+    ) -> int:
+        """
+        Flow any number of stickers over as many A4 pages as needed (same 2x5
+        layout) into a PDF written at `path`. Synchronous and CPU-bound: call
+        it through `generate_document`.
+
+        Each page is compressed as soon as it is finished and logos are shared
+        by all pages, so memory grows by a few KB per page, not per sticker.
+
+        :param data: List of sticker dicts
+        :param path: File the PDF is written to
+        :return: Number of pages
+        """
+        if not data:
+            raise ValueError("At least one sticker is required")
+        return self.render_pages(
+            [
+                data[start : start + STICKERS_PER_PAGE]
+                for start in range(0, len(data), STICKERS_PER_PAGE)
+            ],
+            path,
+        )
 
+    def render_pages(
+        self, pages: List[List[Dict[str, Union[str, bytes]]]], path: str
+    ) -> int:
+        """
+        Like `render_document`, with the stickers of each page given, e.g. one
+        page per canvas.
+
+        :param pages: Sticker dicts of each page (max 10 per page)
+        :param path: File the PDF is written to
+        :return: Number of pages
+        """
+        if not pages:
+            raise ValueError("At least one page is required")
+        if any(len(page) > STICKERS_PER_PAGE for page in pages):
+            raise ValueError("Maximum of 10 stickers allowed per page")
+
+        c = canvas.Canvas(path, pagesize=A4)
+        drawn_logos: set = set()
+        for page in pages:
+            self._draw_page(c, page, drawn_logos)
+            c.showPage()
+        c.save()
+        return len(pages)
+
+    def _draw_page(
+        self,
+        c: canvas.Canvas,
+        data: List[Dict[str, Union[str, bytes]]],
+        drawn_logos: set,
+    ) -> None:
+        """
+        Draw up to 10 stickers on the current page of `c`.
+        `drawn_logos` holds the logo forms already embedded in the document.
+        """
         page_width, page_height = A4
 
         # Layout
@@ -156,23 +336,20 @@ class StickerGeneratorService:
             logo_bytes: bytes = sticker.get("logo")  # type: ignore
 
             if logo_bytes:
-                logo_bytes = BytesIO(logo_bytes)  # type: ignore
-                with Image.open(logo_bytes) as im:  # type: ignore
-                    im = im.convert("RGBA")  # removes alpha/transparency
-                    temp_buf = BytesIO()
-                    im.save(temp_buf, format="PNG")  # can also use JPEG
-                    temp_buf.seek(0)
-                    logo_image = ImageReader(temp_buf)
-                # logo_image = ImageReader(logo_bytes)
+                logo_form = self._logo_form(
+                    c,
+                    logo_bytes,
+                    sticker.get("logo_hash"),  # type: ignore
+                    logo_width,
+                    logo_height,
+                    drawn_logos,
+                )
                 logo_x = cell_x + text_x_offset
                 logo_y = cell_y + cell_height - logo_height - 5  # 5pt margin from top
-                c.drawImage(
-                    logo_image,
-                    logo_x,
-                    logo_y,
-                    width=logo_width,
-                    height=logo_height,
-                )
+                c.saveState()
+                c.translate(logo_x, logo_y)
+                c.doForm(logo_form)
+                c.restoreState()
                 start_y = logo_y - logo_text_padding
             else:
                 start_y = cell_y + cell_height - 5  # no logo, start near top
@@ -208,44 +385,91 @@ class StickerGeneratorService:
                     c.drawString(text_x + label_width + 4, start_y, value_text)
                     start_y -= line_height
 
-        c.showPage()
-        c.save()
 
-        return buffer.getvalue()
+def render_sticker_pdf(data: List[Dict[str, Union[str, bytes]]]) -> bytes:
+    """Module-level entry point of `render_pdf`, picklable for process pools."""
+    return StickerGeneratorService().render_pdf(data)
+
+
+def render_sticker_document(data: List[Dict[str, Union[str, bytes]]], path: str) -> int:
+    """Module-level entry point of `render_document`, picklable for process pools."""
+    return StickerGeneratorService().render_document(data, path)
+
+
+def render_sticker_pages(
+    pages: List[List[Dict[str, Union[str, bytes]]]], path: str
+) -> int:
+    """Module-level entry point of `render_pages`, picklable for process pools."""
+    return StickerGeneratorService().render_pages(pages, path)
+
+
+def render_fingerprint(data: List[Dict[str, Union[str, bytes, None]]]) -> str:
+    """
+    sha256 of everything a render depends on: the sticker fields in order,
+    logos by content hash, and `STICKER_LAYOUT_VERSION`.
+    """
+    stickers = []
+    for sticker in data:
+        fields = {k: v for k, v in sticker.items() if k not in ("logo", "logo_hash")}
+        logo = sticker.get("logo")
+        fields["logo_hash"] = sticker.get("logo_hash") or (
+            hashlib.sha256(logo).hexdigest() if logo else None  # type: ignore
+        )
+        stickers.append(fields)
+    payload = json.dumps(
+        {"layout": STICKER_LAYOUT_VERSION, "stickers": stickers},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def request_sticker_data(req: Request) -> Dict[str, Union[str, bytes, None]]:
+    """Sticker fields of a request loaded with its customer and area (logo undeferred)."""
+    return {
+        "customer": req.customer.name if req.customer else "",
+        "product": req.short_description,
+        "description": req.long_description,
+        "labRefNo": req.ref_no,
+        "quantity": str(req.quantity),
+        "logo": req.area.logo if req.area else bytes(),
+        "logo_hash": req.area.logo_hash if req.area else None,
+    }
 
 
 class StickerStorageService:
+    """
+    Sticker PDF documents, kept by the configured storage backend (local disk
+    or an S3-compatible bucket) under year/month keys.
+    """
 
-    def __init__(self):
-        self.storage_path = settings.sticker_storage_dir_resolved
+    def __init__(self, storage: Optional[DocumentStorage] = None):
+        self.storage = storage or document_storage
 
     async def get_document_by_id(self, relative_path: str) -> bytes:
-        document_path = self.storage_path / Path(relative_path)
-        if not document_path.exists():
-            raise FileNotFoundError(
-                f"Document with path={str(document_path)} does not exists."
-            )
-        return Path(document_path).read_bytes()
+        return await self.storage.read_bytes(relative_path)
+
+    async def document_exists(self, relative_path: str) -> bool:
+        return await self.storage.exists(relative_path)
 
     async def delete_document_by_id(self, relative_path: str) -> bool:
-        document_path = self.storage_path / Path(relative_path)
-        if document_path.exists():
-            document_path.unlink()
-            return True
-        return False
+        return await self.storage.delete(relative_path)
 
     async def save_document_bytes(self, pdf_bytes: bytes) -> DocumentInformation:
-        now = datetime.now(ZoneInfo(settings.timezone))
+        document_info = self._new_document_info()
+        await self.storage.save_bytes(document_info.path, pdf_bytes)
+        return document_info
 
-        output_dir = self.storage_path / str(now.year) / f"{now.month:02d}"
-        output_dir.mkdir(parents=True, exist_ok=True)
+    async def save_document_file(self, source_path: str) -> DocumentInformation:
+        """Move an already written PDF (e.g. a batch render) into storage."""
+        document_info = self._new_document_info()
+        await self.storage.save_file(document_info.path, source_path)
+        return document_info
 
+    def _new_document_info(self) -> DocumentInformation:
+        now = datetime.now(ZoneInfo(settings.timezone))
         document_id = str(uuid.uuid4())
-        file_path = output_dir / f"{str(document_id)}.pdf"
-
-        # Save bytes to storage
-        file_path.write_bytes(pdf_bytes)
-
         return DocumentInformation(
-            document_id=document_id, path=str(file_path.relative_to(self.storage_path))
+            document_id=document_id,
+            path=f"{now.year}/{now.month:02d}/{document_id}.pdf",
         )
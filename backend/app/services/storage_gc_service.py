@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Set
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.storage import DocumentStorage, StorageEntry, document_storage
+from app.models.stickers import StickerCanvas, StickerRenderJob
+from app.core.types import *
+
+settings = get_settings()
+logger = logging.getLogger("uvicorn.error")
+
+
+@dataclass
+class StorageReport:
+    """Stored documents by state, with what a GC run deleted."""
+
+    dry_run: bool
+    total_files: int = 0
+    total_bytes: int = 0
+    referenced_files: int = 0
+    referenced_bytes: int = 0
+    # Unreferenced, but younger than the grace period
+    recent_files: int = 0
+    recent_bytes: int = 0
+    orphaned_files: int = 0
+    orphaned_bytes: int = 0
+    deleted_files: int = 0
+    reclaimed_bytes: int = 0
+
+    @property
+    def usage_bytes(self) -> int:
+        return self.total_bytes - self.reclaimed_bytes
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "usage_bytes": self.usage_bytes}
+
+
+class StorageGcService:
+    """
+    Garbage collector of sticker documents that no canvas or render job
+    references any more (e.g. the previous document of a re-rendered canvas).
+
+    Documents are saved before the row pointing to them, so an unreferenced
+    document is only deleted once it is older than `sticker_gc_grace_seconds`.
+    The storage is listed and checked against the database in batches of
+    `sticker_gc_batch_size`, so memory use does not grow with the storage.
+    """
+
+    def __init__(self, db: AsyncSession, storage: Optional[DocumentStorage] = None):
+        self.db = db
+        self.storage = storage or document_storage
+
+    async def collect(
+        self, dry_run: bool = False, grace_seconds: Optional[int] = None
+    ) -> StorageReport:
+        """Delete the orphaned documents (only count them with `dry_run`)."""
+        if grace_seconds is None:
+            grace_seconds = settings.sticker_gc_grace_seconds
+        cutoff = time.time() - grace_seconds
+        report = StorageReport(dry_run=dry_run)
+
+        batch: List[StorageEntry] = []
+        async for entry in self.storage.iter_entries():
+            report.total_files += 1
+            report.total_bytes += entry.size
+            batch.append(entry)
+            if len(batch) >= settings.sticker_gc_batch_size:
+                await self._collect_batch(batch, cutoff, report)
+                batch = []
+        if batch:
+            await self._collect_batch(batch, cutoff, report)
+        return report
+
+    async def _collect_batch(
+        self, entries: List[StorageEntry], cutoff: float, report: StorageReport
+    ) -> None:
+        referenced = await self._referenced_keys([entry.key for entry in entries])
+        orphans = []
+        for entry in entries:
+            if entry.key in referenced:
+                report.referenced_files += 1
+                report.referenced_bytes += entry.size
+            elif entry.last_modified > cutoff:
+                report.recent_files += 1
+                report.recent_bytes += entry.size
+            else:
+                report.orphaned_files += 1
+                report.orphaned_bytes += entry.size
+                orphans.append(entry)
+
+        if orphans and not report.dry_run:
+            await self.storage.delete_many([entry.key for entry in orphans])
+            report.deleted_files += len(orphans)
+            report.reclaimed_bytes += sum(entry.size for entry in orphans)
+
+    async def _referenced_keys(self, keys: List[str]) -> Set[str]:
+        result = await self.db.execute(
+            union(
+                select(StickerCanvas.relative_file_path).where(
+                    StickerCanvas.relative_file_path.in_(keys)
+                ),
+                select(StickerRenderJob.relative_file_path).where(
+                    StickerRenderJob.relative_file_path.in_(keys)
+                ),
+            )
+        )
+        referenced = set(result.scalars().all())
+        # End the read transaction: a run can take a while on a large storage
+        await self.db.rollback()
+        return referenced
+
+
+class StorageGcScheduler:
+    """Background task running the GC every `interval` seconds (0 = never)."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Storage GC failed")
+
+    async def run_once(self, dry_run: bool = False) -> StorageReport:
+        async with SessionLocal() as session:
+            report = await StorageGcService(session).collect(dry_run=dry_run)
+        logger.info(
+            f"Storage GC: deleted {report.deleted_files} orphaned documents "
+            f"({report.reclaimed_bytes} bytes); usage {report.usage_bytes} bytes "
+            f"in {report.total_files - report.deleted_files} files"
+        )
+        return report
+
+
+storage_gc_scheduler = StorageGcScheduler(interval=settings.sticker_gc_interval_seconds)
@@ -5,6 +5,7 @@ from typing import Optional, Dict
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from app.core.config import get_settings
+from app.core.passwords import password_hasher
 from typing import Optional, Any
 from fastapi import Request, HTTPException, status
 from app.schemas.users import UserPublic
@@ -60,7 +61,7 @@ async def create_user(db: UserRepository, user: UserCreate) -> Optional[User]:
         email=user.email,
         role=user.role,
     )
-    db_user.set_password(user.password)
+    db_user.password_hash = await password_hasher.hash(user.password)
     await db.create_user(db_user)
     return db_user
 
@@ -1,15 +1,22 @@
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.core.database import SessionLocal
 from app.repositories.request import (
     CustomerRepository,
     AreaRepository,
     SalesPersonRepository,
+    ReferenceRepository,
 )
 from app.core.types import *
+from app.core.config import get_settings
+
+settings = get_settings()
 
 
 class UtilService:
     _BATCH_SIZE = 1000
-    _START_INDEX = 0
+    _TYPEAHEAD_MAX_LIMIT = 50
     _REPO_MAPPING = {
         "customer": CustomerRepository,
         "area": AreaRepository,
@@ -24,36 +31,121 @@ class UtilService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    def _get_repo(self, category: str) -> ReferenceRepository:
+        repo_class = UtilService._REPO_MAPPING.get(category.lower())
+        if not repo_class:
+            raise ValueError(
+                f"Invalid category: {category}. Available categories: [{[k for k in UtilService._REPO_MAPPING.keys()]}]"
+            )
+        return repo_class(self.db)
+
     async def get_dropdown_values(
         self, category: str, field_names: Optional[list[str]] = None
     ) -> List[Dict[str, Any]]:
+        """
+        Every row of a category. Rows are read in keyset pages of `_BATCH_SIZE`
+        so large tables are returned complete; prefer `typeahead` for pickers.
+        """
         if not category:
             return []
+        repo = self._get_repo(category)
         if not field_names:
-            field_names = UtilService._FIELD_NAMES_MAPPING[category]
-        repo_class = UtilService._REPO_MAPPING.get(category.lower())
-        if not repo_class:
-            raise ValueError(
-                f"Invalid category: {category}. Available categories: [{[k for k in UtilService._REPO_MAPPING.keys()]}]"
+            field_names = UtilService._FIELD_NAMES_MAPPING[category.lower()]
+        ref_values: List[Dict[str, Any]] = []
+        cursor = None
+        while True:
+            page, cursor, _ = await repo.get_all_denorm_keyset(
+                batch_size=UtilService._BATCH_SIZE,
+                cursor=cursor,
+                field_names=field_names,
             )
-        repo: Union[CustomerRepository, AreaRepository, SalesPersonRepository] = (
-            repo_class(self.db)
-        )
-        ref_values: Union[List[Dict[str, Any]], List[Any]] = await repo.get_all_denorm(
-            start_index=UtilService._START_INDEX,
-            batch_size=UtilService._BATCH_SIZE,
-            field_names=field_names,
-        )
-        return ref_values
+            ref_values.extend(page)  # type: ignore
+            if cursor is None:
+                return ref_values
 
     async def get_all_dropdown_values(self) -> Dict[str, List[Dict[str, Any]]]:
-        all_values: Dict[str, List[Dict[str, Any]]] = {}
-        for category in UtilService._REPO_MAPPING.keys():
-            values = await self.get_dropdown_values(
-                category, UtilService._FIELD_NAMES_MAPPING[category]
-            )
+        async def category_values(category: str) -> List[Dict[str, Any]]:
+            # An AsyncSession cannot run concurrent queries: one per category
+            async with SessionLocal() as session:
+                values = await UtilService(session).get_dropdown_values(
+                    category, UtilService._FIELD_NAMES_MAPPING[category]
+                )
             if category == "salesperson":
                 for v in values:
                     v["name"] = f"{v.pop('first_name')} {v.pop('last_name')[0]}."
-            all_values[category] = values
-        return all_values
+            return values
+
+        categories = list(UtilService._REPO_MAPPING.keys())
+        results = await asyncio.gather(*(category_values(c) for c in categories))
+        return dict(zip(categories, results))
+
+    async def typeahead(
+        self, category: str, search: str, limit: int, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Up to `limit` `{id, name}` matches of `search` in a category, with the
+        cursor of the next page.
+        """
+        if not 1 <= limit <= UtilService._TYPEAHEAD_MAX_LIMIT:
+            raise ValueError(
+                f"limit must be between 1 and {UtilService._TYPEAHEAD_MAX_LIMIT}."
+            )
+        values, next_cursor = await self._get_repo(category).typeahead(
+            search, limit, cursor
+        )
+        return {"category": category, "values": values, "next_cursor": next_cursor}
+
+    async def typeahead_all(self, search: str, limit: int) -> Dict[str, Any]:
+        """First page of `typeahead` in every category, queried concurrently."""
+
+        async def category_matches(category: str) -> Dict[str, Any]:
+            async with SessionLocal() as session:
+                return await UtilService(session).typeahead(category, search, limit)
+
+        categories = list(UtilService._REPO_MAPPING.keys())
+        results = await asyncio.gather(*(category_matches(c) for c in categories))
+        return dict(zip(categories, results))
+
+    async def rebuild_search_index(self) -> bool:
+        """Rebuild the typeahead indexes of every category."""
+        rebuilt = True
+        for category in UtilService._REPO_MAPPING.keys():
+            rebuilt = await self._get_repo(category).rebuild_search_index() and rebuilt
+        return rebuilt
+
+    async def get_database_profile(self) -> Dict[str, Any]:
+        """
+        The engine's pool sizing and, on SQLite, the configured profile next to
+        the PRAGMA values actually in effect on this connection. On PostgreSQL,
+        the server version and the prepared statement cache size.
+        """
+        bind = self.db.get_bind()
+        pool = bind.pool
+        profile: Dict[str, Any] = {
+            "dialect": bind.dialect.name,
+            "pool": {
+                "class": type(pool).__name__,
+                "size": getattr(pool, "size", lambda: None)(),
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "checked_out": getattr(pool, "checkedout", lambda: None)(),
+                "status": pool.status(),
+            },
+        }
+        if bind.dialect.name == "sqlite":
+            active: Dict[str, Any] = {}
+            for name in ["foreign_keys", *settings.sqlite_pragmas]:
+                result = await self.db.execute(text(f"PRAGMA {name}"))
+                active[name] = result.scalar()
+            profile["sqlite"] = {
+                "configured": settings.sqlite_pragmas,
+                "active": active,
+            }
+        elif bind.dialect.name == "postgresql":
+            result = await self.db.execute(text("SHOW server_version"))
+            profile["postgresql"] = {
+                "server_version": result.scalar(),
+                "prepared_statement_cache_size": (
+                    settings.postgres_prepared_statement_cache_size
+                ),
+            }
+        return profile
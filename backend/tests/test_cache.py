@@ -0,0 +1,38 @@
+import builtins
+from app.core.cache import CacheVersions, cache_versions
+from app.services.dashboard_service import DashboardService
+
+
+def test_versions_are_read_once_per_bump(tmp_path, monkeypatch):
+    versions = CacheVersions(str(tmp_path))
+    assert versions.get("requests") == "0"
+    versions.bump("requests")
+    first = versions.get("requests")
+    assert first != "0"
+
+    opened = []
+    real_open = builtins.open
+
+    def tracking_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", tracking_open)
+
+    def reads() -> int:
+        return sum(path.endswith(".version") for path in opened)
+
+    assert [versions.get("requests") for _ in range(3)] == [first] * 3
+    assert reads() == 0
+
+    # Bumped by another worker
+    CacheVersions(str(tmp_path)).bump("requests")
+    second = versions.get("requests")
+    assert second != first and versions.get("requests") == second
+    assert reads() == 1
+
+
+async def test_reconcile_invalidates_cached_dashboards(session):
+    before = cache_versions.get("requests")
+    await DashboardService(session).reconcile_request_stats()
+    assert cache_versions.get("requests") != before
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from sqlalchemy import select
+from app.models.requests import Request
+from app.repositories.request import RequestRepository
+
+
+def _month_prefix(settings) -> str:
+    now = datetime.now(ZoneInfo(settings.timezone))
+    return f"{now.month:02d}-{now.year}-"
+
+
+async def _ref_nos(session_factory) -> list[str]:
+    async with session_factory() as db:
+        result = await db.execute(select(Request.ref_no))
+        return list(result.scalars().all())
+
+
+async def test_ref_nos_continue_after_existing_numbers(session_factory, settings):
+    prefix = _month_prefix(settings)
+    async with session_factory() as db:
+        db.add(Request(ref_no=f"{prefix}0041", short_description="imported"))
+        await db.commit()
+        db.add(Request(short_description="first"))
+        await db.commit()
+        await RequestRepository(db).bulk_create(
+            [{"short_description": "second"}, {"short_description": "third"}]
+        )
+
+    assert sorted(await _ref_nos(session_factory)) == [
+        f"{prefix}{seq:04d}" for seq in (41, 42, 43, 44)
+    ]
+
+
+async def test_concurrent_inserts_get_unique_ref_nos(session_factory, settings):
+    """Writers racing on the first number of the month, ORM and bulk alike."""
+    prefix = _month_prefix(settings)
+    async with session_factory() as db:
+        db.add(Request(ref_no=f"{prefix}0007", short_description="imported"))
+        await db.commit()
+
+    async def insert_one(index: int) -> None:
+        async with session_factory() as db:
+            db.add(Request(short_description=f"one {index}"))
+            await db.commit()
+
+    async def insert_many(index: int) -> None:
+        async with session_factory() as db:
+            await RequestRepository(db).bulk_create(
+                [{"short_description": f"many {index}.{row}"} for row in range(5)]
+            )
+
+    await asyncio.gather(
+        *(insert_one(index) for index in range(8)),
+        *(insert_many(index) for index in range(4)),
+    )
+
+    ref_nos = await _ref_nos(session_factory)
+    assert len(ref_nos) == len(set(ref_nos)) == 29
+    assert all(ref_no.startswith(prefix) for ref_no in ref_nos)
+    # Nothing was rolled back, so the numbers have no gaps either
+    assert sorted(int(ref_no.split("-")[-1]) for ref_no in ref_nos) == list(
+        range(7, 36)
+    )
+
+
+async def test_bulk_ref_nos_follow_row_order(session):
+    rows = [{"short_description": f"row {index}"} for index in range(6)]
+    ids = await RequestRepository(session).bulk_create(rows)
+
+    result = await session.execute(
+        select(Request.id, Request.ref_no, Request.short_description)
+    )
+    by_id = {row.id: row for row in result.all()}
+    assert [by_id[id].short_description for id in ids] == [
+        row["short_description"] for row in rows
+    ]
+    ref_nos = [by_id[id].ref_no for id in ids]
+    assert ref_nos == sorted(ref_nos)
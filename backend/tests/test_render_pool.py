@@ -0,0 +1,106 @@
+import asyncio
+import math
+import threading
+import time
+import pytest
+from app.core.render_pool import RenderPool, RenderPoolSaturated, RenderPoolTimeout
+
+
+@pytest.fixture
+def release():
+    """Event the blocking renders wait for; set on teardown so no thread hangs."""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def _blocking_render(release: threading.Event, value: int) -> int:
+    release.wait(timeout=10)
+    return value
+
+
+async def _until_waiting(pool: RenderPool, count: int) -> None:
+    while pool.metrics()["waiting"] < count:
+        await asyncio.sleep(0.01)
+
+
+async def test_full_queue_is_rejected(release):
+    pool = RenderPool("thread", workers=1, queue_limit=1, queue_timeout=10)
+    try:
+        running = asyncio.create_task(pool.run(_blocking_render, release, 1))
+        waiting = asyncio.create_task(pool.run(_blocking_render, release, 2))
+        await _until_waiting(pool, 1)
+
+        with pytest.raises(RenderPoolSaturated) as rejected:
+            await pool.run(_blocking_render, release, 3)
+        assert rejected.value.retry_after >= 1
+
+        release.set()
+        assert await asyncio.gather(running, waiting) == [1, 2]
+        metrics = pool.metrics()
+        assert metrics["rejected"] == 1 and metrics["render_time"]["count"] == 2
+    finally:
+        pool.shutdown()
+
+
+async def test_queue_wait_times_out(release):
+    pool = RenderPool("thread", workers=1, queue_limit=5, queue_timeout=0.1)
+    try:
+        running = asyncio.create_task(pool.run(_blocking_render, release, 1))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(RenderPoolTimeout):
+            await pool.run(_blocking_render, release, 2)
+        assert pool.metrics()["timed_out"] == 1
+        assert pool.metrics()["waiting"] == 0
+
+        release.set()
+        assert await running == 1
+    finally:
+        pool.shutdown()
+
+
+async def test_concurrency_is_bounded_by_workers():
+    pool = RenderPool("thread", workers=2, queue_limit=10, queue_timeout=10)
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def render(value: int) -> int:
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+        return value
+
+    try:
+        results = await asyncio.gather(*(pool.run(render, value) for value in range(6)))
+    finally:
+        pool.shutdown()
+    assert results == list(range(6))
+    assert state["peak"] == 2
+
+
+async def test_render_errors_free_the_slot():
+    pool = RenderPool("thread", workers=1, queue_limit=0, queue_timeout=1)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(divmod, 1, 0)
+        assert await pool.run(divmod, 7, 2) == (3, 1)
+        assert pool.metrics()["failed"] == 1
+    finally:
+        pool.shutdown()
+
+
+async def test_process_backend_runs_module_level_functions():
+    pool = RenderPool("process", workers=1, queue_limit=1, queue_timeout=30)
+    try:
+        assert await pool.run(math.factorial, 10) == 3628800
+    finally:
+        pool.shutdown()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        RenderPool("fiber", workers=1, queue_limit=1, queue_timeout=1)
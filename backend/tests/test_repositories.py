@@ -0,0 +1,219 @@
+from datetime import date
+import pytest
+from sqlalchemy import case, select
+from app.models.requests import Area, Customer, Request
+from app.repositories.request import (
+    AreaRepository,
+    CustomerRepository,
+    RequestRepository,
+    logo_content_hash,
+)
+
+
+async def _names_by_id(session) -> dict[int, str]:
+    result = await session.execute(select(Customer.id, Customer.name))
+    return dict(result.tuples().all())
+
+
+async def test_bulk_create_returns_ids_in_row_order(session):
+    names = ["zed", "amy", "bob", "carl", "ann", "dan", "eve", "al"]
+    ids = await CustomerRepository(session).bulk_create(
+        [{"name": name} for name in names]
+    )
+
+    names_by_id = await _names_by_id(session)
+    assert [names_by_id[id] for id in ids] == names
+
+
+async def test_bulk_upsert_returns_ids_in_row_order(session):
+    repo = AreaRepository(session)
+    existing = await repo.bulk_create([{"name": "north"}, {"name": "south"}])
+
+    # Updates and inserts interleaved, in two column groups
+    rows = [
+        {"name": "east"},
+        {"name": "south", "logo": b"south logo"},
+        {"name": "west", "logo": b"west logo"},
+        {"name": "north"},
+        {"name": "centre"},
+    ]
+    ids = await repo.bulk_upsert(rows)
+
+    result = await session.execute(select(Area.id, Area.name, Area.logo_hash))
+    by_id = {row.id: row for row in result.all()}
+    assert [by_id[id].name for id in ids] == [row["name"] for row in rows]
+    assert ids[3] == existing[0] and ids[1] == existing[1]
+    assert len(by_id) == 5
+    assert by_id[existing[1]].logo_hash == logo_content_hash(b"south logo")
+    assert by_id[existing[0]].logo_hash is None
+
+
+async def test_bulk_upsert_by_id_keeps_ref_no(session):
+    repo = RequestRepository(session)
+    [first_id] = await repo.bulk_create([{"short_description": "first"}])
+    first = await session.get(Request, first_id)
+    ref_no = first.ref_no
+
+    ids = await repo.bulk_upsert(
+        [
+            {"id": None, "short_description": "added"},
+            {"id": first_id, "short_description": "renamed"},
+        ]
+    )
+
+    session.expire_all()
+    result = await session.execute(
+        select(Request.id, Request.ref_no, Request.short_description)
+    )
+    by_id = {row.id: row for row in result.all()}
+    assert ids[1] == first_id
+    assert [by_id[id].short_description for id in ids] == ["added", "renamed"]
+    assert by_id[first_id].ref_no == ref_no
+    assert by_id[ids[0]].ref_no != ref_no
+
+
+async def test_bulk_writes_leave_the_rows_unchanged(session):
+    requests = [{"short_description": "new"}, {"id": None, "short_description": "up"}]
+    areas = [{"name": "north", "logo": b"logo"}]
+    passed = [dict(row) for row in requests + areas]
+
+    await RequestRepository(session).bulk_create(requests[:1])
+    await RequestRepository(session).bulk_upsert(requests[1:])
+    await AreaRepository(session).bulk_create(areas)
+    await AreaRepository(session).bulk_upsert(areas)
+
+    assert requests + areas == passed
+
+
+async def _walk_keyset(repo, **kwargs) -> tuple[list[int], list]:
+    ids, totals, cursor = [], [], None
+    while True:
+        records, cursor, total = await repo.get_all_denorm_keyset(
+            2, cursor=cursor, field_names=["id"], **kwargs
+        )
+        ids += [record["id"] for record in records]
+        totals.append(total)
+        if cursor is None:
+            return ids, totals
+
+
+async def test_keyset_pages_over_nulls(session):
+    received = [
+        date(2026, 1, 3),
+        None,
+        date(2026, 1, 1),
+        None,
+        date(2026, 1, 3),
+        date(2026, 1, 2),
+        None,
+    ]
+    rows = []
+    for index, day in enumerate(received):
+        request = Request(short_description=f"row {index}", date_received=day)
+        session.add(request)
+        await session.flush()
+        rows.append((request.id, day))
+    await session.commit()
+    null_ids = [id for id, day in rows if day is None]
+    dated = [(day, id) for id, day in rows if day is not None]
+
+    repo = RequestRepository(session)
+    # Ascending: NULLs first, then by date, ties by id
+    ascending, _ = await _walk_keyset(repo, sort_key="date_received")
+    assert ascending == null_ids + [id for _, id in sorted(dated)]
+
+    # Descending: NULLs last
+    descending, _ = await _walk_keyset(repo, sort_key="date_received", descending=True)
+    assert descending == [id for _, id in sorted(dated, reverse=True)] + sorted(
+        null_ids, reverse=True
+    )
+
+
+async def test_page_total_comes_with_the_page(session):
+    session.add_all(
+        [Customer(name=name) for name in ["amy", "bob", "amanda", "carl", "pam"]]
+    )
+    await session.commit()
+    repo = CustomerRepository(session)
+
+    records, total, has_more = await repo.get_all_denorm_with_total(0, 2, ["id"])
+    assert len(records) == 2 and total == 5 and has_more
+    records, total, has_more = await repo.get_all_denorm_with_total(4, 2, ["id"])
+    assert len(records) == 1 and total == 5 and not has_more
+    # Past the end, the total still comes back
+    records, total, has_more = await repo.get_all_denorm_with_total(10, 2, ["id"])
+    assert records == [] and total == 5 and not has_more
+
+    records, total, has_more = await repo.get_all_denorm_with_total(
+        0, 2, ["id"], filters={"name": "am"}
+    )
+    assert len(records) == 2 and total == 3 and has_more
+
+    records, total, has_more = await repo.get_all_denorm_with_total(
+        2, 2, ["id"], exact_count=False
+    )
+    assert len(records) == 2 and total is None and has_more
+    records, total, has_more = await repo.get_all_denorm_with_total(
+        4, 2, ["id"], exact_count=False
+    )
+    assert len(records) == 1 and total is None and not has_more
+
+
+async def test_keyset_total_count(session):
+    repo = CustomerRepository(session)
+    await repo.bulk_create(
+        [{"name": name} for name in ["amy", "bob", "amanda", "carl", "pam"]]
+    )
+
+    ids, totals = await _walk_keyset(repo, sort_key="name", exact_count=True)
+    assert len(ids) == 5 and totals == [5, 5, 5]
+
+    # The total counts the filtered rows, not the rows past the cursor
+    ids, totals = await _walk_keyset(
+        repo, sort_key="name", filters={"name": "am"}, exact_count=True
+    )
+    assert len(ids) == 3 and totals == [3, 3]
+
+    _, totals = await _walk_keyset(repo, sort_key="name")
+    assert totals == [None, None, None]
+
+
+async def test_typeahead_matches_wildcards_literally(session):
+    if session.get_bind().dialect.name == "sqlite":
+        pytest.skip("FTS5 drops the punctuation from the words")
+    repo = CustomerRepository(session)
+    await repo.bulk_create(
+        [{"name": name} for name in ("50% off", "500 mart", "a_b ltd", "axb ltd")]
+    )
+
+    for search, expected in [("50%", ["50% off"]), ("a_b", ["a_b ltd"])]:
+        matches, _ = await repo.typeahead(search, 10)
+        assert [match["name"] for match in matches] == expected
+
+
+class _NullableNameRepository(CustomerRepository):
+    def display_name(self):
+        return case((Customer.name.startswith("anonymous"), None), else_=Customer.name)
+
+
+async def test_typeahead_pages_over_null_names(session):
+    repo = _NullableNameRepository(session)
+    names = ["bob", "anonymous 1", "amy", "anonymous 2", "carl", "anonymous 3"]
+    ids = await repo.bulk_create([{"name": name} for name in names])
+
+    seen, cursor = [], None
+    for _ in range(len(names)):
+        page, cursor = await repo.typeahead("", 2, cursor)
+        seen += page
+        if cursor is None:
+            break
+    assert cursor is None
+    assert [match["id"] for match in seen] == [
+        ids[1],
+        ids[3],
+        ids[5],
+        ids[2],
+        ids[0],
+        ids[4],
+    ]
+    assert [match["name"] for match in seen[:3]] == ["", "", ""]
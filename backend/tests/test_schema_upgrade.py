@@ -0,0 +1,46 @@
+from sqlalchemy import insert, inspect, text
+from app.models.requests import Area
+from app.render_init_db import upgrade_schema
+from app.repositories.request import logo_content_hash
+
+
+def _columns(connection, table: str) -> set[str]:
+    return {column["name"] for column in inspect(connection).get_columns(table)}
+
+
+async def test_upgrade_adds_area_logo_hash(engine):
+    async with engine.begin() as conn:
+        # A database created before the column existed
+        await conn.execute(text("ALTER TABLE areas DROP COLUMN logo_hash"))
+        await conn.execute(insert(Area.__table__).values(name="north", logo=b"logo"))
+        await conn.execute(text("INSERT INTO areas (name) VALUES ('south')"))
+
+    async with engine.begin() as conn:
+        assert await conn.run_sync(upgrade_schema) == ["areas.logo_hash"]
+        assert "logo_hash" in await conn.run_sync(_columns, "areas")
+        # Idempotent
+        assert await conn.run_sync(upgrade_schema) == []
+
+        result = await conn.execute(text("SELECT name, logo_hash FROM areas"))
+        assert dict(result.tuples().all()) == {
+            "north": logo_content_hash(b"logo"),
+            "south": None,
+        }
+
+
+async def test_upgrade_adds_canvas_render_columns(engine):
+    async with engine.begin() as conn:
+        for column in ("render_fingerprint", "rendered_on"):
+            await conn.execute(
+                text(f"ALTER TABLE sticker_canvases DROP COLUMN {column}")
+            )
+
+    async with engine.begin() as conn:
+        assert await conn.run_sync(upgrade_schema) == [
+            "sticker_canvases.render_fingerprint",
+            "sticker_canvases.rendered_on",
+        ]
+        assert {"render_fingerprint", "rendered_on"} <= await conn.run_sync(
+            _columns, "sticker_canvases"
+        )
+        assert await conn.run_sync(upgrade_schema) == []
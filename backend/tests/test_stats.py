@@ -0,0 +1,173 @@
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy import delete, func, select, update
+from app.models.generic import RequestStatusEnum
+from app.models.requests import Area, Customer, Request
+from app.models.stats import RequestDailyStats, RequestStats, RequestTurnaroundStats
+from app.repositories.request import RequestRepository
+from app.schemas.generic import GranularityEnum
+from app.services.dashboard_service import DashboardService
+
+ROLLUP_MODELS = [RequestStats, RequestDailyStats, RequestTurnaroundStats]
+
+COMPLETED = RequestStatusEnum.COMPLETED.value
+IN_PROGRESS = RequestStatusEnum.IN_PROGRESS.value
+NOT_STARTED = RequestStatusEnum.NOT_STARTED.value
+
+
+async def _rollup_rows(db) -> dict[str, set]:
+    rows = {}
+    for model in ROLLUP_MODELS:
+        result = await db.execute(select(model))
+        columns = [column.name for column in model.__table__.columns]
+        rows[model.__tablename__] = {
+            tuple(getattr(record, column) for column in columns)
+            for record in result.scalars().all()
+        }
+    return rows
+
+
+async def _write_requests(db) -> None:
+    """Inserts, updates and deletes through the ORM and in bulk."""
+    db.add_all([Area(name="north"), Area(name="south"), Customer(name="acme")])
+    await db.commit()
+
+    repo = RequestRepository(db)
+    ids = await repo.bulk_create(
+        [
+            {
+                "area_id": 1 + index % 2,
+                "customer_id": 1 if index % 3 else None,
+                "status": NOT_STARTED if index % 2 else IN_PROGRESS,
+                "date_received": date(2026, 1, 1 + index),
+                "short_description": f"bulk {index}",
+            }
+            for index in range(8)
+        ]
+    )
+    db.add_all(
+        [
+            Request(area_id=1, status=COMPLETED, date_received=date(2026, 1, 5)),
+            Request(status=None, short_description="no area, no status"),
+        ]
+    )
+    await db.commit()
+
+    await db.execute(
+        update(Request).where(Request.id.in_(ids[:3])).values(status=COMPLETED)
+    )
+    await db.execute(update(Request).where(Request.id == ids[3]).values(area_id=2))
+    # Completed, then reopened: must leave the turnaround rollup again
+    await db.execute(
+        update(Request).where(Request.id == ids[1]).values(status=IN_PROGRESS)
+    )
+    await db.execute(delete(Request).where(Request.id.in_([ids[0], ids[4]])))
+    await db.commit()
+
+
+async def test_rollup_triggers_match_a_rebuild(session):
+    await _write_requests(session)
+    maintained = await _rollup_rows(session)
+    assert all(maintained.values())
+
+    await DashboardService(session).reconcile_request_stats()
+
+    assert await _rollup_rows(session) == maintained
+
+
+async def test_rollup_totals(session):
+    await _write_requests(session)
+
+    requests = (await session.execute(select(func.count(Request.id)))).scalar_one()
+    assert requests == 8
+    counted = await session.execute(select(func.sum(RequestStats.request_count)))
+    assert counted.scalar_one() == requests
+    daily = await session.execute(select(func.sum(RequestDailyStats.request_count)))
+    assert daily.scalar_one() == requests
+
+    by_status = await session.execute(
+        select(RequestStats.status, func.sum(RequestStats.request_count)).group_by(
+            RequestStats.status
+        )
+    )
+    assert dict(by_status.tuples().all()) == {
+        COMPLETED: 2,
+        IN_PROGRESS: 2,
+        NOT_STARTED: 3,
+        "": 1,
+    }
+
+    # ids[2] and the request created Completed; ids[0] was deleted
+    turnaround = await session.execute(
+        select(func.sum(RequestTurnaroundStats.completed_count))
+    )
+    assert turnaround.scalar_one() == 2
+
+
+async def test_rollups_bucket_by_local_day(session, settings):
+    local = ZoneInfo(settings.timezone)
+    created_on = datetime(2026, 1, 31, 12, tzinfo=timezone.utc)
+    completed_on = datetime(2026, 2, 3, 12, tzinfo=timezone.utc)
+    created_day = created_on.astimezone(local).date()
+    completed_day = completed_on.astimezone(local).date()
+    # The test timezone puts both on the next day: UTC buckets would differ
+    assert created_day != created_on.date() and completed_day != completed_on.date()
+
+    request = Request(
+        status=COMPLETED, date_received=date(2026, 1, 30), created_on=created_on
+    )
+    session.add(request)
+    await session.flush()
+    await session.execute(
+        update(Request)
+        .where(Request.id == request.id)
+        .values(completed_on=completed_on)
+    )
+    await session.commit()
+
+    async def buckets():
+        month = await session.execute(select(RequestStats.month))
+        day = await session.execute(select(RequestDailyStats.day))
+        turnaround = await session.execute(
+            select(RequestTurnaroundStats.day, RequestTurnaroundStats.turnaround_days)
+        )
+        return month.scalar_one(), day.scalar_one(), turnaround.one()
+
+    expected = (
+        created_day.strftime("%Y-%m"),
+        created_day,
+        (completed_day, (completed_day - date(2026, 1, 30)).days),
+    )
+    assert await buckets() == expected
+    await DashboardService(session).reconcile_request_stats()
+    assert await buckets() == expected
+
+    series = await DashboardService(session).get_requests_over_time(
+        created_day, created_day
+    )
+    assert series["series"] == [{"period": str(created_day), "request_count": 1}]
+
+
+async def test_turnaround_average_uses_the_raw_sums(session):
+    session.add_all(
+        [
+            RequestTurnaroundStats(
+                day=date(2026, 1, 10), completed_count=3, turnaround_days=2
+            ),
+            RequestTurnaroundStats(
+                day=date(2026, 2, 10), completed_count=3, turnaround_days=0
+            ),
+        ]
+    )
+    await session.commit()
+
+    turnaround = await DashboardService(session).get_turnaround(
+        date(2026, 1, 1), date(2026, 2, 28), GranularityEnum.MONTH
+    )
+    assert [point["avg_turnaround_days"] for point in turnaround["series"]] == [
+        0.67,
+        0.0,
+    ]
+    # 2 days over 6 requests, not the rounded 0.67 * 3 over 6
+    assert turnaround["avg_turnaround_days"] == 0.33
+    assert turnaround["completed_count"] == 6
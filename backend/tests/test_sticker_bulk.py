@@ -0,0 +1,56 @@
+import io
+import zipfile
+import pytest
+from app.core.storage import CHUNK_SIZE, LocalDocumentStorage
+from app.services import sticker_service
+from app.services.sticker_bulk_service import StickerBulkDownloadService
+
+
+class _FailingStorage(LocalDocumentStorage):
+    """Reads of `unreadable/` keys fail at once, of `cut/` keys after one chunk."""
+
+    async def iter_bytes(self, key, start=0, end=None):
+        if key.startswith("unreadable/"):
+            raise OSError(f"I/O error reading {self.root}/{key}")
+        async for chunk in super().iter_bytes(key, start, end):
+            yield chunk
+            if key.startswith("cut/"):
+                raise OSError(f"I/O error reading {self.root}/{key}")
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = _FailingStorage(tmp_path / "documents")
+    monkeypatch.setattr(sticker_service, "document_storage", storage)
+    return storage
+
+
+async def test_zip_survives_storage_errors(session, storage):
+    document = bytes(index % 251 for index in range(3 * CHUNK_SIZE))
+    for key in ("ok/1.pdf", "unreadable/2.pdf", "cut/3.pdf", "ok/4.pdf"):
+        await storage.save_bytes(key, document)
+    canvases = [(1, "ok/1.pdf"), (2, "unreadable/2.pdf"), (3, "cut/3.pdf")]
+    canvases.append((4, "ok/4.pdf"))
+
+    service = StickerBulkDownloadService(session)
+    body = b"".join([chunk async for chunk in service.iter_zip(canvases)])
+
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.testzip() is None
+        # The unreadable document gets no entry; the cut one is truncated
+        assert archive.namelist() == [
+            "sticker-canvas-1.pdf",
+            "sticker-canvas-3.pdf",
+            "sticker-canvas-4.pdf",
+            "errors.txt",
+        ]
+        assert archive.read("sticker-canvas-1.pdf") == document
+        assert archive.read("sticker-canvas-4.pdf") == document
+        assert archive.read("sticker-canvas-3.pdf") == document[:CHUNK_SIZE]
+        errors = archive.read("errors.txt").decode()
+
+    assert errors.splitlines() == [
+        "sticker-canvas-2: document could not be read",
+        "sticker-canvas-3: document incomplete, reading it failed",
+    ]
+    assert str(storage.root) not in errors
@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from app.schemas.sticker import LStickerJobStatus
+from app.services.sticker_job_service import StickerJobService
+from app.services.sticker_service import DocumentInformation
+
+IN_PROGRESS = LStickerJobStatus.IN_PROGRESS.value
+COMPLETED = LStickerJobStatus.COMPLETED.value
+FAILED = LStickerJobStatus.FAILED.value
+
+DOCUMENT = DocumentInformation(document_id="doc", path="2026/01/doc.pdf")
+
+
+@pytest.fixture
+def job_settings(settings, monkeypatch):
+    monkeypatch.setattr(settings, "sticker_job_lease_seconds", 600)
+    monkeypatch.setattr(settings, "sticker_job_max_attempts", 3)
+    monkeypatch.setattr(settings, "sticker_job_retry_delay", 0.2)
+    return settings
+
+
+async def _submit(session_factory, count: int) -> list[int]:
+    async with session_factory() as db:
+        service = StickerJobService(db)
+        return [(await service.submit("legacy", {"data": []})).id for _ in range(count)]
+
+
+async def _job(session_factory, job_id: int):
+    async with session_factory() as db:
+        return await StickerJobService(db).get_by_id(job_id)
+
+
+async def test_concurrent_workers_claim_each_job_once(session_factory, job_settings):
+    job_ids = await _submit(session_factory, 8)
+
+    async def worker(worker_id: str) -> list[int]:
+        claimed = []
+        async with session_factory() as db:
+            service = StickerJobService(db)
+            while (job := await service.claim_next(worker_id)) is not None:
+                claimed.append(job.id)
+        return claimed
+
+    claims = await asyncio.gather(*(worker(f"worker-{index}") for index in range(4)))
+
+    claimed = [job_id for worker_claims in claims for job_id in worker_claims]
+    assert sorted(claimed) == job_ids
+    for job_id in job_ids:
+        job = await _job(session_factory, job_id)
+        assert job.attempts == 1 and job.locked_by is not None
+
+
+async def test_expired_lease_is_reclaimed(session_factory, job_settings, monkeypatch):
+    monkeypatch.setattr(job_settings, "sticker_job_lease_seconds", 1)
+    [job_id] = await _submit(session_factory, 1)
+    async with session_factory() as db:
+        service = StickerJobService(db)
+        assert (await service.claim_next("first")).id == job_id
+        # Leased: nobody else may take it
+        assert await service.claim_next("second") is None
+
+        await asyncio.sleep(1.1)
+        assert (await service.claim_next("second")).id == job_id
+
+        # The first worker lost the job: its result is dropped
+        await service.complete(job_id, "first", DOCUMENT)
+    job = await _job(session_factory, job_id)
+    assert job.status == IN_PROGRESS and job.locked_by == "second"
+
+    async with session_factory() as db:
+        await StickerJobService(db).complete(job_id, "second", DOCUMENT)
+    job = await _job(session_factory, job_id)
+    assert job.status == COMPLETED and job.locked_by is None
+    assert job.attempts == 2 and job.relative_file_path == DOCUMENT.path
+
+
+async def test_failed_job_is_retried_with_backoff(
+    session_factory, job_settings, monkeypatch
+):
+    monkeypatch.setattr(job_settings, "sticker_job_max_attempts", 2)
+    [job_id] = await _submit(session_factory, 1)
+    async with session_factory() as db:
+        service = StickerJobService(db)
+        job = await service.claim_next("worker")
+        await service.fail(job_id, "worker", job.attempts, "boom", retry=True)
+
+        # Not due before the retry delay
+        assert await service.claim_next("worker") is None
+        await asyncio.sleep(0.3)
+        job = await service.claim_next("worker")
+        assert job.id == job_id and job.attempts == 2
+
+        # Out of attempts
+        await service.fail(job_id, "worker", job.attempts, "boom again", retry=True)
+    job = await _job(session_factory, job_id)
+    assert job.status == FAILED and job.error == "boom again"
+    assert job.finished_on is not None
+
+
+async def test_unretryable_failure_is_final(session_factory, job_settings):
+    [job_id] = await _submit(session_factory, 1)
+    async with session_factory() as db:
+        service = StickerJobService(db)
+        job = await service.claim_next("worker")
+        await service.fail(job_id, "worker", job.attempts, "bad input", retry=False)
+        assert await service.claim_next("worker") is None
+    job = await _job(session_factory, job_id)
+    assert job.status == FAILED and job.attempts == 1
+
+
+async def test_abandoned_last_attempt_fails(session_factory, job_settings, monkeypatch):
+    monkeypatch.setattr(job_settings, "sticker_job_max_attempts", 1)
+    monkeypatch.setattr(job_settings, "sticker_job_lease_seconds", 0)
+    [job_id] = await _submit(session_factory, 1)
+    async with session_factory() as db:
+        service = StickerJobService(db)
+        await service.claim_next("worker")
+        await asyncio.sleep(0.05)
+        # The worker died: no attempt is left to reclaim the job
+        assert await service.claim_next("other") is None
+        assert await service.fail_abandoned() == 1
+    job = await _job(session_factory, job_id)
+    assert job.status == FAILED and job.locked_by is None
@@ -0,0 +1,164 @@
+"""
+Document storage backends. The S3 tests run when TEST_S3_ENDPOINT_URL points
+to an S3-compatible server, e.g. MinIO or `moto_server`:
+
+    TEST_S3_ENDPOINT_URL=http://localhost:5000 pytest tests/test_storage.py
+
+TEST_S3_BUCKET (created if missing), TEST_S3_ACCESS_KEY_ID and
+TEST_S3_SECRET_ACCESS_KEY default to values a moto server accepts. Each test
+writes under its own prefix and removes its objects.
+"""
+
+import os
+import urllib.request
+import uuid
+import pytest
+from app.core.storage import CHUNK_SIZE, LocalDocumentStorage, S3DocumentStorage
+
+S3_ENDPOINT_URL = os.environ.get("TEST_S3_ENDPOINT_URL")
+S3_BUCKET = os.environ.get("TEST_S3_BUCKET", "rms-tests")
+
+# The smallest part S3 accepts
+MULTIPART_SIZE = 5 * 1024 * 1024
+
+STORAGE_BACKENDS = [
+    pytest.param("local", id="local"),
+    pytest.param(
+        "s3",
+        id="s3",
+        marks=pytest.mark.skipif(
+            not S3_ENDPOINT_URL, reason="TEST_S3_ENDPOINT_URL is not set"
+        ),
+    ),
+]
+
+
+def _s3_storage(prefix: str) -> S3DocumentStorage:
+    storage = S3DocumentStorage(
+        bucket=S3_BUCKET,
+        prefix=prefix,
+        endpoint_url=S3_ENDPOINT_URL,
+        region=os.environ.get("TEST_S3_REGION", "us-east-1"),
+        access_key_id=os.environ.get("TEST_S3_ACCESS_KEY_ID", "testing"),
+        secret_access_key=os.environ.get("TEST_S3_SECRET_ACCESS_KEY", "testing"),
+        multipart_threshold=MULTIPART_SIZE,
+        multipart_chunksize=MULTIPART_SIZE,
+        list_page_size=2,
+    )
+    client = storage._client
+    existing = {bucket["Name"] for bucket in client.list_buckets()["Buckets"]}
+    if S3_BUCKET not in existing:
+        client.create_bucket(Bucket=S3_BUCKET)
+    return storage
+
+
+@pytest.fixture(params=STORAGE_BACKENDS)
+async def storage(request, tmp_path):
+    if request.param == "local":
+        yield LocalDocumentStorage(tmp_path / "documents")
+        return
+    storage = _s3_storage(f"tests-{uuid.uuid4().hex}/")
+    yield storage
+    await storage.delete_many([entry.key async for entry in storage.iter_entries()])
+    await storage.close()
+
+
+def _document(size: int) -> bytes:
+    return bytes(index % 251 for index in range(size))
+
+
+async def _read(storage, key: str, start: int = 0, end=None) -> bytes:
+    return b"".join([chunk async for chunk in storage.iter_bytes(key, start, end)])
+
+
+async def test_round_trip(storage, tmp_path):
+    data = _document(1000)
+    await storage.save_bytes("2026/01/a.pdf", data)
+    assert await storage.read_bytes("2026/01/a.pdf") == data
+    stored = await storage.stat("2026/01/a.pdf")
+    assert stored.size == len(data) and stored.etag.startswith('"')
+
+    source = tmp_path / "rendered.pdf"
+    source.write_bytes(data[::-1])
+    await storage.save_file("2026/01/b.pdf", str(source))
+    assert not source.exists()
+    assert await storage.read_bytes("2026/01/b.pdf") == data[::-1]
+
+    assert await storage.delete("2026/01/a.pdf")
+    assert not await storage.delete("2026/01/a.pdf")
+    assert not await storage.exists("2026/01/a.pdf")
+    for missing in (storage.read_bytes, storage.stat):
+        with pytest.raises(FileNotFoundError):
+            await missing("2026/01/a.pdf")
+
+
+async def test_multipart_upload(storage, tmp_path):
+    data = _document(2 * MULTIPART_SIZE + 1000)
+    await storage.save_bytes("big.pdf", data)
+    source = tmp_path / "big.pdf"
+    source.write_bytes(data)
+    await storage.save_file("big-file.pdf", str(source))
+
+    for key in ("big.pdf", "big-file.pdf"):
+        assert await storage.read_bytes(key) == data
+        if isinstance(storage, S3DocumentStorage):
+            # Multipart ETags end with the part count
+            assert (await storage.stat(key)).etag.endswith('-3"')
+
+
+async def test_ranged_iter_bytes(storage):
+    data = _document(3 * CHUNK_SIZE + 123)
+    await storage.save_bytes("doc.pdf", data)
+
+    assert await _read(storage, "doc.pdf") == data
+    for start, end in [
+        (0, 10),
+        (10, None),
+        (CHUNK_SIZE - 5, CHUNK_SIZE + 5),
+        (100, 2 * CHUNK_SIZE + 50),
+        (len(data) - 1, len(data)),
+    ]:
+        assert await _read(storage, "doc.pdf", start, end) == data[start:end]
+
+    with pytest.raises(FileNotFoundError):
+        await _read(storage, "missing.pdf")
+
+
+async def test_iter_entries_pages(storage):
+    # More keys than one S3 listing page, nested like real document keys
+    keys = [f"2026/{month:02d}/{index}.pdf" for month in (1, 2) for index in range(3)]
+    keys.append("top.pdf")
+    for index, key in enumerate(keys):
+        await storage.save_bytes(key, _document(index + 1))
+
+    entries = {entry.key: entry async for entry in storage.iter_entries()}
+    assert sorted(entries) == sorted(keys)
+    assert [entries[key].size for key in keys] == list(range(1, len(keys) + 1))
+    assert all(entry.last_modified > 0 for entry in entries.values())
+
+
+async def test_delete_many(storage):
+    keys = [f"2026/01/{index}.pdf" for index in range(5)]
+    for key in keys:
+        await storage.save_bytes(key, b"pdf")
+
+    # Missing keys are skipped
+    await storage.delete_many(keys[:3] + ["2026/01/missing.pdf"])
+
+    remaining = sorted([entry.key async for entry in storage.iter_entries()])
+    assert remaining == keys[3:]
+    await storage.delete_many([])
+
+
+async def test_presigned_url(storage):
+    await storage.save_bytes("2026/01/doc.pdf", b"%PDF-1.4 document")
+    url = await storage.presigned_url("2026/01/doc.pdf", "doc.pdf", "attachment")
+    if isinstance(storage, LocalDocumentStorage):
+        # Served by the app instead
+        assert url is None
+        return
+
+    with urllib.request.urlopen(url) as response:
+        assert response.read() == b"%PDF-1.4 document"
+        assert response.headers["Content-Type"] == "application/pdf"
+        assert response.headers["Content-Disposition"] == "attachment; filename=doc.pdf"